@@ -4,5 +4,112 @@ import os
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Optional comma-separated read replicas for catalog and admin reads
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "2"))
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "secret")
-JWT_ALGORITHM = "HS256"
+# "HS256" signs with JWT_SECRET_KEY; "RS256" or "EdDSA" sign with the private key JWT_ACTIVE_KID
+# from JWT_KEYS_DIR and publish the public keys at /.well-known/jwks.json
+JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+JWT_KEYS_DIR = os.getenv("JWT_KEYS_DIR", "keys")
+JWT_ACTIVE_KID = os.getenv("JWT_ACTIVE_KID")
+# Seconds between key directory rescans (and between rescans for the same unknown kid)
+JWT_KEYS_RELOAD_SECONDS = float(os.getenv("JWT_KEYS_RELOAD_SECONDS", "60"))
+JWKS_MAX_AGE = int(os.getenv("JWKS_MAX_AGE", "300"))
+# Access tokens are verified without the database, so keep them short; refresh tokens rotate on use
+ACCESS_TOKEN_MINUTES = int(os.getenv("ACCESS_TOKEN_MINUTES", "15"))
+REFRESH_TOKEN_DAYS = int(os.getenv("REFRESH_TOKEN_DAYS", "30"))
+
+# Connection pool
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", "2"))  # connections opened at startup
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "true").lower() == "true"
+
+# Query profiling
+QUERY_PROFILER_ENABLED = os.getenv("QUERY_PROFILER_ENABLED", "false").lower() == "true"
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "warn")  # "warn" or "raise"
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "3"))
+
+# Redis (rate limiting and other shared state)
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+
+# Rate limiting: token buckets written as "<requests>/<seconds>"
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")  # "memory" (single process) or "redis"
+RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "false").lower() == "true"
+RATE_LIMITS = {
+    "users.login": os.getenv("RATE_LIMIT_LOGIN", "5/60"),
+    "users.register": os.getenv("RATE_LIMIT_REGISTER", "3/60"),
+    "products.search": os.getenv("RATE_LIMIT_SEARCH", "30/10"),
+}
+
+# Upper bounds of the price facet buckets on /api/products/browse
+PRICE_FACET_BUCKETS = [int(b) for b in os.getenv("PRICE_FACET_BUCKETS", "25,50,100,250,500").split(",")]
+
+# Inventory ledger compaction (0 disables the background compactor)
+INVENTORY_COMPACTION_INTERVAL = float(os.getenv("INVENTORY_COMPACTION_INTERVAL", "5"))
+# Ledger rows younger than this are left for the next pass so in-flight transactions can commit
+INVENTORY_COMPACTION_DELAY = float(os.getenv("INVENTORY_COMPACTION_DELAY", "5"))
+
+# Admission control: (concurrent requests, wait queue size, max seconds queued) per endpoint
+ADMISSION_LIMITS = {
+    "orders.create": (
+        int(os.getenv("CHECKOUT_CONCURRENCY", "8")),
+        int(os.getenv("CHECKOUT_QUEUE_SIZE", "64")),
+        float(os.getenv("CHECKOUT_QUEUE_TIMEOUT", "2")),
+    ),
+}
+
+# Uploaded images and their resized variants
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", "media")
+IMAGE_VARIANT_WIDTHS = [int(w) for w in os.getenv("IMAGE_VARIANT_WIDTHS", "160,320,640,1280").split(",")]
+IMAGE_MAX_UPLOAD_BYTES = int(os.getenv("IMAGE_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+
+# Server-sent event streams: seconds between keepalive comments on an idle stream
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+# Optional URL that low-stock alerts are also POSTed to as JSON
+STOCK_ALERT_WEBHOOK_URL = os.getenv("STOCK_ALERT_WEBHOOK_URL") or None
+
+# Admin recent-orders feed: summaries kept in memory, and seconds before reloading them
+# from the database (picks up orders placed through other workers)
+RECENT_ORDERS_BUFFER_SIZE = int(os.getenv("RECENT_ORDERS_BUFFER_SIZE", "50"))
+RECENT_ORDERS_TTL = float(os.getenv("RECENT_ORDERS_TTL", "10"))
+
+# Sliding-window sales counters for trending and top products: "memory" (per process) or "redis"
+TRENDING_BACKEND = os.getenv("TRENDING_BACKEND", "memory")
+
+# Cache invalidation across workers: "local" (single process) or "redis" (pub/sub on REDIS_URL)
+CACHE_INVALIDATION_BACKEND = os.getenv("CACHE_INVALIDATION_BACKEND", "local")
+CACHE_INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "cache-invalidation")
+
+# Order archival: DELIVERED/CANCELLED orders older than this many days move to the archive
+# tables, checked every ORDER_ARCHIVE_INTERVAL seconds (0 disables the background archiver)
+ORDER_ARCHIVE_AFTER_DAYS = int(os.getenv("ORDER_ARCHIVE_AFTER_DAYS", "180"))
+ORDER_ARCHIVE_INTERVAL = float(os.getenv("ORDER_ARCHIVE_INTERVAL", "3600"))
+
+# Stripe circuit breaker: consecutive connection/server errors before payments fail fast,
+# and seconds before a trial request is let through again
+STRIPE_CIRCUIT_FAILURES = int(os.getenv("STRIPE_CIRCUIT_FAILURES", "5"))
+STRIPE_CIRCUIT_RESET_SECONDS = float(os.getenv("STRIPE_CIRCUIT_RESET_SECONDS", "30"))
+
+# Readiness probe: seconds a database/Redis ping result is reused between probes
+READINESS_CACHE_SECONDS = float(os.getenv("READINESS_CACHE_SECONDS", "2"))
+# Load shedding: once this share of the primary pool is checked out, requests not matching an
+# exempt entry get a 503 (0 disables). Entries are path prefixes, or "METHOD /path" for one exact
+# route: checkout is exempt, order history isn't
+LOAD_SHED_SATURATION = float(os.getenv("LOAD_SHED_SATURATION", "0.9"))
+LOAD_SHED_EXEMPT_PATHS = tuple(
+    path.strip() for path in os.getenv("LOAD_SHED_EXEMPT_PATHS", "/health,POST /api/orders/,/api/payments,/api/cart").split(",")
+    if path.strip()
+)
+
+
+# Revoked access tokens: "memory" (per process) or "redis" (shared; each worker keeps a bloom
+# filter of the revoked set, rebuilt every REVOCATION_SYNC_SECONDS)
+REVOCATION_BACKEND = os.getenv("REVOCATION_BACKEND", "memory")
+REVOCATION_SYNC_SECONDS = float(os.getenv("REVOCATION_SYNC_SECONDS", "5"))
+REVOCATION_FILTER_BITS = int(os.getenv("REVOCATION_FILTER_BITS", str(1 << 20)))
+REVOCATION_FILTER_HASHES = int(os.getenv("REVOCATION_FILTER_HASHES", "7"))
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException, status
 from app.models.cart import CartItem
 from app.models.product import Product
+from app.controllers.inventory_controller import get_stock
 from app.schemas.cart_schema import CartItemCreate, CartItemUpdate
 from typing import List
 
@@ -19,7 +20,8 @@ def add_to_cart(db: Session, user_id: int, cart_item: CartItemCreate):
         )
     
     # Check if product has enough stock
-    if product.stock_quantity < cart_item.quantity:
+    stock = get_stock(db, product.id)
+    if stock < cart_item.quantity:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Insufficient stock"
@@ -34,7 +36,7 @@ def add_to_cart(db: Session, user_id: int, cart_item: CartItemCreate):
     if existing_item:
         # Update quantity
         new_quantity = existing_item.quantity + cart_item.quantity
-        if product.stock_quantity < new_quantity:
+        if stock < new_quantity:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Insufficient stock"
@@ -82,8 +84,7 @@ def update_cart_item(db: Session, user_id: int, item_id: int, cart_update: CartI
         )
     
     # Check if product has enough stock
-    product = db.query(Product).filter(Product.id == cart_item.product_id).first()
-    if product.stock_quantity < cart_update.quantity:
+    if get_stock(db, cart_item.product_id) < cart_update.quantity:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Insufficient stock"
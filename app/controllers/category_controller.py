@@ -1,7 +1,35 @@
-from sqlalchemy.orm import Session
+import json
+from sqlalchemy import func
+from sqlalchemy.orm import Session, aliased
 from fastapi import HTTPException, status
-from app.models.category import Category
+from app.models.category import Category, CategoryClosure
+from app.models.product import Product
 from app.schemas.category_schema import CategoryCreate, CategoryUpdate
+from app.utils.cache import category_tree_cache, product_cache
+
+def _check_parent(db: Session, parent_id: int):
+    if not db.query(Category.id).filter(Category.id == parent_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parent category not found"
+        )
+
+def _attach_subtree(db: Session, category_id: int, parent_id: int):
+    # Link every ancestor of the new parent to every node of the subtree rooted at category_id
+    ancestor = aliased(CategoryClosure)
+    descendant = aliased(CategoryClosure)
+    pairs = db.query(
+        ancestor.ancestor_id, descendant.descendant_id, ancestor.depth + descendant.depth + 1
+    ).filter(
+        ancestor.descendant_id == parent_id,
+        descendant.ancestor_id == category_id
+    ).all()
+    db.add_all([
+        CategoryClosure(ancestor_id=a, descendant_id=d, depth=depth) for a, d, depth in pairs
+    ])
+
+def get_subtree_ids(db: Session, category_id: int):
+    return db.query(CategoryClosure.descendant_id).filter(CategoryClosure.ancestor_id == category_id)
 
 def create_category(db: Session, category: CategoryCreate):
     # Check if category already exists
@@ -12,10 +40,21 @@ def create_category(db: Session, category: CategoryCreate):
             detail="Category with this name already exists"
         )
     
+    if category.parent_id:
+        _check_parent(db, category.parent_id)
+    
     db_category = Category(**category.dict())
     db.add(db_category)
+    db.flush()
+    
+    db.add(CategoryClosure(ancestor_id=db_category.id, descendant_id=db_category.id, depth=0))
+    if category.parent_id:
+        db.flush()
+        _attach_subtree(db, db_category.id, category.parent_id)
+    
     db.commit()
     db.refresh(db_category)
+    category_tree_cache.clear()
     return db_category
 
 def get_categories(db: Session, skip: int = 0, limit: int = 100, active_only: bool = True):
@@ -37,11 +76,38 @@ def update_category(db: Session, category_id: int, category_update: CategoryUpda
     category = get_category_by_id(db, category_id)
     
     update_data = category_update.dict(exclude_unset=True)
+    new_parent_id = update_data.get("parent_id", category.parent_id)
+    
+    if new_parent_id != category.parent_id:
+        if new_parent_id is not None:
+            _check_parent(db, new_parent_id)
+            # A category can't move under itself or one of its descendants
+            in_subtree = db.query(CategoryClosure).filter(
+                CategoryClosure.ancestor_id == category_id,
+                CategoryClosure.descendant_id == new_parent_id
+            ).first()
+            if in_subtree:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Category cannot be moved under its own subtree"
+                )
+        
+        # Detach the subtree from its old ancestors, then attach it to the new ones
+        subtree = [row.descendant_id for row in get_subtree_ids(db, category_id)]
+        db.query(CategoryClosure).filter(
+            CategoryClosure.descendant_id.in_(subtree),
+            CategoryClosure.ancestor_id.notin_(subtree)
+        ).delete(synchronize_session=False)
+        if new_parent_id is not None:
+            _attach_subtree(db, category_id, new_parent_id)
+    
     for field, value in update_data.items():
         setattr(category, field, value)
     
     db.commit()
     db.refresh(category)
+    category_tree_cache.clear()
+    product_cache.clear()
     return category
 
 def delete_category(db: Session, category_id: int):
@@ -54,6 +120,62 @@ def delete_category(db: Session, category_id: int):
             detail="Cannot delete category with associated products"
         )
     
+    # Check if category has subcategories
+    if db.query(Category.id).filter(Category.parent_id == category_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot delete category with subcategories"
+        )
+    
+    db.query(CategoryClosure).filter(
+        CategoryClosure.descendant_id == category_id
+    ).delete(synchronize_session=False)
     db.delete(category)
     db.commit()
+    category_tree_cache.clear()
+    product_cache.clear()
     return {"message": "Category deleted successfully"}
+
+def build_category_tree(db: Session):
+    categories = db.query(Category.id, Category.name, Category.parent_id).filter(
+        Category.is_active == True
+    ).order_by(Category.name).all()
+    
+    counts = dict(db.query(Product.category_id, func.count(Product.id)).filter(
+        Product.is_active == True
+    ).group_by(Product.category_id).all())
+    
+    nodes = {
+        c.id: {
+            "id": c.id,
+            "name": c.name,
+            "parent_id": c.parent_id,
+            "product_count": counts.get(c.id, 0),
+            "total_product_count": 0,
+            "children": []
+        }
+        for c in categories
+    }
+    
+    roots = []
+    for node in nodes.values():
+        parent = nodes.get(node["parent_id"])
+        if parent:
+            parent["children"].append(node)
+        elif node["parent_id"] is None:
+            roots.append(node)
+        # Children of inactive categories are hidden along with their parent
+    
+    def total(node):
+        node["total_product_count"] = node["product_count"] + sum(total(child) for child in node["children"])
+        return node["total_product_count"]
+    
+    for root in roots:
+        total(root)
+    return roots
+
+def get_category_tree_json(db: Session) -> bytes:
+    # Served pre-serialized: the tree is rebuilt only after category or product writes
+    return category_tree_cache.get_or_set(
+        "tree", lambda: json.dumps(build_category_tree(db)).encode()
+    )
@@ -0,0 +1,326 @@
+import random
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import case, func, insert, literal, select
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from fastapi import HTTPException, status
+from app.models.inventory import InventoryMovement, LedgerState, MovementReason, ProductStockShard, StockAlert
+from app.models.product import Product
+from app.utils.cache import ledger_watermark_cache
+from app.utils.events import stock_alert_events
+from app.config import INVENTORY_COMPACTION_DELAY
+from typing import Dict, Iterable, List, Optional
+
+def record_movement(db: Session, product_id: int, delta: int, reason: MovementReason,
+                    order_id: Optional[int] = None):
+    """
+    Append a stock change; the caller commits it with the rest of its transaction
+    """
+    movement = InventoryMovement(product_id=product_id, delta=delta, reason=reason, order_id=order_id)
+    db.add(movement)
+    return movement
+
+MAX_STOCK_SHARDS = 64
+
+def live_stock():
+    """
+    Current stock as a column expression on Product: the shard total for sharded
+    products, otherwise the compacted balance plus the deltas recorded after it
+    """
+    pending = select(func.coalesce(func.sum(InventoryMovement.delta), 0)).where(
+        InventoryMovement.product_id == Product.id,
+        InventoryMovement.id > Product.stock_ledger_id
+    ).correlate(Product).scalar_subquery()
+    shard_total = select(func.coalesce(func.sum(ProductStockShard.quantity), 0)).where(
+        ProductStockShard.product_id == Product.id
+    ).correlate(Product).scalar_subquery()
+    return case((Product.stock_shards > 0, shard_total), else_=Product.stock_quantity + pending)
+
+def get_stock_levels(db: Session, product_ids: Iterable[int]) -> Dict[int, int]:
+    product_ids = list(product_ids)
+    if not product_ids:
+        return {}
+    rows = db.query(Product.id, live_stock()).filter(Product.id.in_(product_ids)).all()
+    return {product_id: stock for product_id, stock in rows}
+
+def get_stock(db: Session, product_id: int) -> int:
+    return get_stock_levels(db, [product_id]).get(product_id, 0)
+
+def with_live_stock(db: Session, products: List[Product]) -> List[Product]:
+    """
+    Show live stock on loaded products without marking them dirty
+    """
+    levels = get_stock_levels(db, [product.id for product in products])
+    for product in products:
+        set_committed_value(product, "stock_quantity", levels.get(product.id, product.stock_quantity))
+    return products
+
+def _even_split(total: int, shards: int) -> List[int]:
+    return [total // shards + (1 if shard < total % shards else 0) for shard in range(shards)]
+
+def _locked_shards(db: Session, product_id: int) -> List[ProductStockShard]:
+    return db.query(ProductStockShard).filter(
+        ProductStockShard.product_id == product_id
+    ).order_by(ProductStockShard.shard).with_for_update().all()
+
+def set_stock_shards(db: Session, product: Product, shards: int):
+    """
+    Move a product between ledger stock (0) and `shards` counter rows; total stock is unchanged
+    """
+    if not 0 <= shards <= MAX_STOCK_SHARDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"stock_shards must be between 0 and {MAX_STOCK_SHARDS}"
+        )
+    if shards == product.stock_shards:
+        return
+
+    existing = _locked_shards(db, product.id)
+    total = sum(row.quantity for row in existing) if product.stock_shards else get_stock(db, product.id)
+    for row in existing:
+        db.delete(row)
+    db.flush()
+    for shard, quantity in enumerate(_even_split(total, shards) if shards else []):
+        db.add(ProductStockShard(product_id=product.id, shard=shard, quantity=quantity))
+    product.stock_shards = shards
+    # The session doesn't autoflush: make the new rows visible to adjust_stock in the same update
+    db.flush()
+
+def adjust_stock(db: Session, product: Product, new_stock: int):
+    """
+    Admin stock edit: the difference goes on the ledger, and sharded products are rebalanced
+    """
+    if product.stock_shards:
+        rows = _locked_shards(db, product.id)
+        current = sum(row.quantity for row in rows)
+        for row, quantity in zip(rows, _even_split(new_stock, len(rows))):
+            row.quantity = quantity
+    else:
+        current = get_stock(db, product.id)
+    if new_stock != current:
+        record_movement(db, product.id, new_stock - current, MovementReason.ADJUSTMENT)
+
+# First key of the two-key Postgres advisory locks taken per product by _take_from_ledger
+STOCK_LOCK_NAMESPACE = 1
+
+def _take_from_ledger(db: Session, product: Product, quantity: int, order_id: int) -> bool:
+    """
+    Checkouts of the same unsharded product still queue here until commit: that is the price
+    of one balance. Sharding the product (set_stock_shards) is the way out for hot items.
+    On Postgres they queue on a transaction advisory lock keyed by product id rather than a
+    row lock on the product, which would also block admin edits, compaction and the foreign
+    key checks of every order item for the product. SQLite runs the guarded insert under its
+    write lock; other databases fall back to locking the product row.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(select(func.pg_advisory_xact_lock(STOCK_LOCK_NAMESPACE, product.id)))
+    else:
+        db.query(Product.id).filter(Product.id == product.id).with_for_update().one()
+    # The movement is only inserted while the live balance covers it, in one statement
+    taken = db.execute(insert(InventoryMovement).from_select(
+        ["product_id", "delta", "reason", "order_id"],
+        select(
+            Product.id,
+            literal(-quantity),
+            literal(MovementReason.ORDER, InventoryMovement.reason.type),
+            literal(order_id)
+        ).where(Product.id == product.id, live_stock() >= quantity)
+    ))
+    return taken.rowcount == 1
+
+def take_stock(db: Session, product: Product, quantity: int, order_id: int) -> bool:
+    """
+    Reserve stock for an order; returns False when there isn't enough left. Sharded products
+    decrement random non-empty shards with guarded UPDATEs, so concurrent checkouts rarely
+    wait on the same row lock. Ledger products queue per product (see _take_from_ledger). Either way
+    stock never goes negative.
+    """
+    if product.stock_shards:
+        shards = db.query(ProductStockShard.shard, ProductStockShard.quantity).filter(
+            ProductStockShard.product_id == product.id,
+            ProductStockShard.quantity > 0
+        ).all()
+        random.shuffle(shards)
+        # Shards that cover the whole quantity first, so most orders touch one row
+        shards.sort(key=lambda row: row[1] < quantity)
+        remaining = quantity
+        for shard, available in shards:
+            take = min(remaining, available)
+            taken = db.query(ProductStockShard).filter(
+                ProductStockShard.product_id == product.id,
+                ProductStockShard.shard == shard,
+                ProductStockShard.quantity >= take
+            ).update({ProductStockShard.quantity: ProductStockShard.quantity - take}, synchronize_session=False)
+            if taken:
+                remaining -= take
+                if not remaining:
+                    break
+        if remaining:
+            return False
+        record_movement(db, product.id, -quantity, MovementReason.ORDER, order_id)
+        return True
+    return _take_from_ledger(db, product, quantity, order_id)
+
+def return_stock(db: Session, product: Product, quantity: int, order_id: int):
+    if product.stock_shards:
+        db.query(ProductStockShard).filter(
+            ProductStockShard.product_id == product.id,
+            ProductStockShard.shard == random.randrange(product.stock_shards)
+        ).update({ProductStockShard.quantity: ProductStockShard.quantity + quantity}, synchronize_session=False)
+    record_movement(db, product.id, quantity, MovementReason.CANCELLATION, order_id)
+
+def check_stock_alerts(db: Session, products: Iterable[Product]) -> List[StockAlert]:
+    """
+    Open an alert for each product at or below its reorder threshold and resolve the open
+    alerts of products back above it. Call after changing stock and before committing;
+    pass the returned alerts to publish_stock_alerts once the commit succeeds.
+    """
+    products = {product.id: product for product in products}
+    if not products:
+        return []
+    db.flush()
+    levels = get_stock_levels(db, products)
+    open_alerts: Dict[int, List[StockAlert]] = {}
+    for alert in db.query(StockAlert).filter(
+        StockAlert.product_id.in_(products),
+        StockAlert.resolved_at.is_(None)
+    ):
+        open_alerts.setdefault(alert.product_id, []).append(alert)
+
+    changed = []
+    now = datetime.now(timezone.utc)
+    for product_id, product in products.items():
+        stock = levels.get(product_id, 0)
+        alerts = open_alerts.get(product_id, [])
+        if stock <= product.reorder_threshold and not alerts:
+            alert = StockAlert(product_id=product_id, threshold=product.reorder_threshold, stock_quantity=stock)
+            db.add(alert)
+            changed.append(alert)
+        elif stock > product.reorder_threshold:
+            for alert in alerts:
+                alert.resolved_at = now
+                changed.append(alert)
+    return changed
+
+def publish_stock_alerts(alerts: List[StockAlert]):
+    for alert in alerts:
+        stock_alert_events.publish("restocked" if alert.resolved_at else "low_stock", {
+            "id": alert.id,
+            "product_id": alert.product_id,
+            "threshold": alert.threshold,
+            "stock_quantity": alert.stock_quantity,
+            "created_at": alert.created_at,
+            "resolved_at": alert.resolved_at,
+        })
+
+def get_open_stock_alerts(db: Session):
+    """
+    Active products with an open stock alert and their live stock, lowest first.
+    Reads only the open alerts (ix_stock_alerts_open), however large the catalog.
+    """
+    rows = db.query(StockAlert, Product).join(Product, StockAlert.product_id == Product.id).filter(
+        StockAlert.resolved_at.is_(None),
+        Product.is_active == True
+    ).order_by(StockAlert.created_at).all()
+    # Concurrent checkouts can each open one; report the oldest
+    alerts = {}
+    for alert, product in rows:
+        alerts.setdefault(product.id, (alert, product))
+    levels = get_stock_levels(db, alerts)
+    return sorted(
+        [(alert, product, levels.get(product_id, 0)) for product_id, (alert, product) in alerts.items()],
+        key=lambda row: row[2]
+    )
+
+def compacted_through(db: Session) -> int:
+    """
+    Ledger id every product is compacted through (may lag behind, which only widens scans)
+    """
+    return ledger_watermark_cache.get_or_set(
+        "all", lambda: db.query(LedgerState.compacted_through).filter(LedgerState.id == 1).scalar() or 0
+    )
+
+def _advance_compacted_through(db: Session, watermark: int):
+    # Only ever forward, so a slower concurrent compactor can't move it back
+    advanced = db.query(LedgerState).filter(LedgerState.id == 1).update({
+        LedgerState.compacted_through: case(
+            (LedgerState.compacted_through < watermark, watermark), else_=LedgerState.compacted_through
+        )
+    }, synchronize_session=False)
+    if not advanced:
+        db.add(LedgerState(id=1, compacted_through=watermark))
+
+def get_low_stock(db: Session, threshold: int):
+    """
+    Active products at or below threshold by live stock, lowest first
+    """
+    # Candidates: low compacted balance (ix_products_active_stock) or recent ledger activity
+    low_ids = db.query(Product.id).filter(
+        Product.is_active == True,
+        Product.stock_quantity <= threshold
+    )
+    moved_ids = db.query(InventoryMovement.product_id).filter(
+        InventoryMovement.id > compacted_through(db)
+    ).distinct()
+    candidate_ids = {row[0] for row in low_ids.union(moved_ids).all()}
+    if not candidate_ids:
+        return []
+
+    rows = db.query(Product, live_stock().label("stock")).filter(
+        Product.id.in_(candidate_ids),
+        Product.is_active == True
+    ).all()
+    low = [(product, stock) for product, stock in rows if stock <= threshold]
+    return sorted(low, key=lambda row: row[1])
+
+def compact_movements(db: Session, batch_size: int = 500) -> int:
+    """
+    Fold settled ledger deltas into products.stock_quantity (and sales_count) and advance
+    each product's watermark, then the ledger's (ledger_state). Returns the number of products updated.
+    """
+    # Rows younger than the delay may still have uncommitted neighbours with lower ids
+    settled_before = datetime.now(timezone.utc) - timedelta(seconds=INVENTORY_COMPACTION_DELAY)
+    low = compacted_through(db)
+    watermark = db.query(func.max(InventoryMovement.id)).filter(
+        InventoryMovement.id > low,
+        InventoryMovement.created_at <= settled_before
+    ).scalar()
+    if not watermark:
+        return 0
+
+    product_ids = [row[0] for row in db.query(InventoryMovement.product_id).filter(
+        InventoryMovement.id > low,
+        InventoryMovement.id <= watermark
+    ).distinct()]
+
+    def folded(*reasons):
+        conditions = [
+            InventoryMovement.product_id == Product.id,
+            InventoryMovement.id > Product.stock_ledger_id,
+            InventoryMovement.id <= watermark
+        ]
+        if reasons:
+            conditions.append(InventoryMovement.reason.in_(reasons))
+        return select(func.coalesce(func.sum(InventoryMovement.delta), 0)).where(
+            *conditions
+        ).correlate(Product).scalar_subquery()
+
+    updated = 0
+    for start in range(0, len(product_ids), batch_size):
+        # One short UPDATE per batch; the watermark guard makes concurrent compactors harmless
+        updated += db.query(Product).filter(
+            Product.id.in_(product_ids[start:start + batch_size]),
+            Product.stock_ledger_id < watermark
+        ).update({
+            Product.stock_quantity: Product.stock_quantity + folded(),
+            # Orders take stock and cancellations return it, so units sold is the negated sum
+            Product.sales_count: Product.sales_count - folded(MovementReason.ORDER, MovementReason.CANCELLATION),
+            Product.stock_ledger_id: watermark
+        }, synchronize_session=False)
+        db.commit()
+
+    # Every product with movements up to the watermark is now folded through it
+    _advance_compacted_through(db, watermark)
+    db.commit()
+    ledger_watermark_cache.set("all", watermark)
+    return updated
@@ -1,17 +1,42 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import desc, func, insert, literal, select, union_all
+from sqlalchemy.orm import Session, joinedload, selectinload
 from fastapi import HTTPException, status
-from app.models.order import Order, OrderItem, OrderStatus
+from app.models.order import Order, OrderItem, OrderStatus, ArchivedOrder, ArchivedOrderItem, OrderRollup
 from app.models.cart import CartItem
 from app.models.product import Product
-from app.schemas.order_schema import OrderCreate, OrderUpdate
+from app.models.user import User
+from app.controllers.inventory_controller import (
+    get_stock_levels, take_stock, return_stock, check_stock_alerts, publish_stock_alerts
+)
+from app.schemas.order_schema import OrderCreate, OrderUpdate, OrderOut
+from app.utils.fieldsets import Fieldset
+from app.utils.recent_orders import recent_orders
+from app.utils.trending import RETENTION, WINDOWS, record_sales
+from app.config import ORDER_ARCHIVE_AFTER_DAYS
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+
+# Orders whose items count as sold (trending counters, top products)
+SOLD_STATUSES = {OrderStatus.CONFIRMED, OrderStatus.SHIPPED, OrderStatus.DELIVERED}
+
+# Final statuses; orders in them are moved to the archive once old enough
+ARCHIVABLE_STATUSES = {OrderStatus.DELIVERED, OrderStatus.CANCELLED}
+
+ORDER_FIELDS = Fieldset(OrderOut, Order, {
+    "order_items": lambda: selectinload(Order.order_items)
+})
+ARCHIVED_ORDER_FIELDS = Fieldset(OrderOut, ArchivedOrder, {
+    "order_items": lambda: selectinload(ArchivedOrder.order_items)
+})
 
 def create_order(db: Session, user_id: int, order: OrderCreate):
     # Get cart items
+    # In product order, so checkouts lock the same products in the same order
     cart_items = db.query(CartItem).options(
         joinedload(CartItem.product)
-    ).filter(CartItem.user_id == user_id).all()
+    ).filter(CartItem.user_id == user_id).order_by(CartItem.product_id).all()
     
     if not cart_items:
         raise HTTPException(
@@ -20,8 +45,9 @@ def create_order(db: Session, user_id: int, order: OrderCreate):
         )
     
     # Check stock availability for all items
+    stock = get_stock_levels(db, [cart_item.product_id for cart_item in cart_items])
     for cart_item in cart_items:
-        if cart_item.product.stock_quantity < cart_item.quantity:
+        if stock.get(cart_item.product_id, 0) < cart_item.quantity:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Insufficient stock for {cart_item.product.name}"
@@ -51,41 +77,84 @@ def create_order(db: Session, user_id: int, order: OrderCreate):
             order_id=db_order.id,
             product_id=cart_item.product_id,
             quantity=cart_item.quantity,
-            price=cart_item.product.price
+            price=cart_item.product.price,
+            product_name=cart_item.product.name,
+            product_sku=cart_item.product.sku,
+            product_image_url=cart_item.product.image_url
         )
         db.add(order_item)
         
-        # Update product stock
-        cart_item.product.stock_quantity -= cart_item.quantity
+        # Take the stock through the ledger (or shards); the product row itself isn't written
+        if not take_stock(db, cart_item.product, cart_item.quantity, db_order.id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Insufficient stock for {cart_item.product.name}"
+            )
+    
+    alerts = check_stock_alerts(db, [cart_item.product for cart_item in cart_items])
     
     # Clear cart
     db.query(CartItem).filter(CartItem.user_id == user_id).delete()
     
+    db.query(User).filter(User.id == user_id).update({
+        User.order_count: User.order_count + 1,
+        User.last_order_id: db_order.id,
+        User.last_order_at: func.now()
+    }, synchronize_session=False)
+    
     db.commit()
+    publish_stock_alerts(alerts)
     db.refresh(db_order)
+    recent_orders.add(_summary(db_order, db.query(User.email).filter(User.id == user_id).scalar()))
     return db_order
 
-def get_orders(db: Session, user_id: Optional[int] = None, skip: int = 0, limit: int = 100):
-    query = db.query(Order).options(
-        joinedload(Order.order_items).joinedload(OrderItem.product),
-        joinedload(Order.user)
-    )
-    
+def _history_query(db: Session, model, fieldset: Fieldset, user_id: Optional[int], fields: Optional[List[str]]):
+    if fields:
+        query = db.query(model).options(*fieldset.query_options(fields, "created_at"))
+    else:
+        # Items carry their product snapshot; no products or users are loaded
+        query = db.query(model).options(selectinload(model.order_items))
     if user_id:
-        query = query.filter(Order.user_id == user_id)
-    
-    return query.offset(skip).limit(limit).all()
+        query = query.filter(model.user_id == user_id)
+    return query.order_by(desc(model.created_at), desc(model.id))
+
+def get_orders(db: Session, user_id: Optional[int] = None, skip: int = 0, limit: int = 100,
+               fields: Optional[List[str]] = None, archived_count: Optional[int] = None):
+    """
+    Newest first, live and archived orders together. Pass the user's archived_order_count
+    when it is known: with nothing archived the archive isn't queried at all.
+    """
+    if archived_count == 0:
+        return _history_query(db, Order, ORDER_FIELDS, user_id, fields).offset(skip).limit(limit).all()
+
+    # Orders still pending or in transit stay live while newer ones may already be archived,
+    # so the page is cut from both tables merged by created_at, then loaded from each
+    def tier(model, archived: int):
+        query = select(model.id, model.created_at, literal(archived).label("archived"))
+        return query.where(model.user_id == user_id) if user_id else query
+    merged = union_all(tier(Order, 0), tier(ArchivedOrder, 1)).subquery()
+    page = db.execute(select(merged.c.id, merged.c.archived).order_by(
+        desc(merged.c.created_at), desc(merged.c.id)
+    ).offset(skip).limit(limit)).all()
+
+    loaded = {}
+    for archived, model, fieldset in ((0, Order, ORDER_FIELDS), (1, ArchivedOrder, ARCHIVED_ORDER_FIELDS)):
+        ids = [order_id for order_id, in_archive in page if in_archive == archived]
+        if ids:
+            for order in _history_query(db, model, fieldset, user_id, fields).filter(model.id.in_(ids)):
+                loaded[archived, order.id] = order
+    return [loaded[in_archive, order_id] for order_id, in_archive in page if (in_archive, order_id) in loaded]
+
+def get_order_by_id(db: Session, order_id: int, user_id: Optional[int] = None, include_archived: bool = True):
+    order = None
+    for model in (Order, ArchivedOrder) if include_archived else (Order,):
+        query = db.query(model).options(selectinload(model.order_items)).filter(model.id == order_id)
+        if user_id:
+            query = query.filter(model.user_id == user_id)
+        order = query.first()
+        if order:
+            break
 
-def get_order_by_id(db: Session, order_id: int, user_id: Optional[int] = None):
-    query = db.query(Order).options(
-        joinedload(Order.order_items).joinedload(OrderItem.product),
-        joinedload(Order.user)
-    ).filter(Order.id == order_id)
-    
-    if user_id:
-        query = query.filter(Order.user_id == user_id)
-    
-    order = query.first()
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -95,13 +164,26 @@ def get_order_by_id(db: Session, order_id: int, user_id: Optional[int] = None):
 
 def update_order(db: Session, order_id: int, order_update: OrderUpdate):
     order = get_order_by_id(db, order_id)
+    if isinstance(order, ArchivedOrder):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Archived orders can't be changed"
+        )
     
     update_data = order_update.dict(exclude_unset=True)
+    if update_data.get("status") is not None:
+        # The schema enum carries the same values as the model's
+        update_data["status"] = OrderStatus(update_data["status"])
+    was_sold = order.status in SOLD_STATUSES
     for field, value in update_data.items():
         setattr(order, field, value)
     
     db.commit()
     db.refresh(order)
+    if "status" in update_data:
+        recent_orders.update(order.id, status=order.status.value)
+    if was_sold != (order.status in SOLD_STATUSES):
+        _record_sales(order, 1 if order.status in SOLD_STATUSES else -1)
     return order
 
 def cancel_order(db: Session, order_id: int, user_id: Optional[int] = None):
@@ -113,13 +195,136 @@ def cancel_order(db: Session, order_id: int, user_id: Optional[int] = None):
             detail="Cannot cancel order that is already shipped or delivered"
         )
     
-    # Restore stock
+    # Return the stock through the ledger; one query for the products still around
+    products = {product.id: product for product in db.query(Product).filter(
+        Product.id.in_({order_item.product_id for order_item in order.order_items})
+    )}
     for order_item in order.order_items:
-        product = db.query(Product).filter(Product.id == order_item.product_id).first()
-        if product:
-            product.stock_quantity += order_item.quantity
+        if order_item.product_id in products:
+            return_stock(db, products[order_item.product_id], order_item.quantity, order.id)
     
+    alerts = check_stock_alerts(db, products.values())
+    was_sold = order.status in SOLD_STATUSES
     order.status = OrderStatus.CANCELLED
     db.commit()
+    publish_stock_alerts(alerts)
     db.refresh(order)
+    recent_orders.update(order.id, status=order.status.value)
+    if was_sold:
+        _record_sales(order, -1)
     return order
+
+def backfill_trending(db: Session) -> int:
+    """
+    Rebuild the sales counters from the sold orders still inside a window (at most a week
+    and a day old), e.g. after a restart emptied the in-memory counters. Returns the units loaded.
+    """
+    slot = min(bucket for _, bucket in WINDOWS.values())
+    since = datetime.now(timezone.utc) - timedelta(seconds=max(RETENTION.values()))
+    # Summed per smallest bucket first, so the counters take one update per bucket, not per item
+    slots: Dict[int, Counter] = {}
+    rows = db.query(Order.created_at, OrderItem.product_id, OrderItem.quantity).join(
+        OrderItem, OrderItem.order_id == Order.id
+    ).filter(
+        Order.status.in_(SOLD_STATUSES),
+        Order.created_at >= since
+    ).yield_per(10_000)
+    units = 0
+    for created_at, product_id, quantity in rows:
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        slots.setdefault(int(created_at.timestamp() // slot), Counter())[product_id] += quantity
+        units += quantity
+    for index, counts in slots.items():
+        record_sales(counts, datetime.fromtimestamp(index * slot, timezone.utc))
+    return units
+
+def _record_sales(order: Order, sign: int):
+    """
+    Count (or take back) an order's units in the trending counters. Sales are bucketed by
+    the order's creation time, so a later cancellation cancels out in the same buckets.
+    """
+    counts = {}
+    for order_item in order.order_items:
+        counts[order_item.product_id] = counts.get(order_item.product_id, 0) + sign * order_item.quantity
+    record_sales(counts, order.created_at)
+
+def _summary(order, user_email: Optional[str]) -> Dict[str, Any]:
+    return {
+        "id": order.id,
+        "user_id": order.user_id,
+        "total_amount": float(order.total_amount),
+        "status": order.status.value,
+        "created_at": order.created_at,
+        "user_email": user_email
+    }
+
+def load_recent_orders(db: Session, limit: int) -> List[Dict[str, Any]]:
+    """
+    Newest order summaries from one joined projection (no Order or User entities loaded)
+    """
+    rows = db.query(
+        Order.id, Order.user_id, Order.total_amount, Order.status, Order.created_at, User.email
+    ).outerjoin(User, Order.user_id == User.id).order_by(
+        desc(Order.created_at), desc(Order.id)
+    ).limit(limit).all()
+    return [_summary(row, row.email) for row in rows]
+
+def get_recent_orders(db: Session, limit: int) -> List[Dict[str, Any]]:
+    return recent_orders.get(limit, lambda size: load_recent_orders(db, size))
+
+def as_date(day) -> date:
+    # func.date() comes back as a string on SQLite
+    return date.fromisoformat(day) if isinstance(day, str) else day
+
+def archive_orders(db: Session, batch_size: int = 500) -> int:
+    """
+    Move DELIVERED/CANCELLED orders older than ORDER_ARCHIVE_AFTER_DAYS, with their items,
+    into the archive tables, add them to order_rollups and to their users' archived_order_count.
+    One transaction per batch.
+    Returns the number of orders archived.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=ORDER_ARCHIVE_AFTER_DAYS)
+    order_columns = [column.name for column in Order.__table__.columns]
+    item_columns = [column.name for column in OrderItem.__table__.columns]
+    archived = 0
+    while True:
+        # ix_orders_status_created; other archivers skip the rows this one holds
+        order_ids = [row[0] for row in db.query(Order.id).filter(
+            Order.status.in_(ARCHIVABLE_STATUSES),
+            Order.created_at < cutoff
+        ).order_by(Order.id).limit(batch_size).with_for_update(skip_locked=True)]
+        if not order_ids:
+            return archived
+
+        db.execute(insert(ArchivedOrder).from_select(
+            order_columns, db.query(*[Order.__table__.c[name] for name in order_columns]).filter(Order.id.in_(order_ids))
+        ))
+        db.execute(insert(ArchivedOrderItem).from_select(
+            item_columns, db.query(*[OrderItem.__table__.c[name] for name in item_columns]).filter(OrderItem.order_id.in_(order_ids))
+        ))
+
+        day = func.date(Order.created_at)
+        totals = db.query(day, Order.status, func.count(Order.id), func.coalesce(func.sum(Order.total_amount), 0)).filter(
+            Order.id.in_(order_ids)
+        ).group_by(day, Order.status).all()
+        for order_day, order_status, count, revenue in totals:
+            rollup = db.get(OrderRollup, (as_date(order_day), order_status), with_for_update=True)
+            if rollup is None:
+                rollup = OrderRollup(day=as_date(order_day), status=order_status, order_count=0, revenue=0)
+                db.add(rollup)
+            rollup.order_count += count
+            rollup.revenue += Decimal(str(revenue))
+
+        per_user = db.query(Order.user_id, func.count(Order.id)).filter(
+            Order.id.in_(order_ids)
+        ).group_by(Order.user_id).order_by(Order.user_id).all()
+        for user_id, count in per_user:
+            db.query(User).filter(User.id == user_id).update({
+                User.archived_order_count: User.archived_order_count + count
+            }, synchronize_session=False)
+
+        db.query(OrderItem).filter(OrderItem.order_id.in_(order_ids)).delete(synchronize_session=False)
+        db.query(Order).filter(Order.id.in_(order_ids)).delete(synchronize_session=False)
+        db.commit()
+        archived += len(order_ids)
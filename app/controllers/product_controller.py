@@ -1,9 +1,64 @@
+from sqlalchemy import case, func, tuple_
 from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException, status
 from app.models.product import Product
 from app.models.category import Category
-from app.schemas.product_schema import ProductCreate, ProductUpdate
-from typing import Optional
+from app.models.inventory import MovementReason
+from app.controllers.inventory_controller import (
+    record_movement, live_stock, with_live_stock, set_stock_shards, adjust_stock, check_stock_alerts, publish_stock_alerts
+)
+from app.controllers.category_controller import get_subtree_ids
+from app.utils.cache import category_tree_cache, facet_cache, product_cache
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.fieldsets import Fieldset
+from app.utils.trending import top_products
+from app.schemas.product_schema import ProductCreate, ProductUpdate, ProductWithCategory
+from app.config import PRICE_FACET_BUCKETS
+from decimal import Decimal
+from typing import List, Optional
+
+MAX_BATCH_IDS = 100
+
+# sort -> (descending, key columns); every key ends in id so the order is total
+PRODUCT_SORTS = {
+    "default": (False, (Product.id,)),
+    "price_asc": (False, (Product.price, Product.id)),
+    "price_desc": (True, (Product.price, Product.id)),
+    "newest": (True, (Product.created_at, Product.id)),
+    "best_selling": (True, (Product.sales_count, Product.id)),
+    "top_rated": (True, (Product.rating_avg, Product.review_count, Product.id)),
+}
+
+PRODUCT_FIELDS = Fieldset(ProductWithCategory, Product, {
+    "category": lambda: joinedload(Product.category)
+})
+
+def _list_options(sort: Optional[str], fields: Optional[List[str]]):
+    if not fields:
+        return [joinedload(Product.category)]
+    # Sort keys stay loaded so the next cursor can be built
+    _, columns = PRODUCT_SORTS[sort or "default"]
+    return PRODUCT_FIELDS.query_options(fields, *[column.key for column in columns])
+
+def _apply_sort(query, sort: Optional[str], skip: int, limit: int, cursor: Optional[str]):
+    descending, columns = PRODUCT_SORTS[sort or "default"]
+    if cursor:
+        # Keyset: continue strictly after the last row of the previous page, skip is ignored
+        after = decode_cursor(cursor, sort or "default", len(columns))
+        key = tuple_(*columns)
+        query = query.filter(key < tuple_(*after) if descending else key > tuple_(*after))
+        skip = 0
+    query = query.order_by(*[column.desc() if descending else column.asc() for column in columns])
+    return query.offset(skip).limit(limit)
+
+def next_cursor(items, sort: Optional[str], limit: int) -> Optional[str]:
+    """
+    Cursor for the page after `items`, or None once a short page shows the listing is exhausted
+    """
+    if len(items) < limit:
+        return None
+    _, columns = PRODUCT_SORTS[sort or "default"]
+    return encode_cursor(sort or "default", [getattr(items[-1], column.key) for column in columns])
 
 def create_product(db: Session, product: ProductCreate):
     # Check if category exists
@@ -24,21 +79,36 @@ def create_product(db: Session, product: ProductCreate):
     
     db_product = Product(**product.dict())
     db.add(db_product)
+    db.flush()
+    # Opening stock goes on the ledger already compacted into the balance
+    movement = record_movement(db, db_product.id, db_product.stock_quantity or 0, MovementReason.INITIAL)
+    db.flush()
+    db_product.stock_ledger_id = movement.id
+    alerts = check_stock_alerts(db, [db_product])
     db.commit()
+    publish_stock_alerts(alerts)
     db.refresh(db_product)
+    category_tree_cache.clear()
+    facet_cache.clear()
     return db_product
 
 def get_products(db: Session, skip: int = 0, limit: int = 100, 
-                category_id: Optional[int] = None, active_only: bool = True):
-    query = db.query(Product).options(joinedload(Product.category))
+                category_id: Optional[int] = None, active_only: bool = True,
+                include_descendants: bool = False, sort: Optional[str] = None,
+                cursor: Optional[str] = None, fields: Optional[List[str]] = None):
+    query = db.query(Product).options(*_list_options(sort, fields))
     
     if active_only:
         query = query.filter(Product.is_active == True)
     
     if category_id:
-        query = query.filter(Product.category_id == category_id)
+        if include_descendants:
+            # Resolved through the closure table in the same query
+            query = query.filter(Product.category_id.in_(get_subtree_ids(db, category_id)))
+        else:
+            query = query.filter(Product.category_id == category_id)
     
-    return query.offset(skip).limit(limit).all()
+    return with_live_stock(db, _apply_sort(query, sort, skip, limit, cursor).all())
 
 def get_product_by_id(db: Session, product_id: int):
     product = db.query(Product).options(
@@ -51,7 +121,54 @@ def get_product_by_id(db: Session, product_id: int):
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found"
         )
-    return product
+    return with_live_stock(db, [product])[0]
+
+def get_products_by_ids(db: Session, product_ids: List[int]):
+    """
+    Products in request order plus the ids that don't exist; one IN query for cache misses
+    """
+    if len(product_ids) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_IDS} ids per request"
+        )
+
+    found = {}
+    misses = []
+    for product_id in dict.fromkeys(product_ids):
+        cached = product_cache.get(product_id)
+        if cached is not None:
+            found[product_id] = cached
+        else:
+            misses.append(product_id)
+
+    if misses:
+        versions = {product_id: product_cache.version(product_id) for product_id in misses}
+        products = db.query(Product).options(joinedload(Product.category)).filter(
+            Product.id.in_(misses)
+        ).all()
+        for product in with_live_stock(db, products):
+            found[product.id] = ProductWithCategory.model_validate(product)
+            product_cache.set(product.id, found[product.id], versions[product.id])
+
+    return {
+        "items": [found[product_id] for product_id in product_ids if product_id in found],
+        "missing": [product_id for product_id in dict.fromkeys(product_ids) if product_id not in found]
+    }
+
+
+def get_trending_products(db: Session, window: str, limit: int):
+    """
+    Best sellers of the window from the sales counters; product details come from product_cache
+    """
+    ranking = top_products(window, limit * 2)
+    products = {product.id: product for product in get_products_by_ids(db, [product_id for product_id, _ in ranking])["items"]}
+    trending = [
+        {"product": products[product_id], "units_sold": units}
+        for product_id, units in ranking
+        if product_id in products and products[product_id].is_active
+    ]
+    return trending[:limit]
 
 def get_product_by_sku(db: Session, sku: str):
     product = db.query(Product).filter(Product.sku == sku).first()
@@ -60,7 +177,7 @@ def get_product_by_sku(db: Session, sku: str):
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found"
         )
-    return product
+    return with_live_stock(db, [product])[0]
 
 def update_product(db: Session, product_id: int, product_update: ProductUpdate):
     product = get_product_by_id(db, product_id)
@@ -84,11 +201,24 @@ def update_product(db: Session, product_id: int, product_update: ProductUpdate):
             )
     
     update_data = product_update.dict(exclude_unset=True)
+    # Stock isn't written in place: changes go through the ledger and the shards
+    new_shards = update_data.pop("stock_shards", None)
+    new_stock = update_data.pop("stock_quantity", None)
+    if new_shards is not None:
+        set_stock_shards(db, product, new_shards)
+    if new_stock is not None:
+        adjust_stock(db, product, new_stock)
     for field, value in update_data.items():
         setattr(product, field, value)
+    alerts = check_stock_alerts(db, [product])
     
     db.commit()
+    publish_stock_alerts(alerts)
     db.refresh(product)
+    with_live_stock(db, [product])
+    category_tree_cache.clear()
+    facet_cache.clear()
+    product_cache.invalidate(product.id)
     return product
 
 def delete_product(db: Session, product_id: int):
@@ -97,13 +227,90 @@ def delete_product(db: Session, product_id: int):
     # Soft delete by setting is_active to False
     product.is_active = False
     db.commit()
+    category_tree_cache.clear()
+    facet_cache.clear()
+    product_cache.invalidate(product_id)
     return {"message": "Product deleted successfully"}
 
-def search_products(db: Session, query: str, skip: int = 0, limit: int = 100):
-    products = db.query(Product).options(joinedload(Product.category)).filter(
+def search_products(db: Session, query: str, skip: int = 0, limit: int = 100,
+                    fields: Optional[List[str]] = None):
+    products = db.query(Product).options(*_list_options(None, fields)).filter(
         Product.is_active == True,
         (Product.name.ilike(f"%{query}%") | 
          Product.description.ilike(f"%{query}%"))
     ).offset(skip).limit(limit).all()
     
-    return products
+    return with_live_stock(db, products)
+
+def _browse_filters(db: Session, category_id: Optional[int], include_descendants: bool,
+                    min_price: Optional[Decimal], max_price: Optional[Decimal],
+                    in_stock: Optional[bool], min_rating: Optional[float]):
+    filters = [Product.is_active == True]
+    if category_id:
+        if include_descendants:
+            filters.append(Product.category_id.in_(get_subtree_ids(db, category_id)))
+        else:
+            filters.append(Product.category_id == category_id)
+    if min_price is not None:
+        filters.append(Product.price >= min_price)
+    if max_price is not None:
+        filters.append(Product.price <= max_price)
+    if in_stock is not None:
+        # Live stock, so products sold out since the last compaction don't count as in stock
+        filters.append(live_stock() > 0 if in_stock else live_stock() <= 0)
+    if min_rating is not None:
+        filters.append(Product.rating_avg >= min_rating)
+    return filters
+
+def _facet_counts(db: Session, filters):
+    # Every facet comes out of one GROUP BY over (category, price bucket, in stock)
+    price_bucket = case(
+        *[(Product.price < bound, index) for index, bound in enumerate(PRICE_FACET_BUCKETS)],
+        else_=len(PRICE_FACET_BUCKETS)
+    ).label("price_bucket")
+    stocked = case((live_stock() > 0, 1), else_=0).label("stocked")
+    rows = db.query(
+        Product.category_id, price_bucket, stocked, func.count(Product.id)
+    ).filter(*filters).group_by(Product.category_id, price_bucket, stocked).all()
+
+    categories = {}
+    buckets = [0] * (len(PRICE_FACET_BUCKETS) + 1)
+    availability = {"in_stock": 0, "out_of_stock": 0}
+    for category_id, bucket, is_stocked, count in rows:
+        categories[category_id] = categories.get(category_id, 0) + count
+        buckets[bucket] += count
+        availability["in_stock" if is_stocked else "out_of_stock"] += count
+
+    bounds = [None] + PRICE_FACET_BUCKETS + [None]
+    return {
+        "categories": [
+            {"category_id": category_id, "count": count}
+            for category_id, count in sorted(categories.items(), key=lambda item: -item[1])
+            if category_id is not None
+        ],
+        "price_buckets": [
+            {"min": bounds[index], "max": bounds[index + 1], "count": count}
+            for index, count in enumerate(buckets)
+        ],
+        "availability": availability
+    }
+
+def browse_products(db: Session, skip: int = 0, limit: int = 24,
+                    category_id: Optional[int] = None, include_descendants: bool = False,
+                    min_price: Optional[Decimal] = None, max_price: Optional[Decimal] = None,
+                    in_stock: Optional[bool] = None, min_rating: Optional[float] = None,
+                    sort: Optional[str] = None, cursor: Optional[str] = None):
+    filters = _browse_filters(db, category_id, include_descendants, min_price, max_price, in_stock, min_rating)
+
+    facet_key = (category_id, include_descendants, min_price, max_price, in_stock, min_rating)
+    facets = facet_cache.get_or_set(facet_key, lambda: _facet_counts(db, filters))
+
+    query = db.query(Product).options(joinedload(Product.category)).filter(*filters)
+    items = with_live_stock(db, _apply_sort(query, sort, skip, limit, cursor).all())
+
+    return {
+        "items": items,
+        "total": facets["availability"]["in_stock"] + facets["availability"]["out_of_stock"],
+        "facets": facets,
+        "next_cursor": next_cursor(items, sort, limit)
+    }
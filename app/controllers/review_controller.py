@@ -1,9 +1,27 @@
+from sqlalchemy import case
 from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException, status
 from app.models.review import Review
 from app.models.product import Product
-from app.models.order import Order, OrderItem
-from app.schemas.review_schema import ReviewCreate, ReviewUpdate
+from app.models.order import Order, OrderItem, ArchivedOrder, ArchivedOrderItem
+from app.schemas.review_schema import ReviewCreate, ReviewUpdate, ReviewOut
+from app.utils.fieldsets import Fieldset
+from typing import List, Optional
+
+REVIEW_FIELDS = Fieldset(ReviewOut, Review, {
+    "user": lambda: joinedload(Review.user),
+    "product": lambda: joinedload(Review.product)
+})
+
+def _adjust_rating(db: Session, product_id: int, rating_delta: int, count_delta: int):
+    # Single UPDATE so concurrent reviews can't lose an increment; rating_avg feeds the browse filter
+    new_total = Product.rating_total + rating_delta
+    new_count = Product.review_count + count_delta
+    db.query(Product).filter(Product.id == product_id).update({
+        Product.rating_total: new_total,
+        Product.review_count: new_count,
+        Product.rating_avg: case((new_count > 0, new_total * 1.0 / new_count), else_=0)
+    }, synchronize_session=False)
 
 def create_review(db: Session, user_id: int, review: ReviewCreate):
     # Check if product exists
@@ -18,6 +36,9 @@ def create_review(db: Session, user_id: int, review: ReviewCreate):
     order_item = db.query(OrderItem).join(Order).filter(
         Order.user_id == user_id,
         OrderItem.product_id == review.product_id
+    ).first() or db.query(ArchivedOrderItem).join(ArchivedOrder).filter(
+        ArchivedOrder.user_id == user_id,
+        ArchivedOrderItem.product_id == review.product_id
     ).first()
     
     if not order_item:
@@ -47,16 +68,20 @@ def create_review(db: Session, user_id: int, review: ReviewCreate):
     
     db_review = Review(user_id=user_id, **review.dict())
     db.add(db_review)
+    _adjust_rating(db, review.product_id, review.rating, 1)
     db.commit()
     db.refresh(db_review)
     return db_review
 
 def get_reviews(db: Session, product_id: int = None, user_id: int = None, 
-                skip: int = 0, limit: int = 100):
-    query = db.query(Review).options(
-        joinedload(Review.user),
-        joinedload(Review.product)
-    )
+                skip: int = 0, limit: int = 100, fields: Optional[List[str]] = None):
+    if fields:
+        query = db.query(Review).options(*REVIEW_FIELDS.query_options(fields))
+    else:
+        query = db.query(Review).options(
+            joinedload(Review.user),
+            joinedload(Review.product)
+        )
     
     if product_id:
         query = query.filter(Review.product_id == product_id)
@@ -99,6 +124,8 @@ def update_review(db: Session, review_id: int, user_id: int, review_update: Revi
         )
     
     update_data = review_update.dict(exclude_unset=True)
+    if update_data.get("rating") and update_data["rating"] != review.rating:
+        _adjust_rating(db, review.product_id, update_data["rating"] - review.rating, 0)
     for field, value in update_data.items():
         setattr(review, field, value)
     
@@ -119,5 +146,6 @@ def delete_review(db: Session, review_id: int, user_id: int):
         )
     
     db.delete(review)
+    _adjust_rating(db, review.product_id, -review.rating, -1)
     db.commit()
     return {"message": "Review deleted successfully"}
@@ -1,9 +1,14 @@
+import uuid
+from typing import Optional
+from datetime import datetime, timedelta, timezone
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from app.models.user import User
+from app.models.user import User, RefreshToken
 from app.schemas.user_schema import UserCreate, UserUpdate
 from passlib.hash import bcrypt
-from app.utils.jwt_handler import create_token
+from app.config import ACCESS_TOKEN_MINUTES, REFRESH_TOKEN_DAYS
+from app.utils.jwt_handler import create_access_token, create_refresh_token, verify_token
+from app.utils.revocation import revoke_token, revoke_user_version
 
 def create_user(db: Session, user: UserCreate):
     # Check if email already exists
@@ -41,12 +46,8 @@ def login_user(db: Session, email: str, password: str):
             detail="Invalid credentials"
         )
     
-    token_data = {"sub": str(user.id), "email": user.email}
-    access_token = create_token(token_data)
-    
     return {
-        "access_token": access_token,
-        "token_type": "bearer",
+        **_issue_tokens(db, user, family=uuid.uuid4().hex),
         "user": {
             "id": user.id,
             "username": user.username,
@@ -55,6 +56,86 @@ def login_user(db: Session, email: str, password: str):
         }
     }
 
+def _issue_tokens(db: Session, user: User, family: str):
+    jti = uuid.uuid4().hex
+    db.add(RefreshToken(
+        jti=jti,
+        user_id=user.id,
+        family=family,
+        expires_at=datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_DAYS)
+    ))
+    db.commit()
+    return {
+        "access_token": create_access_token(user.id, user.email, user.is_admin, user.token_version),
+        "refresh_token": create_refresh_token(user.id, user.token_version, family, jti),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_MINUTES * 60
+    }
+
+def _revoke_family(db: Session, family: str):
+    db.query(RefreshToken).filter(
+        RefreshToken.family == family,
+        RefreshToken.revoked_at.is_(None)
+    ).update({RefreshToken.revoked_at: datetime.now(timezone.utc)}, synchronize_session=False)
+
+def refresh_tokens(db: Session, refresh_token: str):
+    """
+    Swap a refresh token for a new access and refresh token. Refresh tokens are single use:
+    presenting one a second time revokes every token descended from the same login.
+    """
+    invalid = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token"
+    )
+    try:
+        claims = verify_token(refresh_token)
+    except Exception:
+        raise invalid
+    if claims.get("type") != "refresh":
+        raise invalid
+
+    stored = db.query(RefreshToken).filter(RefreshToken.jti == claims.get("jti")).with_for_update().first()
+    if stored is None or stored.revoked_at is not None:
+        raise invalid
+    if stored.used_at is not None:
+        _revoke_family(db, stored.family)
+        db.commit()
+        raise invalid
+
+    user = db.query(User).filter(User.id == stored.user_id).first()
+    if user is None or not user.is_active or user.token_version != claims.get("ver"):
+        stored.revoked_at = datetime.now(timezone.utc)
+        db.commit()
+        raise invalid
+
+    stored.used_at = datetime.now(timezone.utc)
+    return _issue_tokens(db, user, stored.family)
+
+def logout(db: Session, jti: str, expires_at: float, refresh_token: Optional[str] = None):
+    """
+    Revoke the presented access token and, if given, the refresh token's whole family
+    """
+    revoke_token(jti, expires_at)
+    if refresh_token:
+        try:
+            claims = verify_token(refresh_token)
+        except Exception:
+            claims = {}
+        if claims.get("type") == "refresh" and claims.get("fam"):
+            _revoke_family(db, claims["fam"])
+            db.commit()
+    return {"message": "Logged out"}
+
+def _revoke_sessions(db: Session, user: User):
+    """
+    Invalidate every token the user holds: access tokens through the revocation list,
+    refresh tokens through the version check on refresh. Commits.
+    """
+    old_version = user.token_version
+    user.token_version = old_version + 1
+    db.commit()
+    revoke_user_version(user.id, old_version)
+
 def get_users(db: Session, skip: int = 0, limit: int = 100):
     return db.query(User).offset(skip).limit(limit).all()
 
@@ -101,7 +182,7 @@ def delete_user(db: Session, user_id: int):
     
     # Soft delete by setting is_active to False
     user.is_active = False
-    db.commit()
+    _revoke_sessions(db, user)
     return {"message": "User deactivated successfully"}
 
 def activate_user(db: Session, user_id: int):
@@ -114,6 +195,7 @@ def activate_user(db: Session, user_id: int):
 def make_admin(db: Session, user_id: int):
     user = get_user_by_id(db, user_id)
     user.is_admin = True
+    # Access tokens carry the role: it takes effect at the user's next refresh
     db.commit()
     db.refresh(user)
     return user
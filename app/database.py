@@ -1,8 +1,156 @@
-from sqlalchemy import create_engine
+import itertools
+import threading
+import time
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from app.config import DATABASE_URL
+from sqlalchemy.orm import sessionmaker, Session
+from app.config import (
+    DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW,
+    DATABASE_REPLICA_URLS, REPLICA_MAX_LAG_SECONDS, REPLICA_LAG_CHECK_INTERVAL
+)
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
\ No newline at end of file
+def _engine_options(url: str) -> dict:
+    # SQLite uses its own pool classes that don't take sizing arguments
+    if url.startswith("sqlite"):
+        return {}
+    return {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW, "pool_pre_ping": True}
+
+class ReplicaRouter:
+    """
+    Round-robin over read replicas, skipping any that lag too far behind the primary.
+    Lag is measured off the request path (refresh, run by app.utils.replica_monitor); a
+    replica without a reading from the last few intervals counts as unusable, so one that
+    stops answering is skipped instead of stalling requests.
+    """
+    stale_after = 3  # check intervals
+
+    def __init__(self, engines, max_lag: float, check_interval: float):
+        self.engines = engines
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._cycle = itertools.cycle(range(len(engines)))
+        # engine -> (lag in seconds or None when unreachable, monotonic time measured)
+        self._lag = {}
+        self._lock = threading.Lock()
+
+    def choose(self):
+        for _ in range(len(self.engines)):
+            with self._lock:
+                engine = self.engines[next(self._cycle)]
+            if self.is_usable(engine):
+                return engine
+        # Every replica is lagging, down or not measured yet: the caller falls back to the primary
+        return None
+
+    def is_usable(self, engine) -> bool:
+        lag, measured_at = self._lag.get(engine, (None, float("-inf")))
+        if time.monotonic() - measured_at > self.check_interval * self.stale_after:
+            return False
+        return lag is not None and lag <= self.max_lag
+
+    def refresh(self, engine):
+        self.set_lag(engine, self.measure_lag(engine))
+
+    def measure_lag(self, engine):
+        try:
+            with engine.connect() as conn:
+                if conn.dialect.name == "postgresql":
+                    # An idle primary replays nothing, so only count lag while WAL is pending
+                    return float(conn.execute(text(
+                        "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                        "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+                    )).scalar())
+                conn.execute(text("SELECT 1"))
+                return 0.0
+        except Exception:
+            return None
+
+    def set_lag(self, engine, lag):
+        # Also lets operators (and tests) mark a replica as lagging until the next check
+        self._lag[engine] = (lag, time.monotonic())
+
+class ReadOnlySessionError(Exception):
+    pass
+
+def _read_only_engine(bind):
+    # psycopg2 then opens every transaction with BEGIN READ ONLY, without an extra round trip;
+    # other databases rely on the session guards below
+    if bind.dialect.name == "postgresql":
+        return bind.execution_options(postgresql_readonly=True)
+    return bind
+
+class RoutingSession(Session):
+    """
+    Sends reads to a replica when the session opted in with info["use_replica"].
+    Flushes, DML and everything after the first write go to the primary.
+    Sessions with info["read_only"] run read-only transactions and refuse to write.
+    """
+    def get_bind(self, mapper=None, clause=None, **kw):
+        bind = engine
+        if replica_router and self.info.get("use_replica") and not self.info.get("wrote") and not self._flushing:
+            # Stick to one replica for the life of the session
+            if "replica" not in self.info:
+                self.info["replica"] = replica_router.choose()
+            if self.info["replica"] is not None:
+                bind = self.info["replica"]
+        if self.info.get("read_only"):
+            return read_only_engines[bind]
+        return bind
+
+@event.listens_for(RoutingSession, "before_flush")
+def _pin_to_primary_on_flush(session, flush_context, instances):
+    if session.new or session.dirty or session.deleted:
+        if session.info.get("read_only"):
+            raise ReadOnlySessionError("Tried to flush changes in a read-only session")
+        session.info["wrote"] = True
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _pin_to_primary_on_write(orm_execute_state):
+    if not orm_execute_state.is_select:
+        if orm_execute_state.session.info.get("read_only") and (
+            orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete
+        ):
+            raise ReadOnlySessionError("Tried to write in a read-only session")
+        orm_execute_state.session.info["wrote"] = True
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+replica_engines = [create_engine(url, **_engine_options(url)) for url in DATABASE_REPLICA_URLS]
+replica_router = ReplicaRouter(
+    replica_engines, REPLICA_MAX_LAG_SECONDS, REPLICA_LAG_CHECK_INTERVAL
+) if replica_engines else None
+read_only_engines = {bind: _read_only_engine(bind) for bind in [engine, *replica_engines]}
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+Base = declarative_base()
+
+def all_engines():
+    return [engine, *replica_engines]
+
+# Requests that must not change anything; their sessions run read-only transactions
+READ_ONLY_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+def get_db(request: Request):
+    """
+    The request's session. FastAPI caches dependencies per request, so auth and the route
+    share one session (and the user object it loaded); no connection is checked out until
+    the first query, so requests answered from a cache never touch the pool.
+
+    Controllers commit their own work. An exception escaping the route rolls back whatever
+    is left, and closing the session returns the connection.
+    """
+    db = SessionLocal(info={"read_only": request.method in READ_ONLY_METHODS})
+    try:
+        yield db
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def get_read_db(db: Session = Depends(get_db)):
+    """
+    The request's session, allowed to read from a replica until it writes
+    """
+    db.info["use_replica"] = True
+    return db
@@ -1,17 +1,59 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from app.routes import (
     user_routes, category_routes, product_routes, cart_routes, 
-    order_routes, address_routes, review_routes, payment_routes, admin_routes
+    order_routes, address_routes, review_routes, payment_routes, admin_routes, image_routes
 )
-from app.database import engine, Base
-from app.models import user, category, product, address, cart, order, review
-import sys
+from app.database import all_engines, replica_router
+from app.models import user, category, product, address, cart, order, review, inventory
+from app.config import (
+    QUERY_PROFILER_ENABLED, STARTUP_WARMUP, DB_POOL_WARMUP, INVENTORY_COMPACTION_INTERVAL, ORDER_ARCHIVE_INTERVAL,
+    LOAD_SHED_SATURATION, JWKS_MAX_AGE, TRENDING_BACKEND
+)
+from app.utils.cache import start_invalidation_listener, stop_invalidation_listener
+from app.utils.health import readiness, install_load_shedding
+from app.utils.signing_keys import jwks, signing_key
+from app.utils.trending import backfill_once as backfill_trending
+from app.utils.image_store import image_store
+from app.utils.inventory_compactor import run_compactor
+from app.utils.order_archiver import run_archiver
+from app.utils.query_profiler import install_query_profiler
+from app.utils.replica_monitor import run_replica_monitor
+from app.utils.warmup import warm_up
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Refuse to start without the active signing key rather than failing the first login
+    signing_key()
+    start_invalidation_listener()
+    # Replicas take reads once their first lag reading is in
+    replica_monitor = asyncio.create_task(run_replica_monitor(replica_router)) if replica_router else None
+    if STARTUP_WARMUP:
+        await run_in_threadpool(warm_up, app, all_engines(), DB_POOL_WARMUP)
+    # In-process counters start empty; refill them before the first trending or top-products request
+    if TRENDING_BACKEND == "memory":
+        await run_in_threadpool(backfill_trending)
+    compactor = asyncio.create_task(run_compactor(INVENTORY_COMPACTION_INTERVAL)) if INVENTORY_COMPACTION_INTERVAL > 0 else None
+    archiver = asyncio.create_task(run_archiver(ORDER_ARCHIVE_INTERVAL)) if ORDER_ARCHIVE_INTERVAL > 0 else None
+    yield
+    for task in (replica_monitor, compactor, archiver):
+        if task:
+            task.cancel()
+    image_store.shutdown()
+    stop_invalidation_listener()
+    # Close pooled connections so the database sees a clean disconnect
+    for engine in all_engines():
+        engine.dispose()
 
 app = FastAPI(
     title="E-commerce API",
     description="A comprehensive e-commerce API built with FastAPI",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -23,10 +65,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
+# Per-request query counting and budget enforcement
+if QUERY_PROFILER_ENABLED:
+    install_query_profiler(app)
 
-print("PYTHONPATH:", sys.path)
+# 503 for low-priority requests while the connection pool is nearly exhausted
+if LOAD_SHED_SATURATION > 0:
+    install_load_shedding(app)
 
 # Include routers
 app.include_router(user_routes.router, prefix="/api/users", tags=["Users"])
@@ -38,15 +83,35 @@ app.include_router(address_routes.router, prefix="/api/addresses", tags=["Addres
 app.include_router(review_routes.router, prefix="/api/reviews", tags=["Reviews"])
 app.include_router(payment_routes.router, prefix="/api/payments", tags=["Payments"])
 app.include_router(admin_routes.router, prefix="/api/admin", tags=["Admin"])
+app.include_router(image_routes.router, prefix="/api/images", tags=["Images"])
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to E-commerce API"}
 
 @app.get("/health")
+@app.get("/health/live")
 def health_check():
+    """
+    Liveness: the process is up and serving; touches no dependencies
+    """
     return {"status": "healthy"}
 
+@app.get("/health/ready")
+def readiness_check():
+    """
+    Readiness: 503 while the database is unreachable; pool saturation is only reported
+    """
+    report = readiness()
+    return JSONResponse(report, status_code=200 if report["status"] == "ready" else 503)
+
+@app.get("/.well-known/jwks.json")
+def jwks_document():
+    """
+    Public keys (by kid) for verifying our tokens without calling this API
+    """
+    return JSONResponse(jwks(), headers={"Cache-Control": f"public, max-age={JWKS_MAX_AGE}"})
+
 @app.get("/api")
 def api_info():
     return {
@@ -62,6 +127,7 @@ def api_info():
             "reviews": "/api/reviews",
             "payments": "/api/payments",
             "admin": "/api/admin",
+            "images": "/api/images",
             "docs": "/docs",
             "redoc": "/redoc"
         }
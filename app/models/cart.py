@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 
 class CartItem(Base):
     __tablename__ = 'cart_items'
+    __table_args__ = (
+        Index('uq_cart_items_user_product', 'user_id', 'product_id', unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey('users.id'))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -10,9 +10,21 @@ class Category(Base):
     name = Column(String, unique=True, index=True)
     description = Column(Text)
     image_url = Column(String)
+    parent_id = Column(Integer, ForeignKey('categories.id'), nullable=True, index=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     # Relationships
     products = relationship("Product", back_populates="category")
+
+# One row per (ancestor, descendant) pair, including each category with itself at depth 0
+class CategoryClosure(Base):
+    __tablename__ = 'category_closure'
+    __table_args__ = (
+        Index('ix_category_closure_descendant', 'descendant_id', 'ancestor_id'),
+    )
+
+    ancestor_id = Column(Integer, ForeignKey('categories.id', ondelete='CASCADE'), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey('categories.id', ondelete='CASCADE'), primary_key=True)
+    depth = Column(Integer, nullable=False, default=0)
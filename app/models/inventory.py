@@ -0,0 +1,81 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Enum, Index, CheckConstraint, text
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.database import Base
+import enum
+
+class MovementReason(enum.Enum):
+    INITIAL = "initial"
+    ORDER = "order"
+    CANCELLATION = "cancellation"
+    ADJUSTMENT = "adjustment"
+
+class InventoryMovement(Base):
+    """
+    Append-only stock ledger. Current stock is products.stock_quantity (the balance
+    compacted up to products.stock_ledger_id) plus the deltas recorded after it.
+    """
+    __tablename__ = 'inventory_movements'
+    __table_args__ = (
+        # Pending deltas of one product: a short range scan past its watermark
+        Index('ix_inventory_movements_product_id', 'product_id', 'id'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey('products.id'), nullable=False)
+    delta = Column(Integer, nullable=False)
+    reason = Column(Enum(MovementReason), nullable=False)
+    # No foreign key: the order may since have moved to orders_archive
+    order_id = Column(Integer)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    product = relationship("Product")
+
+class LedgerState(Base):
+    """
+    One row (id 1): the ledger id through which the compactor has folded every product's
+    movements. Products also carry their own watermark (stock_ledger_id), which can run
+    ahead of it, e.g. a new product's opening movement; only this one bounds the scans.
+    """
+    __tablename__ = 'ledger_state'
+
+    id = Column(Integer, primary_key=True)
+    compacted_through = Column(Integer, nullable=False, default=0)
+
+class ProductStockShard(Base):
+    """
+    Stock split across counter rows for products with stock_shards > 0, so concurrent
+    checkouts lock different rows. Shard changes are mirrored on the ledger.
+    """
+    __tablename__ = 'product_stock_shards'
+    __table_args__ = (
+        CheckConstraint('quantity >= 0', name='ck_product_stock_shards_quantity'),
+    )
+
+    product_id = Column(Integer, ForeignKey('products.id'), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    quantity = Column(Integer, nullable=False, default=0)
+
+class StockAlert(Base):
+    """
+    A product at or below its reorder threshold. Opened and resolved by the stock-changing
+    paths (inventory_controller.check_stock_alerts); the open alerts are the low-stock report.
+    """
+    __tablename__ = 'stock_alerts'
+    __table_args__ = (
+        # Only open alerts are ever looked up, so the index stays as small as the report
+        Index('ix_stock_alerts_open', 'product_id',
+              postgresql_where=text('resolved_at IS NULL'), sqlite_where=text('resolved_at IS NULL')),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(Integer, ForeignKey('products.id'), nullable=False)
+    threshold = Column(Integer, nullable=False)
+    # Live stock when the alert was opened
+    stock_quantity = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    resolved_at = Column(DateTime(timezone=True))
+
+    # Relationships
+    product = relationship("Product")
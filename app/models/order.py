@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, DECIMAL, Enum
+from sqlalchemy import Column, Integer, String, Text, Boolean, Date, DateTime, ForeignKey, DECIMAL, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -13,6 +13,10 @@ class OrderStatus(enum.Enum):
 
 class Order(Base):
     __tablename__ = 'orders'
+    __table_args__ = (
+        Index('ix_orders_user_created', 'user_id', 'created_at'),
+        Index('ix_orders_status_created', 'status', 'created_at'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey('users.id'))
@@ -33,14 +37,82 @@ class Order(Base):
 
 class OrderItem(Base):
     __tablename__ = 'order_items'
+    __table_args__ = (
+        Index('ix_order_items_order_id', 'order_id'),
+        Index('ix_order_items_product_id', 'product_id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey('orders.id'))
     product_id = Column(Integer, ForeignKey('products.id'))
     quantity = Column(Integer)
     price = Column(DECIMAL(10, 2))  # Price at time of order
+    # Product details at time of order, so order history never joins products
+    product_name = Column(String)
+    product_sku = Column(String)
+    product_image_url = Column(String)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     order = relationship("Order", back_populates="order_items")
     product = relationship("Product", back_populates="order_items")
+
+class ArchivedOrder(Base):
+    """
+    DELIVERED/CANCELLED orders moved out of `orders` by the archiver (order_controller.archive_orders),
+    keeping the hot table and its indexes small. Same columns and ids as when the order was live;
+    reads fall back here when an order isn't in `orders`.
+    """
+    __tablename__ = 'orders_archive'
+    __table_args__ = (
+        Index('ix_orders_archive_user_created', 'user_id', 'created_at'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, ForeignKey('users.id'))
+    total_amount = Column(DECIMAL(10, 2))
+    status = Column(Enum(OrderStatus))
+    shipping_address = Column(Text)
+    billing_address = Column(Text)
+    payment_method = Column(String)
+    payment_status = Column(String)
+    tracking_number = Column(String)
+    notes = Column(Text)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    order_items = relationship("ArchivedOrderItem", back_populates="order")
+
+class ArchivedOrderItem(Base):
+    __tablename__ = 'order_items_archive'
+    __table_args__ = (
+        Index('ix_order_items_archive_order_id', 'order_id'),
+        Index('ix_order_items_archive_product_id', 'product_id'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    order_id = Column(Integer, ForeignKey('orders_archive.id'))
+    product_id = Column(Integer, ForeignKey('products.id'))
+    quantity = Column(Integer)
+    price = Column(DECIMAL(10, 2))
+    product_name = Column(String)
+    product_sku = Column(String)
+    product_image_url = Column(String)
+    created_at = Column(DateTime(timezone=True))
+
+    # Relationships
+    order = relationship("ArchivedOrder", back_populates="order_items")
+
+class OrderRollup(Base):
+    """
+    Archived orders per creation day and status, so admin counts and revenue stay complete
+    without reading the archive. Only the archiver writes it; archived orders never change.
+    """
+    __tablename__ = 'order_rollups'
+
+    day = Column(Date, primary_key=True)
+    status = Column(Enum(OrderStatus), primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(DECIMAL(14, 2), nullable=False, default=0)
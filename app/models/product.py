@@ -1,20 +1,58 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, DECIMAL
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, DECIMAL, Float, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 
 class Product(Base):
     __tablename__ = 'products'
+    __table_args__ = (
+        # Partial indexes: only active products are ever browsed
+        Index('ix_products_active_category', 'category_id', 'id',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active = 1')),
+        Index('ix_products_active_stock', 'stock_quantity',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active = 1')),
+        # Covers the faceted browse filters and aggregates without touching the table
+        Index('ix_products_active_facets', 'category_id', 'price', 'stock_quantity', 'rating_avg',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active = 1')),
+        # Listing sort orders (product_controller.PRODUCT_SORTS), scanned in either direction;
+        # the trailing id makes the order total so keyset cursors are stable
+        Index('ix_products_active_category_price', 'category_id', 'price', 'id',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active = 1')),
+        Index('ix_products_active_category_newest', 'category_id', 'created_at', 'id',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active = 1')),
+        Index('ix_products_active_category_sales', 'category_id', 'sales_count', 'id',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active = 1')),
+        Index('ix_products_active_category_rating', 'category_id', 'rating_avg', 'review_count', 'id',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active = 1')),
+        # Catalog-wide "newest" and "best selling" landing pages
+        Index('ix_products_active_newest', 'created_at', 'id',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active = 1')),
+        Index('ix_products_active_sales', 'sales_count', 'id',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active = 1')),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     description = Column(Text)
     price = Column(DECIMAL(10, 2))
     sku = Column(String, unique=True, index=True)
+    # Compacted stock balance; live stock adds the ledger deltas after stock_ledger_id
+    # (see inventory_controller)
     stock_quantity = Column(Integer, default=0)
+    stock_ledger_id = Column(Integer, default=0, server_default='0', nullable=False)
+    # > 0: stock is held in that many product_stock_shards rows (flash-sale mode)
+    stock_shards = Column(Integer, default=0, server_default='0', nullable=False)
+    # A stock alert opens when live stock falls to this level
+    reorder_threshold = Column(Integer, default=10, server_default='10', nullable=False)
     image_url = Column(String)
     is_active = Column(Boolean, default=True)
     category_id = Column(Integer, ForeignKey('categories.id'))
+    # Review counters maintained by review_controller
+    rating_total = Column(Integer, default=0, server_default='0', nullable=False)
+    review_count = Column(Integer, default=0, server_default='0', nullable=False)
+    rating_avg = Column(Float, default=0, server_default='0', nullable=False)
+    # Units sold net of cancellations, folded in from the inventory ledger by compaction
+    sales_count = Column(Integer, default=0, server_default='0', nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 
 class Review(Base):
     __tablename__ = 'reviews'
+    __table_args__ = (
+        Index('ix_reviews_product_created', 'product_id', 'created_at'),
+        Index('uq_reviews_user_product', 'user_id', 'product_id', unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey('users.id'))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -15,6 +15,14 @@ class User(Base):
     phone = Column(String)
     is_active = Column(Boolean, default=True)
     is_admin = Column(Boolean, default=False)
+    # Carried in access tokens; bumped to revoke them (deactivation, role change)
+    token_version = Column(Integer, default=0, server_default='0', nullable=False)
+    # Order history summary, maintained by order_controller.create_order
+    order_count = Column(Integer, default=0, server_default='0', nullable=False)
+    # Orders moved to orders_archive (order_controller.archive_orders); 0 lets history skip the archive
+    archived_order_count = Column(Integer, default=0, server_default='0', nullable=False)
+    last_order_id = Column(Integer)
+    last_order_at = Column(DateTime(timezone=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -22,4 +30,22 @@ class User(Base):
     addresses = relationship("Address", back_populates="user")
     orders = relationship("Order", back_populates="user")
     cart_items = relationship("CartItem", back_populates="user")
-    reviews = relationship("Review", back_populates="user")
\ No newline at end of file
+    reviews = relationship("Review", back_populates="user")
+
+class RefreshToken(Base):
+    """
+    One issued refresh token. Each use replaces it with a new one in the same family;
+    presenting a used token again revokes the whole family (it was probably stolen).
+    """
+    __tablename__ = 'refresh_tokens'
+    __table_args__ = (
+        Index('ix_refresh_tokens_family', 'family'),
+    )
+
+    jti = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    family = Column(String(32), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    used_at = Column(DateTime(timezone=True))
+    revoked_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,28 +1,27 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from app.database import SessionLocal
+from sqlalchemy import func, desc, select, union_all
+from app.database import get_read_db
 from app.models.user import User
 from app.models.product import Product
-from app.models.order import Order, OrderItem, OrderStatus
+from app.models.order import Order, OrderItem, OrderStatus, ArchivedOrder, ArchivedOrderItem, OrderRollup
 from app.models.category import Category
-from app.utils.auth_dependency import get_current_admin_user
+from app.controllers import inventory_controller, order_controller, product_controller
+from app.schemas.product_schema import TrendingWindow
+from app.utils.auth_dependency import Principal, get_current_admin_user
+from app.utils.query_profiler import query_budget
+from app.utils.admission import admission_stats
+from app.utils.events import stock_alert_events, order_events
+from app.config import RECENT_ORDERS_BUFFER_SIZE
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("/stats")
 def get_dashboard_stats(
-    admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    admin_user: Principal = Depends(get_current_admin_user),
+    db: Session = Depends(get_read_db)
 ) -> Dict[str, Any]:
     """
     Get dashboard statistics for admin
@@ -35,24 +34,32 @@ def get_dashboard_stats(
     total_products = db.query(Product).count()
     active_products = db.query(Product).filter(Product.is_active == True).count()
     
-    # Total orders
-    total_orders = db.query(Order).count()
+    # Total orders (archived orders are counted from their rollups)
+    archived_counts = dict(db.query(OrderRollup.status, func.sum(OrderRollup.order_count)).group_by(OrderRollup.status).all())
+    total_orders = db.query(Order).count() + sum(archived_counts.values())
     pending_orders = db.query(Order).filter(Order.status == OrderStatus.PENDING).count()
     confirmed_orders = db.query(Order).filter(Order.status == OrderStatus.CONFIRMED).count()
     shipped_orders = db.query(Order).filter(Order.status == OrderStatus.SHIPPED).count()
-    delivered_orders = db.query(Order).filter(Order.status == OrderStatus.DELIVERED).count()
+    delivered_orders = db.query(Order).filter(Order.status == OrderStatus.DELIVERED).count() + (
+        archived_counts.get(OrderStatus.DELIVERED) or 0
+    )
     
     # Revenue
-    total_revenue = db.query(func.sum(Order.total_amount)).filter(
+    total_revenue = (db.query(func.sum(Order.total_amount)).filter(
         Order.status.in_([OrderStatus.CONFIRMED, OrderStatus.SHIPPED, OrderStatus.DELIVERED])
-    ).scalar() or 0
+    ).scalar() or 0) + (db.query(func.sum(OrderRollup.revenue)).filter(
+        OrderRollup.status.in_(order_controller.SOLD_STATUSES)
+    ).scalar() or 0)
     
     # This month's revenue
     current_month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    monthly_revenue = db.query(func.sum(Order.total_amount)).filter(
+    monthly_revenue = (db.query(func.sum(Order.total_amount)).filter(
         Order.created_at >= current_month_start,
         Order.status.in_([OrderStatus.CONFIRMED, OrderStatus.SHIPPED, OrderStatus.DELIVERED])
-    ).scalar() or 0
+    ).scalar() or 0) + (db.query(func.sum(OrderRollup.revenue)).filter(
+        OrderRollup.day >= current_month_start.date(),
+        OrderRollup.status.in_(order_controller.SOLD_STATUSES)
+    ).scalar() or 0)
     
     # Categories
     total_categories = db.query(Category).count()
@@ -82,47 +89,61 @@ def get_dashboard_stats(
         "categories": total_categories
     }
 
-@router.get("/recent-orders")
+@router.get("/recent-orders", dependencies=[Depends(query_budget(2))])
 def get_recent_orders(
-    limit: int = Query(10, ge=1, le=50),
-    admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    limit: int = Query(10, ge=1, le=RECENT_ORDERS_BUFFER_SIZE),
+    admin_user: Principal = Depends(get_current_admin_user),
+    db: Session = Depends(get_read_db)
 ) -> List[Dict[str, Any]]:
     """
-    Get recent orders for admin dashboard
+    Get recent orders for admin dashboard (served from memory, reloaded every RECENT_ORDERS_TTL seconds)
     """
-    orders = db.query(Order).order_by(desc(Order.created_at)).limit(limit).all()
-    
-    return [
-        {
-            "id": order.id,
-            "user_id": order.user_id,
-            "total_amount": float(order.total_amount),
-            "status": order.status.value,
-            "created_at": order.created_at,
-            "user_email": order.user.email if order.user else None
-        }
-        for order in orders
-    ]
+    return order_controller.get_recent_orders(db, limit)
+
+@router.get("/recent-orders/stream")
+def stream_recent_orders(admin_user: Principal = Depends(get_current_admin_user)):
+    """
+    Server-sent events: `order_created` with each new order's summary, `order_updated` on status changes
+    """
+    return order_events.response()
 
 @router.get("/top-products")
 def get_top_products(
     limit: int = Query(10, ge=1, le=50),
-    admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    window: TrendingWindow = Query(TrendingWindow.WEEK),
+    all_time: bool = Query(False, description="Aggregate every order ever placed instead of the window's counters"),
+    admin_user: Principal = Depends(get_current_admin_user),
+    db: Session = Depends(get_read_db)
 ) -> List[Dict[str, Any]]:
     """
-    Get top selling products
+    Get top selling products of the last hour, day or week
     """
+    if not all_time:
+        return [
+            {
+                "id": row["product"].id,
+                "name": row["product"].name,
+                "price": float(row["product"].price),
+                "total_sold": row["units_sold"]
+            }
+            for row in product_controller.get_trending_products(db, window.value, limit)
+        ]
+
+    sold = union_all(
+        select(OrderItem.product_id, OrderItem.quantity).join(Order).where(
+            Order.status.in_(order_controller.SOLD_STATUSES)
+        ),
+        select(ArchivedOrderItem.product_id, ArchivedOrderItem.quantity).join(ArchivedOrder).where(
+            ArchivedOrder.status.in_(order_controller.SOLD_STATUSES)
+        )
+    ).subquery()
     top_products = db.query(
         Product.id,
         Product.name,
         Product.price,
-        func.sum(OrderItem.quantity).label('total_sold')
-    ).join(OrderItem).join(Order).filter(
-        Order.status.in_([OrderStatus.CONFIRMED, OrderStatus.SHIPPED, OrderStatus.DELIVERED])
-    ).group_by(Product.id, Product.name, Product.price).order_by(
-        desc(func.sum(OrderItem.quantity))
+        func.sum(sold.c.quantity).label('total_sold')
+    ).join(sold, sold.c.product_id == Product.id).group_by(Product.id, Product.name, Product.price).order_by(
+        desc(func.sum(sold.c.quantity))
     ).limit(limit).all()
     
     return [
@@ -137,34 +158,53 @@ def get_top_products(
 
 @router.get("/low-stock-products")
 def get_low_stock_products(
-    threshold: int = Query(10, ge=1),
-    admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    threshold: Optional[int] = Query(None, ge=1, description="Scan for stock at or below this instead of each product's reorder threshold"),
+    admin_user: Principal = Depends(get_current_admin_user),
+    db: Session = Depends(get_read_db)
 ) -> List[Dict[str, Any]]:
     """
-    Get products with low stock
+    Get products with low stock: by default those with an open stock alert
     """
-    low_stock_products = db.query(Product).filter(
-        Product.stock_quantity <= threshold,
-        Product.is_active == True
-    ).order_by(Product.stock_quantity).all()
-    
+    if threshold is not None:
+        low_stock_products = inventory_controller.get_low_stock(db, threshold)
+        return [
+            {
+                "id": product.id,
+                "name": product.name,
+                "sku": product.sku,
+                "stock_quantity": stock,
+                "price": float(product.price)
+            }
+            for product, stock in low_stock_products
+        ]
+
     return [
         {
             "id": product.id,
             "name": product.name,
             "sku": product.sku,
-            "stock_quantity": product.stock_quantity,
-            "price": float(product.price)
+            "stock_quantity": stock,
+            "reorder_threshold": product.reorder_threshold,
+            "price": float(product.price),
+            "alert_id": alert.id,
+            "alerted_at": alert.created_at
         }
-        for product in low_stock_products
+        for alert, product, stock in inventory_controller.get_open_stock_alerts(db)
     ]
 
+@router.get("/stock-alerts/stream")
+def stream_stock_alerts(admin_user: Principal = Depends(get_current_admin_user)):
+    """
+    Server-sent events: `low_stock` when a product falls to its reorder threshold,
+    `restocked` when its stock rises back above it
+    """
+    return stock_alert_events.response()
+
 @router.get("/revenue-chart")
 def get_revenue_chart(
     days: int = Query(30, ge=7, le=365),
-    admin_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    admin_user: Principal = Depends(get_current_admin_user),
+    db: Session = Depends(get_read_db)
 ) -> Dict[str, Any]:
     """
     Get revenue data for chart
@@ -178,15 +218,33 @@ def get_revenue_chart(
     ).filter(
         Order.created_at >= start_date,
         Order.status.in_([OrderStatus.CONFIRMED, OrderStatus.SHIPPED, OrderStatus.DELIVERED])
-    ).group_by(func.date(Order.created_at)).order_by(func.date(Order.created_at)).all()
+    ).group_by(func.date(Order.created_at)).all()
+    archived_revenue = db.query(OrderRollup.day, func.sum(OrderRollup.revenue)).filter(
+        OrderRollup.day >= start_date.date(),
+        OrderRollup.status.in_(order_controller.SOLD_STATUSES)
+    ).group_by(OrderRollup.day).all()
+    
+    revenue_by_day = {}
+    for day, revenue in list(daily_revenue) + archived_revenue:
+        day = order_controller.as_date(day)
+        revenue_by_day[day] = revenue_by_day.get(day, 0) + revenue
     
     return {
         "period_days": days,
         "data": [
             {
-                "date": revenue.date.isoformat(),
-                "revenue": float(revenue.revenue)
+                "date": day.isoformat(),
+                "revenue": float(revenue)
             }
-            for revenue in daily_revenue
+            for day, revenue in sorted(revenue_by_day.items())
         ]
     }
+
+@router.get("/admission")
+def get_admission_metrics(
+    admin_user: Principal = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """
+    Admission control per guarded endpoint: slots in use, queue depth, rejections and wait times
+    """
+    return admission_stats()
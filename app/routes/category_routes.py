@@ -1,20 +1,14 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, File, Query, Response, UploadFile
 from sqlalchemy.orm import Session
-from app.database import SessionLocal
+from app.database import get_db, get_read_db
 from app.controllers import category_controller
-from app.schemas.category_schema import CategoryCreate, CategoryUpdate, CategoryOut
+from app.schemas.category_schema import CategoryCreate, CategoryUpdate, CategoryOut, CategoryTreeNode
 from app.utils.auth_dependency import get_current_user, get_current_admin_user
+from app.utils.image_store import store_upload
 from typing import List
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/", response_model=CategoryOut, dependencies=[Depends(get_current_admin_user)])
 def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
     return category_controller.create_category(db, category)
@@ -24,12 +18,19 @@ def get_categories(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     active_only: bool = Query(True),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     return category_controller.get_categories(db, skip, limit, active_only)
 
+@router.get("/tree", response_model=List[CategoryTreeNode])
+def get_category_tree(db: Session = Depends(get_read_db)):
+    """
+    Active categories as a nested tree with per-node active product counts
+    """
+    return Response(content=category_controller.get_category_tree_json(db), media_type="application/json")
+
 @router.get("/{category_id}", response_model=CategoryOut)
-def get_category(category_id: int, db: Session = Depends(get_db)):
+def get_category(category_id: int, db: Session = Depends(get_read_db)):
     return category_controller.get_category_by_id(db, category_id)
 
 @router.put("/{category_id}", response_model=CategoryOut, dependencies=[Depends(get_current_admin_user)])
@@ -40,6 +41,15 @@ def update_category(
 ):
     return category_controller.update_category(db, category_id, category_update)
 
+@router.post("/{category_id}/image", response_model=CategoryOut, dependencies=[Depends(get_current_admin_user)])
+def upload_category_image(category_id: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
+    """
+    Upload a category image; image_url is set to its resized-variant URL
+    """
+    category_controller.get_category_by_id(db, category_id)
+    image_url = store_upload(file)
+    return category_controller.update_category(db, category_id, CategoryUpdate(image_url=image_url))
+
 @router.delete("/{category_id}", dependencies=[Depends(get_current_admin_user)])
 def delete_category(category_id: int, db: Session = Depends(get_db)):
     return category_controller.delete_category(db, category_id)
@@ -0,0 +1,48 @@
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse
+from typing import Optional
+from app.utils.image_store import image_store, IMAGE_FORMATS
+
+router = APIRouter()
+
+# Variant URLs are content-addressed, so they never change
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+@router.get("/{digest}")
+async def get_image(
+    digest: str,
+    request: Request,
+    w: Optional[int] = Query(None, description="Variant width; defaults to the largest"),
+    format: Optional[str] = Query(None, description="webp or jpeg; negotiated from Accept when omitted")
+):
+    """
+    Resized image variant, rendered on first request. Supports If-None-Match and Range.
+    """
+    if not image_store.exists(digest):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found"
+        )
+
+    width = w or image_store.widths[-1]
+    if width not in image_store.widths:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"w must be one of {', '.join(map(str, image_store.widths))}"
+        )
+    if format is None:
+        format = "webp" if "image/webp" in request.headers.get("accept", "") else "jpeg"
+    if format not in IMAGE_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"format must be one of {', '.join(IMAGE_FORMATS)}"
+        )
+
+    etag = f'"{digest[:20]}-{width}-{format}"'
+    headers = {"Cache-Control": CACHE_CONTROL, "ETag": etag, "Vary": "Accept"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    path = await asyncio.wrap_future(image_store.variant(digest, width, format))
+    return FileResponse(path, media_type=IMAGE_FORMATS[format][1], headers=headers)
@@ -1,51 +1,69 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from app.database import SessionLocal
+from app.database import get_db
 from app.controllers import order_controller
-from app.schemas.order_schema import OrderCreate, OrderUpdate, OrderOut
-from app.utils.auth_dependency import get_current_user, get_current_admin_user
+from app.schemas.order_schema import OrderCreate, OrderUpdate, OrderOut, OrderSummaryOut
+from app.utils.auth_dependency import Principal, get_current_user, get_current_user_record, get_current_admin_user
+from app.utils.query_profiler import query_budget
+from app.utils.admission import admission_control
 from app.models.user import User
 from typing import List, Optional
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-@router.post("/", response_model=OrderOut)
+@router.post("/", response_model=OrderOut, dependencies=[Depends(admission_control("orders.create"))])
 def create_order(
     order: OrderCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     return order_controller.create_order(db, current_user.id, order)
 
-@router.get("/", response_model=List[OrderOut])
+# Users with archived orders take a merged page query and two archive queries more
+@router.get("/", response_model=List[OrderOut], dependencies=[Depends(query_budget(6))])
 def get_orders(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,status,total_amount"),
+    current_user: User = Depends(get_current_user_record),
     db: Session = Depends(get_db)
 ):
-    return order_controller.get_orders(db, current_user.id, skip, limit)
+    field_list = order_controller.ORDER_FIELDS.parse(fields)
+    orders = order_controller.get_orders(db, current_user.id, skip, limit, field_list, current_user.archived_order_count)
+    # Kept on the user row, so paging the history never runs a COUNT
+    total = {"X-Total-Count": str(current_user.order_count)}
+    if field_list:
+        return JSONResponse(order_controller.ORDER_FIELDS.serialize(orders, field_list), headers=total)
+    response.headers.update(total)
+    return orders
+
+@router.get("/summary", response_model=OrderSummaryOut)
+def get_order_summary(current_user: User = Depends(get_current_user_record)):
+    """
+    Number of orders placed and the latest one, without counting
+    """
+    return current_user
 
 @router.get("/admin", response_model=List[OrderOut], dependencies=[Depends(get_current_admin_user)])
 def get_all_orders(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     user_id: Optional[int] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,status,total_amount"),
     db: Session = Depends(get_db)
 ):
-    return order_controller.get_orders(db, user_id, skip, limit)
+    field_list = order_controller.ORDER_FIELDS.parse(fields)
+    orders = order_controller.get_orders(db, user_id, skip, limit, field_list)
+    if field_list:
+        return JSONResponse(order_controller.ORDER_FIELDS.serialize(orders, field_list))
+    return orders
 
-@router.get("/{order_id}", response_model=OrderOut)
+@router.get("/{order_id}", response_model=OrderOut, dependencies=[Depends(query_budget(4))])
 def get_order(
     order_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     return order_controller.get_order_by_id(db, order_id, current_user.id)
@@ -65,7 +83,7 @@ def update_order(
 @router.post("/{order_id}/cancel", response_model=OrderOut)
 def cancel_order(
     order_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     return order_controller.cancel_order(db, order_id, current_user.id)
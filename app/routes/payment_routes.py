@@ -1,10 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from app.database import SessionLocal
+from app.database import get_db
 from app.utils.payment_service import PaymentService
 from app.controllers import order_controller
-from app.utils.auth_dependency import get_current_user
-from app.models.user import User
+from app.utils.auth_dependency import Principal, get_current_user
 from app.models.order import OrderStatus
 from pydantic import BaseModel
 from decimal import Decimal
@@ -12,13 +11,6 @@ from typing import Optional
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 class PaymentIntentRequest(BaseModel):
     order_id: int
 
@@ -33,7 +25,7 @@ class RefundRequest(BaseModel):
 @router.post("/create-payment-intent")
 def create_payment_intent(
     request: PaymentIntentRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -64,7 +56,7 @@ def create_payment_intent(
 @router.post("/confirm-payment")
 def confirm_payment(
     request: PaymentConfirmRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -96,7 +88,7 @@ def confirm_payment(
 @router.post("/refund")
 def refund_payment(
     request: RefundRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
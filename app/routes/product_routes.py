@@ -1,49 +1,126 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from app.database import SessionLocal
+from app.database import get_db, get_read_db
 from app.controllers import product_controller
-from app.schemas.product_schema import ProductCreate, ProductUpdate, ProductOut, ProductWithCategory
+from app.schemas.product_schema import (
+    ProductCreate, ProductUpdate, ProductOut, ProductWithCategory, ProductBrowseOut, ProductSort,
+    ProductBatchRequest, ProductBatchOut, TrendingProductOut, TrendingWindow
+)
 from app.utils.auth_dependency import get_current_user, get_current_admin_user
+from app.utils.rate_limiter import rate_limit
+from app.utils.image_store import store_upload
+from decimal import Decimal
 from typing import List, Optional
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/", response_model=ProductOut, dependencies=[Depends(get_current_admin_user)])
 def create_product(product: ProductCreate, db: Session = Depends(get_db)):
     return product_controller.create_product(db, product)
 
 @router.get("/", response_model=List[ProductWithCategory])
 def get_products(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     category_id: Optional[int] = Query(None),
+    include_descendants: bool = Query(False),
     active_only: bool = Query(True),
-    db: Session = Depends(get_db)
+    sort: Optional[ProductSort] = Query(None),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page; replaces skip"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,price,image_url"),
+    db: Session = Depends(get_read_db)
+):
+    sort_key = sort.value if sort else None
+    field_list = product_controller.PRODUCT_FIELDS.parse(fields)
+    products = product_controller.get_products(
+        db, skip, limit, category_id, active_only, include_descendants, sort_key, cursor, field_list
+    )
+    if field_list:
+        response = JSONResponse(product_controller.PRODUCT_FIELDS.serialize(products, field_list))
+    next_cursor = product_controller.next_cursor(products, sort_key, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response if field_list else products
+
+@router.get("/browse", response_model=ProductBrowseOut)
+def browse_products(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(24, ge=1, le=100),
+    category_id: Optional[int] = Query(None),
+    include_descendants: bool = Query(False),
+    min_price: Optional[Decimal] = Query(None, ge=0),
+    max_price: Optional[Decimal] = Query(None, ge=0),
+    in_stock: Optional[bool] = Query(None),
+    min_rating: Optional[float] = Query(None, ge=1, le=5),
+    sort: Optional[ProductSort] = Query(None),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page; replaces skip"),
+    db: Session = Depends(get_read_db)
 ):
-    return product_controller.get_products(db, skip, limit, category_id, active_only)
+    """
+    Storefront listing: one page of products plus category, price and availability facet counts
+    """
+    return product_controller.browse_products(
+        db, skip, limit, category_id, include_descendants, min_price, max_price, in_stock, min_rating,
+        sort.value if sort else None, cursor
+    )
 
-@router.get("/search", response_model=List[ProductWithCategory])
+@router.get("/search", response_model=List[ProductWithCategory], dependencies=[Depends(rate_limit("products.search", scope="user"))])
 def search_products(
     q: str = Query(..., min_length=2),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,name,price,image_url"),
+    db: Session = Depends(get_read_db)
 ):
-    return product_controller.search_products(db, q, skip, limit)
+    field_list = product_controller.PRODUCT_FIELDS.parse(fields)
+    products = product_controller.search_products(db, q, skip, limit, field_list)
+    if field_list:
+        return JSONResponse(product_controller.PRODUCT_FIELDS.serialize(products, field_list))
+    return products
+
+@router.get("/batch", response_model=ProductBatchOut)
+def get_products_batch(
+    ids: str = Query(..., description="Comma-separated product ids, e.g. 1,2,3"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Several products in one request, in the order asked for; unknown ids are listed in `missing`
+    """
+    try:
+        product_ids = [int(product_id) for product_id in ids.split(",") if product_id.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be a comma-separated list of integers"
+        )
+    return product_controller.get_products_by_ids(db, product_ids)
+
+@router.post("/batch", response_model=ProductBatchOut)
+def post_products_batch(request: ProductBatchRequest, db: Session = Depends(get_read_db)):
+    """
+    Same as GET /batch, for id lists too long for a query string
+    """
+    return product_controller.get_products_by_ids(db, request.ids)
+
+@router.get("/trending", response_model=List[TrendingProductOut])
+def get_trending_products(
+    window: TrendingWindow = Query(TrendingWindow.DAY),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Best sellers of the last hour, day or week, from the sliding-window sales counters
+    """
+    return product_controller.get_trending_products(db, window.value, limit)
 
 @router.get("/{product_id}", response_model=ProductWithCategory)
-def get_product(product_id: int, db: Session = Depends(get_db)):
+def get_product(product_id: int, db: Session = Depends(get_read_db)):
     return product_controller.get_product_by_id(db, product_id)
 
 @router.get("/sku/{sku}", response_model=ProductOut)
-def get_product_by_sku(sku: str, db: Session = Depends(get_db)):
+def get_product_by_sku(sku: str, db: Session = Depends(get_read_db)):
     return product_controller.get_product_by_sku(db, sku)
 
 @router.put("/{product_id}", response_model=ProductOut, dependencies=[Depends(get_current_admin_user)])
@@ -54,6 +131,15 @@ def update_product(
 ):
     return product_controller.update_product(db, product_id, product_update)
 
+@router.post("/{product_id}/image", response_model=ProductOut, dependencies=[Depends(get_current_admin_user)])
+def upload_product_image(product_id: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
+    """
+    Upload a product image; image_url is set to its resized-variant URL
+    """
+    product_controller.get_product_by_id(db, product_id)
+    image_url = store_upload(file)
+    return product_controller.update_product(db, product_id, ProductUpdate(image_url=image_url))
+
 @router.delete("/{product_id}", dependencies=[Depends(get_current_admin_user)])
 def delete_product(product_id: int, db: Session = Depends(get_db)):
     return product_controller.delete_product(db, product_id)
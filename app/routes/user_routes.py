@@ -1,29 +1,38 @@
 from fastapi import APIRouter, Depends, Body, Query
 from sqlalchemy.orm import Session
-from app.database import SessionLocal
+from app.database import get_db
 from app.controllers import user_controller
-from app.schemas.user_schema import UserCreate, UserLogin, UserOut, UserUpdate
-from app.utils.auth_dependency import get_current_user, get_current_admin_user
+from app.schemas.user_schema import UserCreate, UserLogin, UserOut, UserUpdate, TokenRefresh, LogoutRequest
+from app.utils.auth_dependency import Principal, get_current_user, get_current_user_record, get_current_admin_user
+from app.utils.rate_limiter import rate_limit
 from app.models.user import User
 from typing import List
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-@router.post("/register", response_model=UserOut)
+@router.post("/register", response_model=UserOut, dependencies=[Depends(rate_limit("users.register"))])
 def register(user: UserCreate, db: Session = Depends(get_db)):
     return user_controller.create_user(db, user)
 
-@router.post("/login")
+@router.post("/login", dependencies=[Depends(rate_limit("users.login"))])
 def login(data: UserLogin, db: Session = Depends(get_db)):
     return user_controller.login_user(db, data.email, data.password)
 
+@router.post("/refresh")
+def refresh(data: TokenRefresh, db: Session = Depends(get_db)):
+    """
+    Exchange a refresh token for a new access token and refresh token (the old one stops working)
+    """
+    return user_controller.refresh_tokens(db, data.refresh_token)
+
+@router.post("/logout")
+def logout(
+    data: LogoutRequest = Body(LogoutRequest()),
+    current_user: Principal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    return user_controller.logout(db, current_user.jti, current_user.expires_at, data.refresh_token)
+
 @router.get("/", response_model=List[UserOut], dependencies=[Depends(get_current_admin_user)])
 def all_users(
     skip: int = Query(0, ge=0),
@@ -33,7 +42,7 @@ def all_users(
     return user_controller.get_users(db, skip, limit)
 
 @router.get("/me", response_model=UserOut)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+def get_current_user_info(current_user: User = Depends(get_current_user_record)):
     return current_user
 
 @router.get("/{user_id}", response_model=UserOut, dependencies=[Depends(get_current_admin_user)])
@@ -43,7 +52,7 @@ def one_user(user_id: int, db: Session = Depends(get_db)):
 @router.put("/me", response_model=UserOut)
 def update_current_user(
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     return user_controller.update_user(db, current_user.id, user_update)
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
+from app.schemas.product_schema import ProductOut
 
 class CartItemBase(BaseModel):
     product_id: int
@@ -17,7 +18,7 @@ class CartItemOut(CartItemBase):
     user_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
-    product: Optional[dict] = None
+    product: Optional[ProductOut] = None
 
     class Config:
         from_attributes = True
@@ -6,6 +6,7 @@ class CategoryBase(BaseModel):
     name: str
     description: Optional[str] = None
     image_url: Optional[str] = None
+    parent_id: Optional[int] = None
 
 class CategoryCreate(CategoryBase):
     pass
@@ -14,6 +15,7 @@ class CategoryUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
     image_url: Optional[str] = None
+    parent_id: Optional[int] = None
     is_active: Optional[bool] = None
 
 class CategoryOut(CategoryBase):
@@ -24,3 +26,11 @@ class CategoryOut(CategoryBase):
 
     class Config:
         from_attributes = True
+
+class CategoryTreeNode(BaseModel):
+    id: int
+    name: str
+    parent_id: Optional[int] = None
+    product_count: int  # active products directly in this category
+    total_product_count: int  # active products in this category and all descendants
+    children: List["CategoryTreeNode"] = []
@@ -20,7 +20,9 @@ class OrderItemOut(OrderItemBase):
     id: int
     order_id: int
     created_at: datetime
-    product: Optional[dict] = None
+    product_name: Optional[str] = None
+    product_sku: Optional[str] = None
+    product_image_url: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -53,3 +55,11 @@ class OrderOut(OrderBase):
 
     class Config:
         from_attributes = True
+
+class OrderSummaryOut(BaseModel):
+    order_count: int
+    last_order_id: Optional[int] = None
+    last_order_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -2,6 +2,20 @@ from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
 from decimal import Decimal
+from enum import Enum
+from app.schemas.category_schema import CategoryOut
+
+class ProductSort(str, Enum):
+    PRICE_ASC = "price_asc"
+    PRICE_DESC = "price_desc"
+    NEWEST = "newest"
+    BEST_SELLING = "best_selling"
+    TOP_RATED = "top_rated"
+
+class TrendingWindow(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
 
 class ProductBase(BaseModel):
     name: str
@@ -9,6 +23,7 @@ class ProductBase(BaseModel):
     price: Decimal
     sku: str
     stock_quantity: int = 0
+    reorder_threshold: int = 10
     image_url: Optional[str] = None
     category_id: int
 
@@ -24,10 +39,16 @@ class ProductUpdate(BaseModel):
     image_url: Optional[str] = None
     category_id: Optional[int] = None
     is_active: Optional[bool] = None
+    stock_shards: Optional[int] = None
+    reorder_threshold: Optional[int] = None
 
 class ProductOut(ProductBase):
     id: int
     is_active: bool
+    rating_avg: float = 0
+    review_count: int = 0
+    sales_count: int = 0
+    stock_shards: int = 0
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -35,4 +56,39 @@ class ProductOut(ProductBase):
         from_attributes = True
 
 class ProductWithCategory(ProductOut):
-    category: Optional[dict] = None
+    category: Optional[CategoryOut] = None
+
+class CategoryFacet(BaseModel):
+    category_id: int
+    count: int
+
+class PriceFacet(BaseModel):
+    min: Optional[Decimal] = None
+    max: Optional[Decimal] = None
+    count: int
+
+class AvailabilityFacet(BaseModel):
+    in_stock: int
+    out_of_stock: int
+
+class ProductFacets(BaseModel):
+    categories: List[CategoryFacet]
+    price_buckets: List[PriceFacet]
+    availability: AvailabilityFacet
+
+class ProductBrowseOut(BaseModel):
+    items: List[ProductWithCategory]
+    total: int
+    facets: ProductFacets
+    next_cursor: Optional[str] = None
+
+class ProductBatchRequest(BaseModel):
+    ids: List[int]
+
+class ProductBatchOut(BaseModel):
+    items: List[ProductWithCategory]
+    missing: List[int]
+
+class TrendingProductOut(BaseModel):
+    product: ProductWithCategory
+    units_sold: int
@@ -1,6 +1,14 @@
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
+from app.schemas.product_schema import ProductOut
+
+class ReviewerOut(BaseModel):
+    id: int
+    username: str
+
+    class Config:
+        from_attributes = True
 
 class ReviewBase(BaseModel):
     product_id: int
@@ -19,8 +27,8 @@ class ReviewOut(ReviewBase):
     user_id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
-    user: Optional[dict] = None
-    product: Optional[dict] = None
+    user: Optional[ReviewerOut] = None
+    product: Optional[ProductOut] = None
 
     class Config:
         from_attributes = True
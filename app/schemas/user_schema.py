@@ -33,4 +33,10 @@ class UserOut(BaseModel):
         
 class UserLogin(BaseModel):
     email: EmailStr
-    password: str
\ No newline at end of file
+    password: str
+
+class TokenRefresh(BaseModel):
+    refresh_token: str
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
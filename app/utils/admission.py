@@ -0,0 +1,164 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+from fastapi import HTTPException, status
+
+from app.config import ADMISSION_LIMITS
+
+
+class _Waiter:
+    __slots__ = ("loop", "future", "granted")
+
+    def __init__(self, loop, future):
+        self.loop = loop
+        self.future = future
+        self.granted = False
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AdmissionController:
+    """
+    Concurrency limit with a bounded FIFO wait queue.
+
+    Queued requests wait on the event loop without holding a worker thread or a database
+    connection; a full queue or a wait longer than `timeout` is answered with 503.
+    State is guarded by a thread lock rather than asyncio primitives so one controller
+    can serve several event loops.
+    """
+    def __init__(self, name: str, limit: int, queue_size: int, timeout: float):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.service_avg = 0.0
+
+    def _overloaded(self) -> HTTPException:
+        # Rough time for the queue ahead to drain through the available slots
+        retry_after = max(1, math.ceil(len(self._waiters) / self.limit * self.service_avg))
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry",
+            headers={"Retry-After": str(retry_after)}
+        )
+
+    async def acquire(self) -> float:
+        """
+        Wait for a slot; returns the seconds spent queued
+        """
+        started = time.monotonic()
+        with self._lock:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                self.admitted += 1
+                return 0.0
+            if len(self._waiters) >= self.queue_size:
+                self.rejected += 1
+                raise self._overloaded()
+            loop = asyncio.get_running_loop()
+            waiter = _Waiter(loop, loop.create_future())
+            self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(waiter.future, self.timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove(waiter)
+                    if isinstance(exc, asyncio.TimeoutError):
+                        self.timed_out += 1
+                        raise self._overloaded()
+            if isinstance(exc, asyncio.CancelledError):
+                if granted:
+                    self.release(0.0)
+                raise
+            # Timed out just as a slot was handed over: keep it
+
+        waited = time.monotonic() - started
+        with self._lock:
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+        return waited
+
+    def release(self, service_time: float):
+        with self._lock:
+            if service_time:
+                self.service_avg = service_time if not self.service_avg else 0.9 * self.service_avg + 0.1 * service_time
+            while self._waiters:
+                # Hand the slot straight to the oldest waiter
+                waiter = self._waiters.popleft()
+                try:
+                    waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+                except RuntimeError:
+                    # Its event loop is gone
+                    continue
+                waiter.granted = True
+                self.admitted += 1
+                return
+            self._active -= 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            queued_total = self.admitted + self.timed_out
+            return {
+                "limit": self.limit,
+                "queue_size": self.queue_size,
+                "active": self._active,
+                "queued": len(self._waiters),
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "avg_wait_ms": round(self.wait_total / queued_total * 1000, 3) if queued_total else 0.0,
+                "max_wait_ms": round(self.wait_max * 1000, 3),
+                "avg_service_ms": round(self.service_avg * 1000, 3),
+            }
+
+
+_controllers: Dict[str, AdmissionController] = {}
+
+
+def get_controller(name: str) -> AdmissionController:
+    if name not in _controllers:
+        limit, queue_size, timeout = ADMISSION_LIMITS[name]
+        _controllers[name] = AdmissionController(name, limit, queue_size, timeout)
+    return _controllers[name]
+
+
+def admission_control(name: str):
+    """
+    Dependency holding one ADMISSION_LIMITS[name] slot for the rest of the request.
+
+    List it in the route's `dependencies=[...]` so it runs before the database and
+    auth dependencies and queued requests don't hold a session.
+    """
+    controller = get_controller(name)
+
+    async def dependency():
+        await controller.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            controller.release(time.monotonic() - started)
+
+    return dependency
+
+
+def admission_stats() -> Dict[str, Dict[str, float]]:
+    return {name: controller.stats() for name, controller in _controllers.items()}
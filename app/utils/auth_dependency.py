@@ -2,50 +2,75 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.utils.jwt_handler import verify_token
-from app.database import SessionLocal
+from app.utils.revocation import is_revoked
+from app.database import get_db
 from app.models.user import User
 
 security = HTTPBearer()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+class Principal:
+    """
+    The authenticated caller, built from access token claims alone
+    """
+    __slots__ = ("id", "email", "is_admin", "version", "jti", "expires_at")
+
+    def __init__(self, id: int, email: str, is_admin: bool, version: int, jti: str, expires_at: float):
+        self.id = id
+        self.email = email
+        self.is_admin = is_admin
+        self.version = version
+        self.jti = jti
+        self.expires_at = expires_at
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Principal:
+    """
+    Verify the access token; no database access. Deactivated accounts and changed roles
+    are caught through the revocation list (the account's token_version is revoked).
+    """
     token = credentials.credentials
     try:
         payload = verify_token(token)
-        user_id = payload.get("sub")
-        if user_id is None:
+        if payload.get("type") != "access" or payload.get("sub") is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid token"
             )
-        
-        user = db.query(User).filter(User.id == int(user_id)).first()
-        if user is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found"
-            )
-        
-        if not user.is_active:
+
+        if is_revoked(payload):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User account is inactive"
+                detail="Token has been revoked"
             )
-            
-        return user
+
+        return Principal(
+            id=int(payload["sub"]),
+            email=payload.get("email"),
+            is_admin=payload.get("role") == "admin",
+            version=payload.get("ver", 0),
+            jti=payload.get("jti"),
+            expires_at=payload["exp"]
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token"
         )
 
-def get_current_admin_user(current_user: User = Depends(get_current_user)):
+def get_current_user_record(current_user: Principal = Depends(get_current_user), db: Session = Depends(get_db)) -> User:
+    """
+    The caller's users row, for routes that return or read the account itself
+    """
+    user = db.query(User).filter(User.id == current_user.id).first()
+    if user is None or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User account is inactive"
+        )
+    return user
+
+def get_current_admin_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
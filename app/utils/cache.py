@@ -0,0 +1,129 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.utils.invalidation import get_bus
+
+_MISSING = object()
+
+
+class LocalCache:
+    """
+    Thread-safe in-process LRU cache with an optional TTL.
+
+    invalidate() and clear() are also published on the invalidation bus so every worker
+    drops the entry. Each key carries a version stamp that invalidation bumps; a loader
+    that read the database before an invalidation landed can't write its stale value
+    back, because set() with the version taken before loading is refused.
+    """
+    def __init__(self, name: str, ttl: Optional[float] = None, max_entries: int = 10_000):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        _caches[name] = self
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def version(self, key) -> Tuple[int, int]:
+        """
+        Stamp to pass to set() for a value about to be loaded
+        """
+        with self._lock:
+            return self._generation, self._versions.get(key, 0)
+
+    def set(self, key, value, version: Optional[Tuple[int, int]] = None) -> bool:
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if version is not None and version != (self._generation, self._versions.get(key, 0)):
+                # Invalidated while the value was being loaded
+                return False
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def get_or_set(self, key, loader: Callable[[], Any]):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            version = self.version(key)
+            value = loader()
+            self.set(key, value, version)
+        return value
+
+    def invalidate(self, key):
+        self.apply_invalidation(key)
+        get_bus().publish(self.name, key)
+
+    def clear(self):
+        self.apply_invalidation(None)
+        get_bus().publish(self.name, None)
+
+    def apply_invalidation(self, key):
+        """
+        Drop `key` (everything when None) in this process only
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._versions.clear()
+                self._generation += 1
+                return
+            self._entries.pop(key, None)
+            self._versions[key] = self._versions.get(key, 0) + 1
+            if len(self._versions) > self.max_entries:
+                # A new generation keeps refusing write-backs that started before the reset
+                self._versions.clear()
+                self._generation += 1
+
+
+_caches: Dict[str, LocalCache] = {}
+
+
+def apply_invalidation(cache_name: str, key):
+    cache = _caches.get(cache_name)
+    if cache is not None:
+        cache.apply_invalidation(key)
+
+
+def clear_all_caches():
+    for cache in list(_caches.values()):
+        cache.apply_invalidation(None)
+
+
+def start_invalidation_listener():
+    get_bus().start(apply_invalidation, clear_all_caches)
+
+
+def stop_invalidation_listener():
+    get_bus().stop()
+
+
+# Nested category tree with product counts; cleared by category and product writes
+category_tree_cache = LocalCache("category_tree", ttl=300, max_entries=4)
+
+# Serialized products (ProductWithCategory) for the batch endpoint; invalidated by product
+# and category writes, stock may lag by up to the TTL
+product_cache = LocalCache("products", ttl=30, max_entries=10_000)
+
+# Highest inventory ledger id folded into every product; bounds the pending-delta scans.
+# Only ever moves forward, so it is set locally and never invalidated
+ledger_watermark_cache = LocalCache("ledger_watermark", ttl=60, max_entries=1)
+
+# Facet counts per browse filter combination; short TTL, cleared by product writes
+facet_cache = LocalCache("facets", ttl=60, max_entries=5_000)
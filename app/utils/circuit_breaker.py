@@ -0,0 +1,97 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Exception):
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} circuit is open")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Stops calling a dependency that keeps failing.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls fail fast
+    with CircuitOpen for `reset_timeout` seconds; then one trial call is let through
+    (half open) and its outcome closes or reopens the circuit. `is_failure(exc)` decides
+    which exceptions count: errors that mean the dependency is working (a declined card)
+    shouldn't trip it.
+    """
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float,
+                 is_failure: Optional[Callable[[BaseException], bool]] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure or (lambda exc: True)
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def _before_call(self) -> bool:
+        """
+        Raise CircuitOpen unless a call may go ahead; True when it is the half-open trial
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return False
+            waited = time.monotonic() - self._opened_at
+            if waited >= self.reset_timeout and not self._trial_running:
+                self._trial_running = True
+                return True
+            self.rejected += 1
+            raise CircuitOpen(self.name, max(self.reset_timeout - waited, 1))
+
+    def _after_call(self, trial: bool, failed: bool):
+        with self._lock:
+            if trial:
+                self._trial_running = False
+            if not failed:
+                self._state = CLOSED
+                self._failures = 0
+                return
+            self._failures += 1
+            if trial or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    @contextmanager
+    def guard(self):
+        """
+        Wrap one call to the dependency:
+
+            with stripe_circuit.guard():
+                stripe.PaymentIntent.retrieve(payment_intent_id)
+        """
+        trial = self._before_call()
+        try:
+            yield
+        except BaseException as exc:
+            self._after_call(trial, failed=isinstance(exc, Exception) and self.is_failure(exc))
+            raise
+        self._after_call(trial, failed=False)
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "rejected": self.rejected,
+            }
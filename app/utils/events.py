@@ -0,0 +1,118 @@
+import asyncio
+import json
+import logging
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+
+from app.config import SSE_KEEPALIVE_SECONDS, STOCK_ALERT_WEBHOOK_URL
+
+logger = logging.getLogger(__name__)
+
+
+class _Subscriber:
+    __slots__ = ("loop", "queue")
+
+    def __init__(self, loop, queue):
+        self.loop = loop
+        self.queue = queue
+
+
+def _offer(queue: asyncio.Queue, message: str):
+    # A subscriber that falls behind loses its oldest events rather than blocking publishers
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(message)
+
+
+class EventChannel:
+    """
+    In-process publish/subscribe, delivered to clients as server-sent events.
+
+    publish() may be called from any thread (sync routes run in the threadpool); each
+    subscriber reads a bounded queue on its own event loop. When `webhook_url` is set,
+    every event is also POSTed there as JSON from a background thread.
+    """
+    def __init__(self, name: str, queue_size: int = 100, webhook_url: Optional[str] = None):
+        self.name = name
+        self.queue_size = queue_size
+        self.webhook_url = webhook_url
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._webhook_executor: Optional[ThreadPoolExecutor] = None
+
+    def publish(self, event: str, data: Dict[str, Any]):
+        data = jsonable_encoder(data)
+        message = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(_offer, subscriber.queue, message)
+            except RuntimeError:
+                # Its event loop is gone
+                self._unsubscribe(subscriber)
+        if self.webhook_url:
+            self._post_webhook(event, data)
+
+    def _post_webhook(self, event: str, data: Dict[str, Any]):
+        with self._lock:
+            if self._webhook_executor is None:
+                # One thread keeps deliveries in publish order
+                self._webhook_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{self.name}-webhook")
+            executor = self._webhook_executor
+        body = json.dumps({"channel": self.name, "event": event, "data": data}).encode()
+        executor.submit(self._deliver, body)
+
+    def _deliver(self, body: bytes):
+        request = urllib.request.Request(
+            self.webhook_url, data=body, headers={"Content-Type": "application/json"}, method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=5):
+                pass
+        except Exception:
+            logger.exception("Webhook delivery for %s failed", self.name)
+
+    def _unsubscribe(self, subscriber: _Subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    async def stream(self):
+        """
+        SSE messages for one client until it disconnects, with comment keepalives so idle
+        connections survive proxies
+        """
+        subscriber = _Subscriber(asyncio.get_running_loop(), asyncio.Queue(self.queue_size))
+        with self._lock:
+            self._subscribers.add(subscriber)
+        try:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber.queue.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            self._unsubscribe(subscriber)
+
+    def response(self) -> StreamingResponse:
+        return StreamingResponse(
+            self.stream(),
+            media_type="text/event-stream",
+            # Stop proxies from buffering or caching the stream
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+
+stock_alert_events = EventChannel("stock_alerts", webhook_url=STOCK_ALERT_WEBHOOK_URL)
+order_events = EventChannel("orders")
@@ -0,0 +1,58 @@
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.orm import load_only
+
+
+class Fieldset:
+    """
+    Sparse fieldsets (?fields=id,name,price) for one response schema over one model.
+
+    The requested fields decide both the SQL (load_only for columns, loader options only
+    for the relationships asked for) and the response shape, serialized with the
+    schema's own field types so values look the same as in the full response.
+    """
+    def __init__(self, schema: Type[BaseModel], model, relationships: Dict[str, Callable[[], Any]]):
+        self.schema = schema
+        self.model = model
+        # field -> zero-argument factory for the loader option that fetches it
+        self.relationships = relationships
+        self._adapters = {
+            name: TypeAdapter(field.annotation) for name, field in schema.model_fields.items()
+        }
+
+    def parse(self, fields: Optional[str]) -> Optional[List[str]]:
+        if not fields:
+            return None
+        requested = list(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+        if not requested:
+            return None
+        unknown = [field for field in requested if field not in self._adapters]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(self._adapters)}"
+            )
+        return requested
+
+    def query_options(self, fields: List[str], *always: str) -> list:
+        """
+        Loader options for `fields`; `always` names extra columns the caller needs (sort keys)
+        """
+        columns = dict.fromkeys(["id", *always, *(field for field in fields if field not in self.relationships)])
+        options = [load_only(*[getattr(self.model, column) for column in columns])]
+        options.extend(self.relationships[field]() for field in fields if field in self.relationships)
+        return options
+
+    def serialize(self, objects, fields: List[str]) -> List[Dict[str, Any]]:
+        adapters = [(field, self._adapters[field]) for field in fields]
+        return [
+            {
+                field: adapter.dump_python(
+                    adapter.validate_python(getattr(obj, field), from_attributes=True), mode="json"
+                )
+                for field, adapter in adapters
+            }
+            for obj in objects
+        ]
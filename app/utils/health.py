@@ -0,0 +1,159 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+
+from app.config import (
+    READINESS_CACHE_SECONDS, LOAD_SHED_SATURATION, LOAD_SHED_EXEMPT_PATHS, REDIS_URL,
+    RATE_LIMIT_BACKEND, TRENDING_BACKEND, CACHE_INVALIDATION_BACKEND, REVOCATION_BACKEND
+)
+from app.database import engine
+from app.utils.payment_service import stripe_circuit
+
+# Redis is only a dependency when one of these features is configured to use it
+REDIS_USED = "redis" in (RATE_LIMIT_BACKEND, TRENDING_BACKEND, CACHE_INVALIDATION_BACKEND, REVOCATION_BACKEND)
+
+
+class CachedCheck:
+    """
+    A dependency check run at most once per `ttl` seconds however often probes arrive
+    """
+    def __init__(self, check: Callable[[], Dict[str, Any]], ttl: float):
+        self.check = check
+        self.ttl = ttl
+        self._result: Optional[Dict[str, Any]] = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def __call__(self) -> Dict[str, Any]:
+        # Concurrent probes wait for one check rather than each pinging
+        with self._lock:
+            if time.monotonic() - self._checked_at >= self.ttl:
+                self._result = self.check()
+                self._checked_at = time.monotonic()
+            return self._result
+
+
+def _ping_database() -> Dict[str, Any]:
+    started = time.monotonic()
+    try:
+        with engine.connect() as conn:
+            checked_out = time.monotonic()
+            conn.execute(text("SELECT 1"))
+    except Exception as e:
+        return {"status": "down", "error": type(e).__name__}
+    finished = time.monotonic()
+    return {
+        "status": "ok",
+        "checkout_ms": round((checked_out - started) * 1000, 3),
+        "ping_ms": round((finished - checked_out) * 1000, 3),
+    }
+
+
+_redis_client = None
+
+
+def _ping_redis() -> Dict[str, Any]:
+    global _redis_client
+    import redis
+
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(REDIS_URL, socket_timeout=1, socket_connect_timeout=1)
+    started = time.monotonic()
+    try:
+        _redis_client.ping()
+    except Exception as e:
+        return {"status": "down", "error": type(e).__name__}
+    return {"status": "ok", "ping_ms": round((time.monotonic() - started) * 1000, 3)}
+
+
+database_check = CachedCheck(_ping_database, READINESS_CACHE_SECONDS)
+redis_check = CachedCheck(_ping_redis, READINESS_CACHE_SECONDS)
+
+
+def pool_stats() -> Dict[str, Any]:
+    """
+    Primary pool usage; saturation is None for pools without a fixed size (SQLite in memory)
+    """
+    pool = engine.pool
+    max_overflow = getattr(pool, "_max_overflow", None)
+    if not hasattr(pool, "checkedout") or max_overflow is None or max_overflow < 0:
+        return {"saturation": None}
+    capacity = pool.size() + max_overflow
+    checked_out = pool.checkedout()
+    return {
+        "size": pool.size(),
+        "max_overflow": max_overflow,
+        "checked_out": checked_out,
+        "saturation": round(checked_out / capacity, 3) if capacity else None,
+    }
+
+
+def pool_saturation() -> Optional[float]:
+    return pool_stats()["saturation"]
+
+
+def _exemptions(entries):
+    prefixes, routes = [], set()
+    for entry in entries:
+        method, _, path = entry.rpartition(" ")
+        if method:
+            routes.add((method.strip().upper(), path))
+        else:
+            prefixes.append(path)
+    return tuple(prefixes), routes
+
+
+EXEMPT_PREFIXES, EXEMPT_ROUTES = _exemptions(LOAD_SHED_EXEMPT_PATHS)
+
+
+def is_exempt(method: str, path: str) -> bool:
+    return (method, path) in EXEMPT_ROUTES or path.startswith(EXEMPT_PREFIXES)
+
+
+def overloaded() -> bool:
+    saturation = pool_saturation()
+    return LOAD_SHED_SATURATION > 0 and saturation is not None and saturation >= LOAD_SHED_SATURATION
+
+
+shed_requests = 0
+
+
+def readiness() -> Dict[str, Any]:
+    """
+    Whether this instance should receive traffic: the database answers. Pool saturation is
+    reported but left to load shedding: at peak every instance is saturated together, and
+    failing readiness on it would take them all out of the load balancer at once. Redis and
+    the Stripe circuit degrade features rather than making the instance unready.
+    """
+    database = database_check()
+    pool = pool_stats()
+    checks = {
+        "database": database,
+        "pool": {**pool, "shedding": overloaded(), "shed_threshold": LOAD_SHED_SATURATION, "shed_requests": shed_requests},
+        "redis": redis_check() if REDIS_USED else {"status": "unused"},
+        "stripe_circuit": stripe_circuit.stats(),
+    }
+    ready = database["status"] == "ok"
+    return {"status": "ready" if ready else "not_ready", "checks": checks}
+
+
+def install_load_shedding(app: FastAPI):
+    @app.middleware("http")
+    async def shed_load(request: Request, call_next):
+        """
+        Turn away low-priority requests while the pool is nearly exhausted, before they queue
+        for a connection; checkout, payments, the cart and health probes are exempt
+        """
+        global shed_requests
+        if not is_exempt(request.method, request.url.path) and overloaded():
+            shed_requests += 1
+            return JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"detail": "Server is busy, please retry"},
+                headers={"Retry-After": "1"}
+            )
+        return await call_next(request)
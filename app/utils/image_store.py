@@ -0,0 +1,170 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile, status
+
+from app.config import MEDIA_ROOT, IMAGE_VARIANT_WIDTHS, IMAGE_WORKERS, IMAGE_MAX_UPLOAD_BYTES
+
+# format name -> (Pillow encoder, content type)
+IMAGE_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "jpeg": ("JPEG", "image/jpeg"),
+}
+
+DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+def _pillow():
+    """
+    Import Pillow on first use; most processes never touch an image
+    """
+    from PIL import Image, ImageOps
+    return Image, ImageOps
+
+
+def _write_atomic(path: str, data: bytes):
+    # Readers never see a half-written file
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class ImageStore:
+    """
+    Content-addressed image store on local disk.
+
+    Originals are stored under their SHA-256; resized variants are named after the
+    original's digest, width and format, so a URL never changes meaning and can be
+    cached forever. Variants are rendered in a worker pool; concurrent requests for
+    a variant that doesn't exist yet share one render (single flight).
+    """
+    def __init__(self, root: str, widths, workers: int):
+        self.root = root
+        self.widths = sorted(widths)
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._inflight: Dict[Tuple[str, int, str], Future] = {}
+        self._lock = threading.Lock()
+
+    def original_path(self, digest: str) -> str:
+        return os.path.join(self.root, "originals", digest[:2], digest)
+
+    def variant_path(self, digest: str, width: int, fmt: str) -> str:
+        return os.path.join(self.root, "variants", digest[:2], f"{digest}-{width}.{fmt}")
+
+    def exists(self, digest: str) -> bool:
+        return bool(DIGEST_RE.match(digest)) and os.path.exists(self.original_path(digest))
+
+    def save_original(self, data: bytes) -> str:
+        """
+        Validate and store an upload, queue its variants, and return its digest
+        """
+        Image, _ = _pillow()
+        try:
+            with Image.open(BytesIO(data)) as image:
+                image.verify()
+        except Exception:
+            raise InvalidImage("Not a supported image")
+
+        digest = hashlib.sha256(data).hexdigest()
+        if not os.path.exists(self.original_path(digest)):
+            _write_atomic(self.original_path(digest), data)
+        for width in self.widths:
+            for fmt in IMAGE_FORMATS:
+                self.render(digest, width, fmt)
+        return digest
+
+    def render(self, digest: str, width: int, fmt: str) -> Future:
+        """
+        Render a variant in the pool unless it is already on disk or being rendered
+        """
+        key = (digest, width, fmt)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="image")
+            future = self._executor.submit(self._render, digest, width, fmt)
+            self._inflight[key] = future
+        # Outside the lock: the callback runs inline if the render already finished
+        future.add_done_callback(lambda _: self._forget(key))
+        return future
+
+    def _forget(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def variant(self, digest: str, width: int, fmt: str) -> Future:
+        """
+        Future resolving to the variant's path, rendering it first if needed
+        """
+        path = self.variant_path(digest, width, fmt)
+        if os.path.exists(path):
+            future = Future()
+            future.set_result(path)
+            return future
+        return self.render(digest, width, fmt)
+
+    def _render(self, digest: str, width: int, fmt: str) -> str:
+        path = self.variant_path(digest, width, fmt)
+        if os.path.exists(path):
+            return path
+
+        Image, ImageOps = _pillow()
+        encoder, _ = IMAGE_FORMATS[fmt]
+        with Image.open(self.original_path(digest)) as original:
+            image = ImageOps.exif_transpose(original)
+            if image.width > width:
+                image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+            if encoder == "JPEG" and image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            buffer = BytesIO()
+            image.save(buffer, encoder, quality=82)
+        _write_atomic(path, buffer.getvalue())
+        return path
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+image_store = ImageStore(MEDIA_ROOT, IMAGE_VARIANT_WIDTHS, IMAGE_WORKERS)
+
+
+def store_upload(upload: UploadFile) -> str:
+    """
+    Store an uploaded image and return the URL to put in an image_url column
+    """
+    data = upload.file.read(IMAGE_MAX_UPLOAD_BYTES + 1)
+    if len(data) > IMAGE_MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Images are limited to {IMAGE_MAX_UPLOAD_BYTES} bytes"
+        )
+    try:
+        digest = image_store.save_original(data)
+    except InvalidImage as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return f"/api/images/{digest}"
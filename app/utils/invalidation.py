@@ -0,0 +1,115 @@
+import json
+import logging
+import os
+import threading
+import uuid
+from typing import Callable, List, Optional, Tuple
+
+from app.config import CACHE_INVALIDATION_BACKEND, CACHE_INVALIDATION_CHANNEL, REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+# Identifies this process on the bus so it skips its own messages
+ORIGIN = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+# apply(cache_name, key) with key None meaning "clear the whole cache"
+ApplyFn = Callable[[str, Optional[object]], None]
+
+
+class LocalBus:
+    """
+    Invalidations delivered in-process to every listener started on the bus, as RedisBus
+    delivers them to every worker. In a single process the one listener is the writer, which
+    has already applied the invalidation; applying it again is harmless. Tests start one
+    listener per simulated worker.
+    """
+    def __init__(self):
+        self._listeners: List[Tuple[ApplyFn, Callable[[], None]]] = []
+        self._lock = threading.Lock()
+
+    def publish(self, cache_name: str, key):
+        with self._lock:
+            listeners = list(self._listeners)
+        for apply, _ in listeners:
+            try:
+                apply(cache_name, key)
+            except Exception:
+                logger.exception("Applying invalidation of %s failed", cache_name)
+
+    def start(self, apply: ApplyFn, clear_all: Callable[[], None]):
+        # Like RedisBus (re)subscribing: nothing published before now reached this listener
+        clear_all()
+        with self._lock:
+            self._listeners.append((apply, clear_all))
+
+    def stop(self):
+        with self._lock:
+            self._listeners.clear()
+
+
+class RedisBus:
+    """
+    Invalidations fanned out to every worker over Redis pub/sub.
+
+    Pub/sub doesn't buffer for absent subscribers, so whenever the listener (re)subscribes
+    it clears every cache: anything published while it was disconnected is lost.
+    """
+    def __init__(self, url: str, channel: str):
+        import redis
+
+        self.channel = channel
+        self._client = redis.Redis.from_url(url)
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def publish(self, cache_name: str, key):
+        message = json.dumps({"origin": ORIGIN, "cache": cache_name, "key": key})
+        try:
+            self._client.publish(self.channel, message)
+        except Exception:
+            # Other workers keep serving until their TTL expires
+            logger.exception("Publishing invalidation of %s failed", cache_name)
+
+    def start(self, apply: ApplyFn, clear_all: Callable[[], None]):
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._listen, args=(apply, clear_all), name="cache-invalidation", daemon=True
+        )
+        self._thread.start()
+
+    def _listen(self, apply: ApplyFn, clear_all: Callable[[], None]):
+        while not self._stopped.is_set():
+            pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(self.channel)
+                clear_all()
+                while not self._stopped.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is None:
+                        continue
+                    payload = json.loads(message["data"])
+                    if payload["origin"] != ORIGIN:
+                        apply(payload["cache"], payload["key"])
+            except Exception:
+                logger.exception("Cache invalidation listener failed; resubscribing")
+                self._stopped.wait(1.0)
+            finally:
+                pubsub.close()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+
+_bus = None
+
+
+def get_bus():
+    global _bus
+    if _bus is None:
+        _bus = RedisBus(REDIS_URL, CACHE_INVALIDATION_CHANNEL) if CACHE_INVALIDATION_BACKEND == "redis" else LocalBus()
+    return _bus
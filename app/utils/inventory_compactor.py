@@ -0,0 +1,33 @@
+import asyncio
+import logging
+
+from starlette.concurrency import run_in_threadpool
+
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def compact_once() -> int:
+    from app.controllers.inventory_controller import compact_movements
+
+    db = SessionLocal()
+    try:
+        return compact_movements(db)
+    finally:
+        db.close()
+
+
+async def run_compactor(interval: float):
+    """
+    Fold the inventory ledger into product balances every `interval` seconds until cancelled
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            updated = await run_in_threadpool(compact_once)
+            if updated:
+                logger.debug("Compacted inventory ledger into %d products", updated)
+        except Exception:
+            # Uncompacted deltas are still counted by reads; try again next interval
+            logger.exception("Inventory compaction failed")
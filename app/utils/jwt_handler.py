@@ -1,11 +1,50 @@
+import base64
+import json
 import jwt
+import uuid
 from datetime import datetime, timedelta
-from app.config import JWT_SECRET_KEY, JWT_ALGORITHM
+from app.config import JWT_ALGORITHM, ACCESS_TOKEN_MINUTES, REFRESH_TOKEN_DAYS
+from app.utils.signing_keys import ASYMMETRIC_ALGORITHMS, signing_key, verification_key
 
 def create_token(data: dict, expires_minutes: int = 30):
     to_encode = data.copy()
     to_encode.update({"exp": datetime.utcnow() + timedelta(minutes=expires_minutes)})
-    return jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+    to_encode.setdefault("jti", uuid.uuid4().hex)
+    kid, key = signing_key()
+    return jwt.encode(to_encode, key, algorithm=JWT_ALGORITHM, headers={"kid": kid} if kid else None)
+
+def token_kid(token: str):
+    """
+    The kid from the token header, unverified (jwt.decode checks the signature over it).
+    Several times cheaper than jwt.get_unverified_header, which validates the whole header.
+    """
+    header = token.split(".", 1)[0]
+    return json.loads(base64.urlsafe_b64decode(header + "=" * (-len(header) % 4))).get("kid")
 
 def verify_token(token: str):
-    return jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    kid = token_kid(token) if JWT_ALGORITHM in ASYMMETRIC_ALGORITHMS else None
+    # Only the configured algorithm is accepted, so an HS256 token can't pass as RS256/EdDSA
+    return jwt.decode(token, verification_key(kid), algorithms=[JWT_ALGORITHM])
+
+def create_access_token(user_id: int, email: str, is_admin: bool, version: int,
+                        expires_minutes: int = ACCESS_TOKEN_MINUTES):
+    """
+    Everything auth needs is in the claims: role for admin checks, and the account's
+    token_version so bumping it (revocation.revoke_user_version) invalidates the token
+    """
+    return create_token({
+        "sub": str(user_id),
+        "email": email,
+        "role": "admin" if is_admin else "user",
+        "ver": version,
+        "type": "access",
+    }, expires_minutes)
+
+def create_refresh_token(user_id: int, version: int, family: str, jti: str):
+    return create_token({
+        "sub": str(user_id),
+        "ver": version,
+        "type": "refresh",
+        "fam": family,
+        "jti": jti,
+    }, REFRESH_TOKEN_DAYS * 24 * 60)
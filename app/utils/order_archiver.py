@@ -0,0 +1,33 @@
+import asyncio
+import logging
+
+from starlette.concurrency import run_in_threadpool
+
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def archive_once() -> int:
+    from app.controllers.order_controller import archive_orders
+
+    db = SessionLocal()
+    try:
+        return archive_orders(db)
+    finally:
+        db.close()
+
+
+async def run_archiver(interval: float):
+    """
+    Move old finished orders to the archive tables every `interval` seconds until cancelled
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            archived = await run_in_threadpool(archive_once)
+            if archived:
+                logger.info("Archived %d orders", archived)
+        except Exception:
+            # Whole batches commit or roll back; the rest are picked up next interval
+            logger.exception("Order archival failed")
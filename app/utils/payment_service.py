@@ -1,11 +1,39 @@
-import stripe
 import os
 from decimal import Decimal
 from fastapi import HTTPException, status
 from typing import Dict, Any
+from app.config import STRIPE_CIRCUIT_FAILURES, STRIPE_CIRCUIT_RESET_SECONDS
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpen
 
-# Initialize Stripe (you'll need to set your Stripe keys in environment variables)
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY", "sk_test_your_stripe_secret_key")
+_stripe = None
+
+def get_stripe():
+    """
+    Import and configure the Stripe SDK on first use; it is slow to import
+    """
+    global _stripe
+    if _stripe is None:
+        import stripe
+        # Initialize Stripe (you'll need to set your Stripe keys in environment variables)
+        stripe.api_key = os.getenv("STRIPE_SECRET_KEY", "sk_test_your_stripe_secret_key")
+        _stripe = stripe
+    return _stripe
+
+def _is_outage(exc: BaseException) -> bool:
+    # Declined cards and bad requests mean Stripe is up; only trip on connection and server errors
+    error = get_stripe().error
+    return isinstance(exc, (error.APIConnectionError, error.APIError, error.RateLimitError))
+
+stripe_circuit = CircuitBreaker(
+    "stripe", STRIPE_CIRCUIT_FAILURES, STRIPE_CIRCUIT_RESET_SECONDS, is_failure=_is_outage
+)
+
+def _payments_unavailable(exc: CircuitOpen) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Payments are temporarily unavailable, please retry",
+        headers={"Retry-After": str(int(exc.retry_after))}
+    )
 
 class PaymentService:
     @staticmethod
@@ -13,18 +41,20 @@ class PaymentService:
         """
         Create a Stripe payment intent
         """
+        stripe = get_stripe()
         try:
             # Convert amount to cents (Stripe uses cents)
             amount_cents = int(amount * 100)
             
-            intent = stripe.PaymentIntent.create(
-                amount=amount_cents,
-                currency=currency,
-                metadata=metadata or {},
-                automatic_payment_methods={
-                    'enabled': True,
-                },
-            )
+            with stripe_circuit.guard():
+                intent = stripe.PaymentIntent.create(
+                    amount=amount_cents,
+                    currency=currency,
+                    metadata=metadata or {},
+                    automatic_payment_methods={
+                        'enabled': True,
+                    },
+                )
             
             return {
                 "client_secret": intent.client_secret,
@@ -32,6 +62,8 @@ class PaymentService:
                 "amount": amount,
                 "currency": currency
             }
+        except CircuitOpen as e:
+            raise _payments_unavailable(e)
         except stripe.error.StripeError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -43,9 +75,13 @@ class PaymentService:
         """
         Confirm a payment intent
         """
+        stripe = get_stripe()
         try:
-            intent = stripe.PaymentIntent.retrieve(payment_intent_id)
+            with stripe_circuit.guard():
+                intent = stripe.PaymentIntent.retrieve(payment_intent_id)
             return intent.status == "succeeded"
+        except CircuitOpen as e:
+            raise _payments_unavailable(e)
         except stripe.error.StripeError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -57,18 +93,22 @@ class PaymentService:
         """
         Refund a payment
         """
+        stripe = get_stripe()
         try:
             refund_data = {"payment_intent": payment_intent_id}
             if amount:
                 refund_data["amount"] = int(amount * 100)  # Convert to cents
             
-            refund = stripe.Refund.create(**refund_data)
+            with stripe_circuit.guard():
+                refund = stripe.Refund.create(**refund_data)
             
             return {
                 "refund_id": refund.id,
                 "amount": Decimal(refund.amount) / 100,  # Convert back from cents
                 "status": refund.status
             }
+        except CircuitOpen as e:
+            raise _payments_unavailable(e)
         except stripe.error.StripeError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
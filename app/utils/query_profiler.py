@@ -0,0 +1,154 @@
+import logging
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from fastapi import FastAPI, Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import QUERY_BUDGET_MODE, QUERY_REPEAT_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+_current_profile: ContextVar[Optional["QueryProfile"]] = ContextVar("query_profile", default=None)
+_captures = []
+_captures_lock = threading.Lock()
+_listener_installed = False
+
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAM_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_NAMED_PARAM_RE = re.compile(r"%\(\w+\)s|%s|:\w+|\$\d+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def normalize_statement(statement: str) -> str:
+    # Reduce a statement to its shape so calls differing only in parameters match
+    normalized = _NAMED_PARAM_RE.sub("?", statement)
+    normalized = _LITERAL_RE.sub("?", normalized)
+    normalized = _PARAM_LIST_RE.sub("(?)", normalized)
+    return _WHITESPACE_RE.sub(" ", normalized).strip()
+
+
+class QueryProfile:
+    def __init__(self, label: Optional[str] = None, budget: Optional[int] = None, mode: str = QUERY_BUDGET_MODE):
+        self.label = label
+        self.budget = budget
+        self.mode = mode
+        self.count = 0
+        self.statements = Counter()
+
+    def record(self, statement: str):
+        self.count += 1
+        self.statements[normalize_statement(statement)] += 1
+
+        if self.mode == "raise" and self.budget is not None and self.count > self.budget:
+            raise QueryBudgetExceeded(self.summary())
+
+    def repeated(self, threshold: int = QUERY_REPEAT_THRESHOLD) -> Dict[str, int]:
+        return {statement: n for statement, n in self.statements.items() if n >= threshold}
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.count > self.budget
+
+    def summary(self) -> str:
+        lines = [f"{self.label or 'request'} ran {self.count} queries"]
+        if self.budget is not None:
+            lines[0] += f" (budget {self.budget})"
+        for statement, n in self.repeated().items():
+            lines.append(f"  {n}x {statement}")
+        return "\n".join(lines)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.record(statement)
+
+    if _captures:
+        with _captures_lock:
+            captures = list(_captures)
+        for capture in captures:
+            capture.record(statement)
+
+
+def _install_listener():
+    global _listener_installed
+    if not _listener_installed:
+        # Listen on the Engine class so every engine (primary or otherwise) is covered
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        _listener_installed = True
+
+
+def query_budget(max_queries: int):
+    """
+    Declare the maximum number of queries a route may run
+    """
+    async def dependency(request: Request):
+        profile = _current_profile.get()
+        if profile is not None:
+            profile.budget = max_queries
+            profile.label = f"{request.method} {request.url.path}"
+
+    return dependency
+
+
+def install_query_profiler(app: FastAPI):
+    _install_listener()
+
+    @app.middleware("http")
+    async def profile_queries(request: Request, call_next):
+        profile = QueryProfile(label=f"{request.method} {request.url.path}")
+        token = _current_profile.set(profile)
+        try:
+            response = await call_next(request)
+        finally:
+            _current_profile.reset(token)
+
+        if profile.over_budget or profile.repeated():
+            logger.warning("Query budget report:\n%s", profile.summary())
+
+        response.headers["X-Query-Count"] = str(profile.count)
+        return response
+
+
+@contextmanager
+def count_queries():
+    """
+    Capture every statement run on any engine while the block executes
+    """
+    _install_listener()
+    profile = QueryProfile(label="captured block", mode="warn")
+    with _captures_lock:
+        _captures.append(profile)
+    try:
+        yield profile
+    finally:
+        with _captures_lock:
+            _captures.remove(profile)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int, allow_repeats: bool = True):
+    """
+    Test helper: fail if the block runs more than max_queries statements
+
+        with assert_max_queries(3):
+            client.get("/api/orders/", headers=auth_headers)
+    """
+    with count_queries() as profile:
+        profile.budget = max_queries
+        yield profile
+
+    if profile.over_budget:
+        raise AssertionError(profile.summary())
+    if not allow_repeats and profile.repeated():
+        raise AssertionError(f"Repeated statements detected (possible N+1):\n{profile.summary()}")
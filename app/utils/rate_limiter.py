@@ -0,0 +1,157 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+import jwt
+from fastapi import HTTPException, Request, status
+
+from app.config import (
+    RATE_LIMIT_ENABLED, RATE_LIMIT_BACKEND, RATE_LIMIT_TRUST_PROXY, RATE_LIMITS, REDIS_URL
+)
+
+# Atomic token bucket: refill from elapsed time, then try to take `cost` tokens.
+# Uses the Redis clock so workers with skewed clocks share one timeline.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(retry_after)
+"""
+
+
+def parse_limit(limit: str) -> Tuple[float, float]:
+    """
+    "5/60" -> (capacity 5, refill 5/60 tokens per second)
+    """
+    requests, seconds = limit.split("/")
+    capacity = float(requests)
+    return capacity, capacity / float(seconds)
+
+
+class MemoryBackend:
+    """
+    Token buckets for a single process, one LRU-ordered dict per limit
+    """
+    max_keys = 100_000  # per limit
+
+    def __init__(self):
+        self._limits: Dict[Tuple[float, float], OrderedDict] = {}
+        self._lock = threading.Lock()
+
+    async def hit(self, key: str, capacity: float, rate: float, cost: float = 1) -> float:
+        now = time.monotonic()
+        with self._lock:
+            buckets = self._limits.setdefault((capacity, rate), OrderedDict())
+            # Popping and re-inserting keeps the least recently hit bucket at the front
+            tokens, ts = buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - ts) * rate)
+            if tokens >= cost:
+                buckets[key] = (tokens - cost, now)
+                retry_after = 0.0
+            else:
+                buckets[key] = (tokens, now)
+                retry_after = (cost - tokens) / rate
+            self._evict(buckets, capacity / rate, now)
+        return retry_after
+
+    def _evict(self, buckets: OrderedDict, refill_seconds: float, now: float):
+        # A bucket idle for a full refill is back at capacity, so dropping it changes nothing.
+        # Past max_keys the least recently hit bucket goes even if it isn't full yet.
+        # Each hit adds at most one bucket, so this is amortized O(1).
+        while buckets:
+            _, ts = next(iter(buckets.values()))
+            if now - ts < refill_seconds and len(buckets) <= self.max_keys:
+                break
+            buckets.popitem(last=False)
+
+    def reset(self):
+        with self._lock:
+            self._limits.clear()
+
+
+class RedisBackend:
+    """
+    Token buckets in Redis, shared by every worker
+    """
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def hit(self, key: str, capacity: float, rate: float, cost: float = 1) -> float:
+        return float(await self._script(keys=[f"ratelimit:{key}"], args=[capacity, rate, cost]))
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = RedisBackend(REDIS_URL) if RATE_LIMIT_BACKEND == "redis" else MemoryBackend()
+    return _backend
+
+
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_PROXY:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _identity(request: Request, scope: str) -> str:
+    if scope == "route":
+        return "all"
+    if scope == "user":
+        authorization = request.headers.get("authorization", "")
+        if authorization.lower().startswith("bearer "):
+            # Only picks the bucket; the route still verifies the token. A forged sub
+            # just spends that user's allowance, so skip the signature check here
+            try:
+                subject = jwt.decode(authorization[7:], options={"verify_signature": False}).get("sub")
+            except jwt.PyJWTError:
+                subject = None
+            if subject is not None:
+                return f"user:{subject}"
+    return f"ip:{client_ip(request)}"
+
+
+def rate_limit(name: str, scope: str = "ip"):
+    """
+    Dependency enforcing the RATE_LIMITS[name] bucket.
+
+    scope: "ip" per client address, "user" per authenticated user (IP for anonymous
+    callers), or "route" for one bucket shared by every caller.
+    """
+    capacity, rate = parse_limit(RATE_LIMITS[name])
+
+    async def dependency(request: Request):
+        if not RATE_LIMIT_ENABLED:
+            return
+        retry_after = await get_backend().hit(f"{name}:{_identity(request, scope)}", capacity, rate)
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+
+    return dependency
@@ -0,0 +1,58 @@
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config import RECENT_ORDERS_BUFFER_SIZE, RECENT_ORDERS_TTL
+from app.utils.events import order_events
+
+Summary = Dict[str, Any]
+
+
+class RecentOrders:
+    """
+    Capped newest-first ring of order summaries for the admin dashboard.
+
+    Orders created or updated in this process are written through (and published on
+    order_events); the ring is reloaded from the database when it is older than `ttl`,
+    which picks up orders placed through other workers.
+    """
+    def __init__(self, size: int, ttl: float):
+        self.size = size
+        self.ttl = ttl
+        self._orders = deque(maxlen=size)
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def get(self, limit: int, loader: Callable[[int], List[Summary]]) -> List[Summary]:
+        """
+        The newest `limit` summaries; `loader(size)` fetches the ring's contents when it is cold
+        """
+        with self._lock:
+            fresh = self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+            if fresh:
+                return [dict(order) for order in islice(self._orders, limit)]
+        orders = loader(self.size)
+        with self._lock:
+            self._orders = deque(orders, maxlen=self.size)
+            self._loaded_at = time.monotonic()
+        return [dict(order) for order in orders[:limit]]
+
+    def add(self, summary: Summary):
+        with self._lock:
+            self._orders.appendleft(summary)
+        order_events.publish("order_created", summary)
+
+    def update(self, order_id: int, **changes):
+        summary = None
+        with self._lock:
+            for order in self._orders:
+                if order["id"] == order_id:
+                    order.update(changes)
+                    summary = dict(order)
+                    break
+        order_events.publish("order_updated", summary or {"id": order_id, **changes})
+
+
+recent_orders = RecentOrders(RECENT_ORDERS_BUFFER_SIZE, RECENT_ORDERS_TTL)
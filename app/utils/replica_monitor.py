@@ -0,0 +1,23 @@
+import asyncio
+import logging
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+
+async def _monitor(router, engine, interval: float):
+    while True:
+        try:
+            await run_in_threadpool(router.refresh, engine)
+        except Exception:
+            logger.exception("Measuring replica lag failed")
+        await asyncio.sleep(interval)
+
+
+async def run_replica_monitor(router):
+    """
+    Measure each replica's lag every check interval until cancelled. One task per replica,
+    so a replica slow to answer only delays its own reading.
+    """
+    await asyncio.gather(*(_monitor(router, engine, router.check_interval) for engine in router.engines))
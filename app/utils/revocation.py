@@ -0,0 +1,174 @@
+import hashlib
+import logging
+import threading
+import time
+from typing import Dict
+
+from app.config import (
+    REVOCATION_BACKEND, REVOCATION_SYNC_SECONDS, REVOCATION_FILTER_BITS, REVOCATION_FILTER_HASHES,
+    ACCESS_TOKEN_MINUTES, REDIS_URL
+)
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Fixed-size set membership with false positives but no false negatives
+    """
+    def __init__(self, bits: int, hashes: int):
+        self.bits = bits
+        self.hashes = hashes
+        self._array = bytearray((bits + 7) // 8)
+
+    def _positions(self, key: str):
+        # Double hashing: k positions from one 128-bit digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self._array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._array[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class MemoryBackend:
+    """
+    Revocations in this process only
+    """
+    def __init__(self):
+        self._entries: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: str, expires_at: float):
+        with self._lock:
+            self._entries[key] = max(expires_at, self._entries.get(key, 0))
+
+    def load(self, now: float) -> Dict[str, float]:
+        with self._lock:
+            # Expired tokens can't be presented any more, so their entries can go
+            self._entries = {key: expires_at for key, expires_at in self._entries.items() if expires_at > now}
+            return dict(self._entries)
+
+    def confirm(self, key: str, now: float) -> bool:
+        with self._lock:
+            return self._entries.get(key, 0) > now
+
+
+class RedisBackend:
+    """
+    Revocations in one Redis sorted set scored by expiry, shared by every worker
+    """
+    key = "revoked-tokens"
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+
+    def add(self, key: str, expires_at: float):
+        pipe = self._client.pipeline(transaction=False)
+        pipe.zadd(self.key, {key: expires_at}, gt=True)
+        pipe.zremrangebyscore(self.key, "-inf", time.time())
+        pipe.execute()
+
+    def load(self, now: float) -> Dict[str, float]:
+        rows = self._client.zrangebyscore(self.key, f"({now}", "+inf", withscores=True)
+        return {key.decode(): expires_at for key, expires_at in rows}
+
+    def confirm(self, key: str, now: float) -> bool:
+        expires_at = self._client.zscore(self.key, key)
+        return expires_at is not None and expires_at > now
+
+
+class RevocationList:
+    """
+    Revoked token ids and account versions, checked on every authenticated request.
+
+    A local bloom filter answers the common "not revoked" case without a lookup; only
+    filter hits are confirmed against the backend, so false positives never reject a
+    valid token. The filter is rebuilt from the backend every `sync_seconds`, which picks
+    up other workers' revocations and drops expired entries.
+    """
+    def __init__(self, backend, bits: int, hashes: int, sync_seconds: float):
+        self.backend = backend
+        self.bits = bits
+        self.hashes = hashes
+        self.sync_seconds = sync_seconds
+        self._filter = BloomFilter(bits, hashes)
+        self._synced_at = float("-inf")
+        self._syncing = False
+        self._lock = threading.Lock()
+
+    def revoke(self, key: str, expires_at: float):
+        self.backend.add(key, expires_at)
+        with self._lock:
+            self._filter.add(key)
+
+    def _sync(self):
+        with self._lock:
+            if self._syncing or time.monotonic() - self._synced_at < self.sync_seconds:
+                return
+            self._syncing = True
+        try:
+            entries = self.backend.load(time.time())
+            rebuilt = BloomFilter(self.bits, self.hashes)
+            for key in entries:
+                rebuilt.add(key)
+            with self._lock:
+                self._filter = rebuilt
+                self._synced_at = time.monotonic()
+        except Exception:
+            # Keep the previous filter; retried on the next check
+            logger.exception("Syncing revoked tokens failed")
+        finally:
+            with self._lock:
+                self._syncing = False
+
+    def is_revoked(self, key: str) -> bool:
+        self._sync()
+        if key not in self._filter:
+            return False
+        try:
+            return self.backend.confirm(key, time.time())
+        except Exception:
+            # The filter says it may be revoked and we can't check: refuse it
+            logger.exception("Confirming a revoked token failed")
+            return True
+
+
+_revocations = None
+
+
+def get_revocations() -> RevocationList:
+    global _revocations
+    if _revocations is None:
+        backend = RedisBackend(REDIS_URL) if REVOCATION_BACKEND == "redis" else MemoryBackend()
+        _revocations = RevocationList(backend, REVOCATION_FILTER_BITS, REVOCATION_FILTER_HASHES, REVOCATION_SYNC_SECONDS)
+    return _revocations
+
+
+def revoke_token(jti: str, expires_at: float):
+    """
+    Reject one token (by its jti) until it would have expired anyway
+    """
+    get_revocations().revoke(f"jti:{jti}", expires_at)
+
+
+def revoke_user_version(user_id: int, version: int):
+    """
+    Reject every access token issued at `version` of the account; the caller has already
+    bumped User.token_version, so no new ones are issued at it
+    """
+    get_revocations().revoke(f"user:{user_id}:{version}", time.time() + ACCESS_TOKEN_MINUTES * 60)
+
+
+def is_revoked(claims: dict) -> bool:
+    revocations = get_revocations()
+    return revocations.is_revoked(f"jti:{claims.get('jti')}") or revocations.is_revoked(
+        f"user:{claims['sub']}:{claims.get('ver', 0)}"
+    )
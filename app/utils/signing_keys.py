@@ -0,0 +1,176 @@
+import glob
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import JWT_ALGORITHM, JWT_SECRET_KEY, JWT_KEYS_DIR, JWT_ACTIVE_KID, JWT_KEYS_RELOAD_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Algorithms verified with a public key; HS256 keeps using the shared secret
+ASYMMETRIC_ALGORITHMS = {"RS256", "EdDSA"}
+
+
+class UnknownKey(Exception):
+    pass
+
+
+def _load_pem(path: str, private: bool):
+    # cryptography is only needed once asymmetric signing is configured
+    from cryptography.hazmat.primitives import serialization
+
+    with open(path, "rb") as f:
+        data = f.read()
+    if private:
+        return serialization.load_pem_private_key(data, password=None)
+    return serialization.load_pem_public_key(data)
+
+
+def _to_jwk(public_key, algorithm: str) -> Dict[str, Any]:
+    from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+    if algorithm == "RS256":
+        return RSAAlgorithm.to_jwk(public_key, as_dict=True)
+    return OKPAlgorithm.to_jwk(public_key, as_dict=True)
+
+
+class KeyRing:
+    """
+    Signing keys by kid, read from `keys_dir` and kept parsed in memory.
+
+    `<kid>.pem` is a private key: the active one signs, the others still verify.
+    `<kid>.pub.pem` is the public half of a retired key whose private key has been
+    removed; keep it until tokens signed with it have expired (REFRESH_TOKEN_DAYS).
+    The directory is rescanned every `reload_seconds`, so a key staged ahead of activation
+    is published in the JWKS without a restart; a token with an unknown kid rescans it right
+    away (repeats of the same unknown kid at most every `reload_seconds`). Only files that
+    are new or changed since the last scan are parsed.
+    """
+    max_misses = 1024
+
+    def __init__(self, algorithm: str, keys_dir: str, active_kid: Optional[str], reload_seconds: float):
+        self.algorithm = algorithm
+        self.keys_dir = keys_dir
+        self.active_kid = active_kid
+        self.reload_seconds = reload_seconds
+        self._private: Dict[str, Any] = {}
+        self._public: Dict[str, Any] = {}
+        self._jwks: Optional[Dict[str, Any]] = None
+        # path -> (mtime, parsed key) as of the last scan
+        self._files: Dict[str, Tuple[float, Any]] = {}
+        self._scanned_at = float("-inf")
+        # Unknown kid -> when it last triggered a rescan
+        self._misses: Dict[Optional[str], float] = {}
+        self._lock = threading.Lock()
+
+    def _scan(self):
+        files = {}
+        for path in glob.glob(os.path.join(self.keys_dir, "*.pem")):
+            mtime = os.stat(path).st_mtime
+            cached = self._files.get(path)
+            if cached is not None and cached[0] == mtime:
+                files[path] = cached
+            else:
+                files[path] = (mtime, _load_pem(path, private=not path.endswith(".pub.pem")))
+        self._scanned_at = time.monotonic()
+        if self._jwks is not None and files.keys() == self._files.keys() and all(files[path] is self._files[path] for path in files):
+            return
+
+        private, public = {}, {}
+        for path, (_, key) in files.items():
+            name = os.path.basename(path)
+            if name.endswith(".pub.pem"):
+                public[name[:-len(".pub.pem")]] = key
+            else:
+                kid = name[:-len(".pem")]
+                private[kid] = key
+                public[kid] = key.public_key()
+        if self.active_kid not in private:
+            raise RuntimeError(f"No private key {self.active_kid}.pem in {self.keys_dir} for JWT_ACTIVE_KID")
+        self._files, self._private, self._public = files, private, public
+        self._jwks = {"keys": [
+            {**_to_jwk(key, self.algorithm), "kid": kid, "alg": self.algorithm, "use": "sig"}
+            for kid, key in sorted(public.items())
+        ]}
+
+    def _refresh(self):
+        if time.monotonic() - self._scanned_at < self.reload_seconds:
+            return
+        with self._lock:
+            if self._jwks is None:
+                self._scan()
+            elif time.monotonic() - self._scanned_at >= self.reload_seconds:
+                try:
+                    self._scan()
+                except Exception:
+                    # E.g. a key file caught half-written; keep the keys we have until the next scan
+                    logger.exception("Reloading signing keys from %s failed", self.keys_dir)
+
+    def _rescan_for(self, kid: Optional[str]):
+        with self._lock:
+            if kid in self._public:
+                return
+            now = time.monotonic()
+            if now - self._misses.get(kid, float("-inf")) < self.reload_seconds:
+                return
+            if len(self._misses) >= self.max_misses:
+                self._misses.clear()
+            self._misses[kid] = now
+            try:
+                self._scan()
+            except Exception:
+                logger.exception("Rescanning %s for signing key %s failed", self.keys_dir, kid)
+
+    def signing_key(self) -> Tuple[str, Any]:
+        self._refresh()
+        return self.active_kid, self._private[self.active_kid]
+
+    def verification_key(self, kid: Optional[str]):
+        self._refresh()
+        key = self._public.get(kid)
+        if key is None:
+            self._rescan_for(kid)
+            key = self._public.get(kid)
+        if key is None:
+            raise UnknownKey(kid)
+        return key
+
+    def jwks(self) -> Dict[str, Any]:
+        self._refresh()
+        return self._jwks
+
+
+_key_ring: Optional[KeyRing] = None
+
+
+def get_key_ring() -> KeyRing:
+    global _key_ring
+    if _key_ring is None:
+        _key_ring = KeyRing(JWT_ALGORITHM, JWT_KEYS_DIR, JWT_ACTIVE_KID, JWT_KEYS_RELOAD_SECONDS)
+    return _key_ring
+
+
+def signing_key() -> Tuple[Optional[str], Any]:
+    """
+    (kid, key) to sign new tokens with; no kid with the HS256 shared secret
+    """
+    if JWT_ALGORITHM not in ASYMMETRIC_ALGORITHMS:
+        return None, JWT_SECRET_KEY
+    return get_key_ring().signing_key()
+
+
+def verification_key(kid: Optional[str]):
+    if JWT_ALGORITHM not in ASYMMETRIC_ALGORITHMS:
+        return JWT_SECRET_KEY
+    return get_key_ring().verification_key(kid)
+
+
+def jwks() -> Dict[str, Any]:
+    """
+    Public keys for other services to verify our tokens; empty while tokens use a shared secret
+    """
+    if JWT_ALGORITHM not in ASYMMETRIC_ALGORITHMS:
+        return {"keys": []}
+    return get_key_ring().jwks()
@@ -0,0 +1,144 @@
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+from app.config import TRENDING_BACKEND, REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+# window -> (seconds covered, bucket size). A window sums its most recent buckets, so it
+# covers between `seconds - bucket` and `seconds` of sales.
+WINDOWS = {
+    "hour": (3600, 300),
+    "day": (86400, 3600),
+    "week": (7 * 86400, 86400),
+}
+
+# bucket size -> seconds a bucket must be kept for the longest window using it
+RETENTION = {}
+for _seconds, _bucket in WINDOWS.values():
+    RETENTION[_bucket] = max(RETENTION.get(_bucket, 0), _seconds + _bucket)
+
+# Seconds a computed window ranking is reused before the buckets are summed again
+TOP_CACHE_SECONDS = 2
+
+
+def _window_buckets(window: str, now: float) -> Tuple[int, range]:
+    seconds, bucket = WINDOWS[window]
+    last = int(now // bucket)
+    return bucket, range(last - seconds // bucket + 1, last + 1)
+
+
+class MemoryBackend:
+    """
+    Time-bucketed sales counters in this process only
+    """
+    def __init__(self):
+        self._buckets: Dict[Tuple[int, int], Counter] = {}
+        self._lock = threading.Lock()
+
+    def add(self, counts: Dict[int, int], at: float):
+        now = time.time()
+        with self._lock:
+            for bucket, retention in RETENTION.items():
+                if at < now - retention:
+                    continue
+                self._buckets.setdefault((bucket, int(at // bucket)), Counter()).update(counts)
+            # Drop buckets no window reaches any more
+            for key in [key for key in self._buckets if (key[1] + 1) * key[0] < now - RETENTION[key[0]]]:
+                del self._buckets[key]
+
+    def top(self, window: str, limit: int) -> List[Tuple[int, int]]:
+        bucket, indexes = _window_buckets(window, time.time())
+        total = Counter()
+        with self._lock:
+            for index in indexes:
+                total.update(self._buckets.get((bucket, index), {}))
+        return [(product_id, units) for product_id, units in total.most_common() if units > 0][:limit]
+
+
+class RedisBackend:
+    """
+    Sales counters in Redis sorted sets (one per time bucket), shared by every worker
+    """
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+
+    def add(self, counts: Dict[int, int], at: float):
+        pipe = self._client.pipeline(transaction=False)
+        for bucket, retention in RETENTION.items():
+            key = f"trending:{bucket}:{int(at // bucket)}"
+            for product_id, units in counts.items():
+                pipe.zincrby(key, units, product_id)
+            pipe.expireat(key, int((int(at // bucket) + 1) * bucket + retention))
+        pipe.execute()
+
+    def top(self, window: str, limit: int) -> List[Tuple[int, int]]:
+        key = f"trending:top:{window}"
+        if not self._client.exists(key):
+            bucket, indexes = _window_buckets(window, time.time())
+            pipe = self._client.pipeline(transaction=False)
+            pipe.zunionstore(key, [f"trending:{bucket}:{index}" for index in indexes])
+            pipe.expire(key, TOP_CACHE_SECONDS)
+            pipe.execute()
+        rows = self._client.zrevrangebyscore(key, "+inf", "(0", start=0, num=limit, withscores=True)
+        return [(int(product_id), int(units)) for product_id, units in rows]
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = RedisBackend(REDIS_URL) if TRENDING_BACKEND == "redis" else MemoryBackend()
+    return _backend
+
+
+def record_sales(counts: Dict[int, int], at: datetime):
+    """
+    Add units sold (negative to take back a cancelled sale) to the buckets covering `at`
+    """
+    counts = {product_id: units for product_id, units in counts.items() if units}
+    if not counts:
+        return
+    if at.tzinfo is None:
+        # SQLite hands back naive UTC timestamps
+        at = at.replace(tzinfo=timezone.utc)
+    try:
+        get_backend().add(counts, at.timestamp())
+    except Exception:
+        # Counters are best effort; the order itself is already committed
+        logger.exception("Recording trending sales failed")
+
+
+def backfill_once():
+    """
+    Reload the counters from recent orders; for the memory backend, which starts out empty
+    """
+    from app.database import SessionLocal
+    from app.controllers.order_controller import backfill_trending
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        units = backfill_trending(db)
+        logger.info("Loaded %d recently sold units into the trending counters in %.1f ms",
+                    units, (time.perf_counter() - started) * 1000)
+    except Exception:
+        # An unreachable or unmigrated database must not keep the app from starting
+        logger.exception("Loading the trending counters failed")
+    finally:
+        db.close()
+
+
+def top_products(window: str, limit: int) -> List[Tuple[int, int]]:
+    """
+    (product_id, units sold) for the best sellers in `window`, highest first
+    """
+    return get_backend().top(window, limit)
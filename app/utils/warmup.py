@@ -0,0 +1,69 @@
+import logging
+import time
+from typing import List
+
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import configure_mappers
+
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def warm_pool(engine: Engine, connections: int):
+    """
+    Open connections up front so the first requests don't pay for connects
+    """
+    opened = []
+    try:
+        for _ in range(connections):
+            conn = engine.connect()
+            conn.execute(text("SELECT 1"))
+            opened.append(conn)
+    finally:
+        # Closing returns them to the pool, still connected
+        for conn in opened:
+            conn.close()
+    return len(opened)
+
+
+def warm_queries():
+    """
+    Run the hot read paths once to compile their SQL and build the response validators
+    """
+    from app.controllers import category_controller, product_controller
+    from app.models.user import User
+    from app.schemas.category_schema import CategoryOut
+    from app.schemas.product_schema import ProductWithCategory
+    from app.schemas.user_schema import UserOut
+
+    db = SessionLocal()
+    try:
+        for product in product_controller.get_products(db, limit=1):
+            ProductWithCategory.model_validate(product)
+        for category in category_controller.get_categories(db, limit=1):
+            CategoryOut.model_validate(category)
+        user = db.query(User).filter(User.id == 0).first()
+        if user:
+            UserOut.model_validate(user)
+    finally:
+        db.rollback()
+        db.close()
+
+
+def warm_up(app: FastAPI, engines: List[Engine], pool_connections: int):
+    started = time.perf_counter()
+    configure_mappers()
+    app.openapi()
+    opened = 0
+    try:
+        for engine in engines:
+            opened += warm_pool(engine, pool_connections)
+        warm_queries()
+    except Exception:
+        # An unreachable or unmigrated database must not keep the app from starting
+        logger.exception("Warm-up failed")
+    logger.info("Warm-up finished in %.1f ms (%d pooled connections)",
+                (time.perf_counter() - started) * 1000, opened)
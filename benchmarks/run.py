@@ -0,0 +1,172 @@
+"""
+Drive the API through the benchmark scenarios and report latency percentiles.
+
+    python -m benchmarks.run --scale small --seed                 # seed, then run in-process
+    python -m benchmarks.run --scale small --base-url http://localhost:8000
+    python -m benchmarks.run --scale small --save-baseline        # record benchmarks/baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.settings import DEFAULT_BASELINE, DEFAULT_DATABASE_URL, SCALES, resolve_scale
+
+
+def percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies, errors: int, wall_seconds: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": round(len(latencies) / wall_seconds, 2) if wall_seconds else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def make_client_factory(base_url):
+    if base_url:
+        import httpx
+
+        return lambda: httpx.Client(base_url=base_url, timeout=30)
+
+    # In-process: the app binds to DATABASE_URL at import time
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    return lambda: TestClient(app)
+
+
+def run_scenario(name, scenario, client_factory, ctx, iterations: int, concurrency: int, warmup: int):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    local = threading.local()
+
+    def client():
+        if not hasattr(local, "client"):
+            local.client = client_factory()
+        return local.client
+
+    def one(record: bool):
+        nonlocal errors
+        started = time.perf_counter()
+        responses = scenario(client(), ctx)
+        elapsed = time.perf_counter() - started
+        if record:
+            with lock:
+                latencies.append(elapsed)
+                errors += sum(1 for response in responses if response.status_code >= 400)
+
+    for _ in range(warmup):
+        one(False)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(lambda _: one(True), range(iterations)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def compare(results: dict, baseline: dict, threshold: float):
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current["throughput"] < previous["throughput"] * (1 - threshold):
+            regressions.append(f"{name}: throughput {previous['throughput']}/s -> {current['throughput']}/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API benchmark scenarios")
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--base-url", help="Benchmark a running server over HTTP instead of in-process")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--products", type=int)
+    parser.add_argument("--orders", type=int)
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--seed", action="store_true", help="(Re)seed the database before running")
+    parser.add_argument("--scenario", action="append", help="Run only the named scenario(s)")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative regression (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    scale = resolve_scale(args.scale, products=args.products, orders=args.orders, users=args.users)
+    os.environ["DATABASE_URL"] = args.database_url
+    # Measure the endpoints, not the per-IP rate limits
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+    if args.database_url.startswith("sqlite:///"):
+        os.makedirs(os.path.dirname(args.database_url[len("sqlite:///"):]) or ".", exist_ok=True)
+
+    if args.seed:
+        from benchmarks.seed import seed
+
+        print("seeded:", seed(args.database_url, scale))
+
+    from benchmarks.scenarios import SCENARIOS, ScenarioContext
+
+    names = args.scenario or list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    client_factory = make_client_factory(args.base_url)
+    ctx = ScenarioContext(scale)
+
+    results = {}
+    print(f"{'scenario':<16}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name in names:
+        result = run_scenario(name, SCENARIOS[name], client_factory, ctx, args.iterations, args.concurrency, args.warmup)
+        results[name] = result
+        print(f"{name:<16}{result['throughput']:>10}{result['p50_ms']:>10}{result['p95_ms']:>10}"
+              f"{result['p99_ms']:>10}{result['errors']:>8}")
+
+    report = {
+        "mode": "http" if args.base_url else "in-process",
+        "scale": scale,
+        "iterations": args.iterations,
+        "concurrency": args.concurrency,
+        "python": platform.python_version(),
+        "scenarios": results,
+    }
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline written to {args.baseline}")
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("REGRESSIONS:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("no regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import random
+
+from benchmarks.seed import INACTIVE_EVERY, WORDS
+from benchmarks.settings import BENCHMARK_PASSWORD, user_email
+
+
+class ScenarioContext:
+    def __init__(self, scale: dict, seed_value: int = 7):
+        self.scale = scale
+        self.rng = random.Random(seed_value)
+        self._tokens = {}
+
+    def token(self, user_id: int) -> str:
+        # Tokens are minted locally, so an HTTP target must share JWT_SECRET_KEY
+        if user_id not in self._tokens:
+            from app.utils.jwt_handler import create_access_token
+            # The seeder makes user 1 the admin
+            self._tokens[user_id] = create_access_token(
+                user_id, user_email(user_id), user_id == 1, 0, expires_minutes=24 * 60
+            )
+        return self._tokens[user_id]
+
+    def user_headers(self):
+        user_id = self.rng.randint(2, self.scale["users"])
+        return user_id, {"Authorization": f"Bearer {self.token(user_id)}"}
+
+    def admin_headers(self):
+        return {"Authorization": f"Bearer {self.token(1)}"}
+
+    def product_id(self):
+        # Skip the products the seeder deactivated
+        product_id = self.rng.randint(1, self.scale["products"])
+        if product_id % INACTIVE_EVERY == 0:
+            product_id -= 1
+        return product_id
+
+
+def login(client, ctx: ScenarioContext):
+    # Password check and token issue, then the profile read the client makes next
+    user_id = ctx.rng.randint(2, ctx.scale["users"])
+    response = client.post("/api/users/login", json={"email": user_email(user_id), "password": BENCHMARK_PASSWORD})
+    responses = [response]
+    if response.status_code == 200:
+        token = response.json()["access_token"]
+        responses.append(client.get("/api/users/me", headers={"Authorization": f"Bearer {token}"}))
+    return responses
+
+
+def catalog_browse(client, ctx: ScenarioContext):
+    category_id = ctx.rng.randint(1, ctx.scale["categories"])
+    skip = ctx.rng.randint(0, 5) * 20
+    subtree = "true" if ctx.rng.random() < 0.5 else "false"
+    return [client.get(
+        f"/api/products/?category_id={category_id}&include_descendants={subtree}&skip={skip}&limit=20"
+    )]
+
+
+def sorted_listing(client, ctx: ScenarioContext):
+    # First page plus the next one through the keyset cursor
+    sort = ctx.rng.choice(["price_asc", "price_desc", "newest", "best_selling", "top_rated"])
+    category_id = ctx.rng.randint(1, ctx.scale["categories"])
+    first = client.get(f"/api/products/?category_id={category_id}&sort={sort}&limit=20")
+    responses = [first]
+    cursor = first.headers.get("x-next-cursor")
+    if cursor:
+        responses.append(client.get(f"/api/products/?category_id={category_id}&sort={sort}&limit=20&cursor={cursor}"))
+    return responses
+
+
+def faceted_browse(client, ctx: ScenarioContext):
+    category_id = ctx.rng.randint(1, ctx.scale["categories"])
+    filters = ctx.rng.choice(["", "&in_stock=true", "&max_price=100", "&min_rating=3", "&min_price=50&in_stock=true"])
+    return [client.get(
+        f"/api/products/browse?category_id={category_id}&include_descendants=true{filters}&limit=24"
+    )]
+
+
+def category_tree(client, ctx: ScenarioContext):
+    return [client.get("/api/categories/tree")]
+
+
+def search(client, ctx: ScenarioContext):
+    return [client.get(f"/api/products/search?q={ctx.rng.choice(WORDS)}&limit=20")]
+
+
+def product_detail(client, ctx: ScenarioContext):
+    return [client.get(f"/api/products/{ctx.product_id()}")]
+
+
+def product_batch(client, ctx: ScenarioContext):
+    # A cart or wishlist page: 20 products in one call
+    ids = ",".join(str(ctx.product_id()) for _ in range(20))
+    return [client.get(f"/api/products/batch?ids={ids}")]
+
+
+def trending(client, ctx: ScenarioContext):
+    return [client.get("/api/products/trending?window=day&limit=10")]
+
+
+def add_to_cart(client, ctx: ScenarioContext):
+    _, headers = ctx.user_headers()
+    return [client.post("/api/cart/add", json={"product_id": ctx.product_id(), "quantity": 1}, headers=headers)]
+
+
+def checkout(client, ctx: ScenarioContext):
+    _, headers = ctx.user_headers()
+    responses = [
+        client.post("/api/cart/add", json={"product_id": ctx.product_id(), "quantity": 1}, headers=headers)
+    ]
+    responses.append(client.post("/api/orders/", json={
+        "shipping_address": "1 Benchmark Way",
+        "billing_address": "1 Benchmark Way",
+        "payment_method": "card",
+    }, headers=headers))
+    return responses
+
+
+def order_history(client, ctx: ScenarioContext):
+    _, headers = ctx.user_headers()
+    return [client.get("/api/orders/?limit=20", headers=headers)]
+
+
+def admin_users(client, ctx: ScenarioContext):
+    return [client.get("/api/users/?limit=20", headers=ctx.admin_headers())]
+
+
+def admin_stats(client, ctx: ScenarioContext):
+    return [client.get("/api/admin/stats", headers=ctx.admin_headers())]
+
+
+def low_stock_report(client, ctx: ScenarioContext):
+    return [client.get("/api/admin/low-stock-products", headers=ctx.admin_headers())]
+
+
+SCENARIOS = {
+    "login": login,
+    "catalog_browse": catalog_browse,
+    "sorted_listing": sorted_listing,
+    "faceted_browse": faceted_browse,
+    "category_tree": category_tree,
+    "search": search,
+    "product_detail": product_detail,
+    "product_batch": product_batch,
+    "trending": trending,
+    "add_to_cart": add_to_cart,
+    "checkout": checkout,
+    "order_history": order_history,
+    "admin_users": admin_users,
+    "admin_stats": admin_stats,
+    "low_stock_report": low_stock_report,
+}
@@ -0,0 +1,255 @@
+"""
+Seed a benchmark database with a reproducible synthetic dataset.
+
+    python -m benchmarks.seed --database-url sqlite:///benchmarks/.data/bench.db --scale small
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from passlib.hash import bcrypt
+from sqlalchemy import create_engine, insert, text
+
+from benchmarks.settings import DEFAULT_DATABASE_URL, SCALES, BENCHMARK_PASSWORD, resolve_scale, user_email
+
+CHUNK_SIZE = 10_000
+INACTIVE_EVERY = 20  # every 20th product is soft-deleted
+
+WORDS = [
+    "classic", "vintage", "modern", "compact", "wireless", "organic", "premium", "smart",
+    "portable", "ergonomic", "leather", "cotton", "steel", "bamboo", "ceramic", "carbon",
+    "lamp", "chair", "desk", "speaker", "backpack", "kettle", "jacket", "watch",
+    "camera", "blender", "sneaker", "mug", "keyboard", "monitor", "tent", "bottle",
+]
+
+STATUS_WEIGHTS = [
+    ("PENDING", 10), ("CONFIRMED", 20), ("SHIPPED", 20), ("DELIVERED", 45), ("CANCELLED", 5),
+]
+
+
+def _tables():
+    # Import every model so the metadata is complete
+    from app.database import Base
+    from app.models import user, category, product, address, cart, order, review, inventory
+    return (Base, user.User, category.Category, category.CategoryClosure, product.Product,
+            order.Order, order.OrderItem, review.Review)
+
+
+def _chunks(rows, size=CHUNK_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _insert(conn, table, rows):
+    total = 0
+    for batch in _chunks(rows):
+        conn.execute(insert(table), batch)
+        total += len(batch)
+    return total
+
+
+def _reset_sequences(conn, tables):
+    # Explicit ids leave Postgres sequences behind; move them past the seeded rows
+    if conn.dialect.name != "postgresql":
+        return
+    for table in tables:
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+        ))
+
+
+def seed(database_url: str, scale: dict, seed_value: int = 42, drop: bool = True):
+    rng = random.Random(seed_value)
+    Base, User, Category, CategoryClosure, Product, Order, OrderItem, Review = _tables()
+    engine = create_engine(database_url)
+
+    if drop:
+        Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    hashed_password = bcrypt.hash(BENCHMARK_PASSWORD)
+    now = datetime.now()
+    counts = {}
+    started = time.perf_counter()
+
+    with engine.begin() as conn:
+        counts["users"] = _insert(conn, User.__table__, (
+            {
+                "id": i,
+                "username": f"user{i}",
+                "email": user_email(i),
+                "hashed_password": hashed_password,
+                "is_active": True,
+                "is_admin": i == 1,
+            }
+            for i in range(1, scale["users"] + 1)
+        ))
+
+        # One root per 20 categories; every other category hangs under an earlier one
+        roots = max(1, scale["categories"] // 20)
+        parents = {
+            i: None if i <= roots else rng.randint(1, i - 1)
+            for i in range(1, scale["categories"] + 1)
+        }
+        counts["categories"] = _insert(conn, Category.__table__, (
+            {"id": i, "name": f"Category {i}", "description": f"Benchmark category {i}",
+             "parent_id": parent_id, "is_active": True}
+            for i, parent_id in parents.items()
+        ))
+
+        def closure():
+            for i in parents:
+                node, depth = i, 0
+                while node is not None:
+                    yield {"ancestor_id": node, "descendant_id": i, "depth": depth}
+                    node, depth = parents[node], depth + 1
+
+        _insert(conn, CategoryClosure.__table__, closure())
+
+        prices = {}
+        names = {}
+
+        def products():
+            for i in range(1, scale["products"] + 1):
+                price = Decimal(rng.randint(199, 99_999)) / 100
+                prices[i] = price
+                name = " ".join(rng.sample(WORDS, 3))
+                names[i] = f"{name} {i}"
+                yield {
+                    "id": i,
+                    "name": f"{name} {i}",
+                    "description": f"A {name} for benchmarking. " * 4,
+                    "price": price,
+                    "sku": f"SKU-{i:08d}",
+                    "stock_quantity": 1_000_000,
+                    "is_active": i % INACTIVE_EVERY != 0,
+                    "category_id": rng.randint(1, scale["categories"]),
+                    "created_at": now - timedelta(minutes=rng.randint(0, 525_600)),
+                }
+
+        counts["products"] = _insert(conn, Product.__table__, products())
+
+        statuses = [status for status, _ in STATUS_WEIGHTS]
+        weights = [weight for _, weight in STATUS_WEIGHTS]
+        item_rows = []
+
+        def orders():
+            item_id = 0
+            for order_id in range(1, scale["orders"] + 1):
+                created_at = now - timedelta(minutes=rng.randint(0, 525_600))
+                total = Decimal(0)
+                for _ in range(rng.randint(1, 2 * scale["items_per_order"] - 1)):
+                    item_id += 1
+                    product_id = rng.randint(1, scale["products"])
+                    quantity = rng.randint(1, 3)
+                    total += prices[product_id] * quantity
+                    item_rows.append({
+                        "id": item_id,
+                        "order_id": order_id,
+                        "product_id": product_id,
+                        "quantity": quantity,
+                        "price": prices[product_id],
+                        "product_name": names[product_id],
+                        "product_sku": f"SKU-{product_id:08d}",
+                        "created_at": created_at,
+                    })
+                yield {
+                    "id": order_id,
+                    "user_id": rng.randint(1, scale["users"]),
+                    "total_amount": total,
+                    "status": rng.choices(statuses, weights)[0],
+                    "shipping_address": "1 Benchmark Way",
+                    "billing_address": "1 Benchmark Way",
+                    "payment_method": "card",
+                    "payment_status": "paid",
+                    "created_at": created_at,
+                }
+
+        # Orders and items are flushed together so items never outgrow one chunk
+        counts["orders"] = 0
+        counts["order_items"] = 0
+        for batch in _chunks(orders()):
+            conn.execute(insert(Order.__table__), batch)
+            counts["orders"] += len(batch)
+            counts["order_items"] += _insert(conn, OrderItem.__table__, item_rows)
+            item_rows.clear()
+
+        def reviews():
+            # One review per (user, product), matching uq_reviews_user_product
+            seen = set()
+            while len(seen) < scale["reviews"]:
+                pair = (rng.randint(1, scale["users"]), rng.randint(1, scale["products"]))
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                yield {
+                    "id": len(seen),
+                    "user_id": pair[0],
+                    "product_id": pair[1],
+                    "rating": rng.randint(1, 5),
+                    "comment": "Benchmark review",
+                }
+
+        counts["reviews"] = _insert(conn, Review.__table__, reviews())
+        # Same backfills as migrations 0004 and 0005, so rating facets and sort orders have data
+        conn.execute(text("""
+            UPDATE products SET sales_count = (
+                SELECT COALESCE(SUM(order_items.quantity), 0)
+                FROM order_items JOIN orders ON orders.id = order_items.order_id
+                WHERE order_items.product_id = products.id AND orders.status != 'CANCELLED'
+            )
+        """))
+        conn.execute(text("""
+            UPDATE products SET
+                rating_total = (SELECT COALESCE(SUM(rating), 0) FROM reviews WHERE reviews.product_id = products.id),
+                review_count = (SELECT COUNT(*) FROM reviews WHERE reviews.product_id = products.id)
+        """))
+        conn.execute(text(
+            "UPDATE products SET rating_avg = CAST(rating_total AS FLOAT) / review_count WHERE review_count > 0"
+        ))
+        # Order history summaries as migration 0009 does
+        conn.execute(text("""
+            UPDATE users SET
+                order_count = (SELECT COUNT(*) FROM orders WHERE orders.user_id = users.id),
+                last_order_id = (SELECT MAX(id) FROM orders WHERE orders.user_id = users.id),
+                last_order_at = (SELECT MAX(created_at) FROM orders WHERE orders.user_id = users.id)
+        """))
+        # Open stock alerts as migration 0008 does (seeded stock has no ledger or shards)
+        conn.execute(text("""
+            INSERT INTO stock_alerts (product_id, threshold, stock_quantity)
+            SELECT id, reorder_threshold, stock_quantity FROM products WHERE stock_quantity <= reorder_threshold
+        """))
+
+        _reset_sequences(conn, ["users", "categories", "products", "orders", "order_items", "reviews"])
+
+    engine.dispose()
+    counts["seconds"] = round(time.perf_counter() - started, 2)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a benchmark database")
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--products", type=int)
+    parser.add_argument("--orders", type=int)
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    scale = resolve_scale(args.scale, products=args.products, orders=args.orders, users=args.users)
+    counts = seed(args.database_url, scale, args.seed)
+    print(" ".join(f"{name}={value}" for name, value in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
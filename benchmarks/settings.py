@@ -0,0 +1,23 @@
+import os
+
+DEFAULT_DATABASE_URL = os.getenv("BENCHMARK_DATABASE_URL", "sqlite:///benchmarks/.data/bench.db")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+BENCHMARK_PASSWORD = "benchmark"
+
+
+def user_email(user_id: int) -> str:
+    # A real domain: EmailStr rejects reserved names such as .local
+    return f"user{user_id}@example.com"
+
+SCALES = {
+    "tiny": {"users": 100, "categories": 10, "products": 1_000, "orders": 2_000, "items_per_order": 4, "reviews": 2_000},
+    "small": {"users": 1_000, "categories": 50, "products": 10_000, "orders": 50_000, "items_per_order": 4, "reviews": 20_000},
+    "medium": {"users": 10_000, "categories": 500, "products": 100_000, "orders": 500_000, "items_per_order": 4, "reviews": 200_000},
+    "large": {"users": 100_000, "categories": 4_000, "products": 1_000_000, "orders": 5_000_000, "items_per_order": 4, "reviews": 2_000_000},
+}
+
+
+def resolve_scale(name: str, **overrides) -> dict:
+    scale = dict(SCALES[name])
+    scale.update({key: value for key, value in overrides.items() if value is not None})
+    return scale
@@ -0,0 +1,90 @@
+"""
+Measure cold start: module import time, lifespan startup and first vs. warm request latency.
+
+Each sample runs in a fresh interpreter so nothing is cached between samples.
+
+    python -m benchmarks.startup --samples 5
+    python -m benchmarks.startup --samples 5 --save-baseline
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.settings import DEFAULT_DATABASE_URL
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "startup_baseline.json")
+
+PROBE = r"""
+import json, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app.main.app) as client:
+    ready = time.perf_counter()
+    client.get("/api/products/?limit=20")
+    first = time.perf_counter()
+    client.get("/api/products/?limit=20")
+    second = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "first_request_ms": (first - ready) * 1000,
+    "warm_request_ms": (second - first) * 1000,
+}))
+"""
+
+
+def sample(database_url: str, warmup: bool) -> dict:
+    env = dict(os.environ, DATABASE_URL=database_url, STARTUP_WARMUP=str(warmup).lower())
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import time and first-request latency")
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args()
+
+    report = {}
+    for warmup in (False, True):
+        samples = [sample(args.database_url, warmup) for _ in range(args.samples)]
+        label = "warmup" if warmup else "no_warmup"
+        report[label] = {key: round(statistics.median(s[key] for s in samples), 2) for key in samples[0]}
+        print(label, " ".join(f"{key}={value}" for key, value in report[label].items()))
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline written to {args.baseline}")
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = [
+            f"{label}.{key}: {baseline[label][key]} -> {value}"
+            for label, values in report.items()
+            for key, value in values.items()
+            if key in ("import_ms", "first_request_ms")
+            and value > baseline.get(label, {}).get(key, float("inf")) * (1 + args.threshold)
+        ]
+        if regressions:
+            print("REGRESSIONS:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("no regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Flash-sale stress test: many concurrent checkouts of one product, ledger stock vs. sharded stock.
+
+Needs a seeded database (benchmarks.seed / benchmarks.run --seed) for the users.
+
+    python -m benchmarks.stock_contention --stock 200 --attempts 400 --concurrency 16
+    python -m benchmarks.stock_contention --shards 0 --shards 8 --shards 32 --database-url postgresql://...
+
+Reports checkout throughput and latency, successful orders, and how far stock was oversold;
+exits non-zero if any mode oversold.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.settings import DEFAULT_DATABASE_URL, SCALES, resolve_scale
+
+ORDER = {"shipping_address": "1 Benchmark Way", "billing_address": "1 Benchmark Way", "payment_method": "card"}
+
+
+def run_mode(client_factory, ctx, shards: int, stock: int, attempts: int, concurrency: int) -> dict:
+    from benchmarks.run import summarize
+
+    admin = client_factory()
+    created = admin.post("/api/products/", json={
+        "name": f"Flash sale {shards} shards",
+        "price": "9.99",
+        "sku": f"FLASH-{uuid.uuid4().hex[:12]}",
+        "stock_quantity": stock,
+        "category_id": 1,
+    }, headers=ctx.admin_headers())
+    created.raise_for_status()
+    product_id = created.json()["id"]
+    if shards:
+        admin.put(f"/api/products/{product_id}", json={"stock_shards": shards},
+                  headers=ctx.admin_headers()).raise_for_status()
+
+    latencies = []
+    outcomes = {"ok": 0, "sold_out": 0, "errors": 0}
+    lock = threading.Lock()
+    local = threading.local()
+
+    def attempt(index: int):
+        if not hasattr(local, "client"):
+            local.client = client_factory()
+        client = local.client
+        # Consecutive attempts use different users, so in-flight checkouts never share a cart
+        user_id = 2 + index % (ctx.scale["users"] - 1)
+        headers = {"Authorization": f"Bearer {ctx.token(user_id)}"}
+        client.delete("/api/cart/clear", headers=headers)
+        client.post("/api/cart/add", json={"product_id": product_id, "quantity": 1}, headers=headers)
+        started = time.perf_counter()
+        response = client.post("/api/orders/", json=ORDER, headers=headers)
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            if response.status_code == 200:
+                outcomes["ok"] += 1
+            elif response.status_code == 400:
+                outcomes["sold_out"] += 1
+            else:
+                outcomes["errors"] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(attempt, range(attempts)))
+    result = summarize(latencies, outcomes["errors"], time.perf_counter() - started)
+
+    final_stock = admin.get(f"/api/products/{product_id}").json()["stock_quantity"]
+    result.update(
+        shards=shards,
+        orders=outcomes["ok"],
+        sold_out=outcomes["sold_out"],
+        final_stock=final_stock,
+        oversold=max(outcomes["ok"] - stock, 0),
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ledger and sharded stock under checkout contention")
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--base-url", help="Benchmark a running server over HTTP instead of in-process")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small", help="Scale the database was seeded with")
+    parser.add_argument("--shards", type=int, action="append", help="Shard counts to compare (0 = ledger path)")
+    parser.add_argument("--stock", type=int, default=200)
+    parser.add_argument("--attempts", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+    from benchmarks.run import make_client_factory
+    from benchmarks.scenarios import ScenarioContext
+
+    client_factory = make_client_factory(args.base_url)
+    ctx = ScenarioContext(resolve_scale(args.scale))
+
+    print(f"{'shards':<8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'orders':>8}{'sold out':>10}"
+          f"{'oversold':>10}{'stock':>8}{'errors':>8}")
+    oversold = False
+    for shards in args.shards or [0, 16]:
+        r = run_mode(client_factory, ctx, shards, args.stock, args.attempts, args.concurrency)
+        print(f"{shards:<8}{r['throughput']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['orders']:>8}"
+              f"{r['sold_out']:>10}{r['oversold']:>10}{r['final_stock']:>8}{r['errors']:>8}")
+        oversold = oversold or r["oversold"] > 0 or r["final_stock"] < 0
+    if oversold:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
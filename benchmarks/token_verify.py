@@ -0,0 +1,110 @@
+"""
+Access token verification cost: the HS256 shared secret against RS256 and EdDSA key pairs.
+
+    python -m benchmarks.token_verify --iterations 20000
+
+Asymmetric modes go through app.utils.signing_keys.KeyRing with throwaway keys, as
+verify_token does: kid from the header, lookup in the parsed-key cache, signature check.
+The "pem" rows look the kid up in a table of PEMs instead, which PyJWT re-parses on every
+call, to show what the cache saves. Needs `cryptography` for the asymmetric modes.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import jwt
+
+from benchmarks.run import summarize
+
+CLAIMS = {"sub": "42", "email": "user42@example.com", "role": "user", "ver": 0, "type": "access", "jti": "0" * 32}
+
+
+def measure(verify, token: str, iterations: int) -> dict:
+    for _ in range(min(iterations, 100)):
+        verify(token)
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t = time.perf_counter()
+        verify(token)
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies, 0, time.perf_counter() - started)
+
+
+def hs256_modes(keys_dir: str):
+    secret = "x" * 32
+    token = jwt.encode({**CLAIMS, "exp": time.time() + 600}, secret, algorithm="HS256")
+    yield "HS256", lambda t: jwt.decode(t, secret, algorithms=["HS256"]), token
+
+
+def _write_key(keys_dir: str, algorithm: str, kid: str):
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+
+    if algorithm == "RS256":
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    with open(os.path.join(keys_dir, f"{kid}.pem"), "wb") as f:
+        f.write(private_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ))
+    return private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+
+
+def asymmetric_modes(keys_dir: str, algorithm: str):
+    from app.utils.jwt_handler import token_kid
+    from app.utils.signing_keys import KeyRing
+
+    algorithm_dir = os.path.join(keys_dir, algorithm)
+    os.makedirs(algorithm_dir)
+    public_pem = _write_key(algorithm_dir, algorithm, "bench")
+    ring = KeyRing(algorithm, algorithm_dir, "bench", reload_seconds=60)
+    kid, private_key = ring.signing_key()
+    token = jwt.encode({**CLAIMS, "exp": time.time() + 600}, private_key, algorithm=algorithm, headers={"kid": kid})
+
+    def cached(t):
+        return jwt.decode(t, ring.verification_key(token_kid(t)), algorithms=[algorithm])
+
+    def pem(t):
+        return jwt.decode(t, {kid: public_pem}[token_kid(t)], algorithms=[algorithm])
+
+    yield f"{algorithm} cached", cached, token
+    yield f"{algorithm} pem", pem, token
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare JWT verification cost per signing algorithm")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=3, help="Modes run interleaved; each keeps its best round")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as keys_dir:
+        modes = list(hs256_modes(keys_dir))
+        try:
+            import cryptography  # noqa: F401
+        except ImportError:
+            print("(cryptography is not installed: RS256 and EdDSA skipped)")
+        else:
+            for algorithm in ("EdDSA", "RS256"):
+                modes.extend(asymmetric_modes(keys_dir, algorithm))
+
+        best = {}
+        for _ in range(args.rounds):
+            for mode, verify, token in modes:
+                result = measure(verify, token, args.iterations)
+                if mode not in best or result["throughput"] > best[mode]["throughput"]:
+                    best[mode] = result
+
+    print(f"{'mode':<16}{'verify/s':>12}{'p50 us':>10}{'p95 us':>10}{'token bytes':>13}")
+    for mode, _, token in modes:
+        r = best[mode]
+        print(f"{mode:<16}{r['throughput']:>12}{round(r['p50_ms'] * 1000, 1):>10}"
+              f"{round(r['p95_ms'] * 1000, 1):>10}{len(token):>13}")
+
+
+if __name__ == "__main__":
+    main()
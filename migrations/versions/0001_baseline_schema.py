@@ -0,0 +1,137 @@
+"""Baseline schema as previously created by Base.metadata.create_all
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+Databases that were bootstrapped by create_all at startup already have these
+tables; existing tables are left untouched so this revision simply adopts them.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+ORDER_STATUS = sa.Enum("PENDING", "CONFIRMED", "SHIPPED", "DELIVERED", "CANCELLED", name="orderstatus")
+
+
+def _timestamps():
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+    ]
+
+
+def upgrade():
+    if context.is_offline_mode():
+        existing = set()
+    else:
+        existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    def create(name, *columns, indexes=()):
+        if name in existing:
+            return
+        op.create_table(name, *columns)
+        op.create_index(f"ix_{name}_id", name, ["id"])
+        for column, unique in indexes:
+            op.create_index(f"ix_{name}_{column}", name, [column], unique=unique)
+
+    create(
+        "users",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("username", sa.String),
+        sa.Column("email", sa.String),
+        sa.Column("hashed_password", sa.String),
+        sa.Column("first_name", sa.String),
+        sa.Column("last_name", sa.String),
+        sa.Column("phone", sa.String),
+        sa.Column("is_active", sa.Boolean),
+        sa.Column("is_admin", sa.Boolean),
+        *_timestamps(),
+        indexes=[("username", True), ("email", True)],
+    )
+    create(
+        "categories",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.String),
+        sa.Column("description", sa.Text),
+        sa.Column("image_url", sa.String),
+        sa.Column("is_active", sa.Boolean),
+        *_timestamps(),
+        indexes=[("name", True)],
+    )
+    create(
+        "products",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.String),
+        sa.Column("description", sa.Text),
+        sa.Column("price", sa.DECIMAL(10, 2)),
+        sa.Column("sku", sa.String),
+        sa.Column("stock_quantity", sa.Integer),
+        sa.Column("image_url", sa.String),
+        sa.Column("is_active", sa.Boolean),
+        sa.Column("category_id", sa.Integer, sa.ForeignKey("categories.id")),
+        *_timestamps(),
+        indexes=[("name", False), ("sku", True)],
+    )
+    create(
+        "addresses",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id")),
+        sa.Column("street", sa.String),
+        sa.Column("city", sa.String),
+        sa.Column("state", sa.String),
+        sa.Column("postal_code", sa.String),
+        sa.Column("country", sa.String),
+        sa.Column("is_default", sa.Boolean),
+        *_timestamps(),
+    )
+    create(
+        "cart_items",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id")),
+        sa.Column("product_id", sa.Integer, sa.ForeignKey("products.id")),
+        sa.Column("quantity", sa.Integer),
+        *_timestamps(),
+    )
+    create(
+        "orders",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id")),
+        sa.Column("total_amount", sa.DECIMAL(10, 2)),
+        sa.Column("status", ORDER_STATUS),
+        sa.Column("shipping_address", sa.Text),
+        sa.Column("billing_address", sa.Text),
+        sa.Column("payment_method", sa.String),
+        sa.Column("payment_status", sa.String),
+        sa.Column("tracking_number", sa.String),
+        sa.Column("notes", sa.Text),
+        *_timestamps(),
+    )
+    create(
+        "order_items",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("order_id", sa.Integer, sa.ForeignKey("orders.id")),
+        sa.Column("product_id", sa.Integer, sa.ForeignKey("products.id")),
+        sa.Column("quantity", sa.Integer),
+        sa.Column("price", sa.DECIMAL(10, 2)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    create(
+        "reviews",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id")),
+        sa.Column("product_id", sa.Integer, sa.ForeignKey("products.id")),
+        sa.Column("rating", sa.Integer),
+        sa.Column("comment", sa.Text),
+        *_timestamps(),
+    )
+
+
+def downgrade():
+    for name in ["reviews", "order_items", "orders", "cart_items", "addresses", "products", "categories", "users"]:
+        op.drop_table(name)
+    ORDER_STATUS.drop(op.get_bind(), checkfirst=True)
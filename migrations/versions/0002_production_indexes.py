@@ -0,0 +1,70 @@
+"""Secondary indexes for the hot filters
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+The unique indexes on cart_items and reviews back rules the controllers already
+enforce; rows that violate them are merged (cart) or dropped (later reviews)
+before the index is built.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+ACTIVE_ONLY = {
+    "postgresql_where": sa.text("is_active"),
+    "sqlite_where": sa.text("is_active = 1"),
+}
+
+# (name, table, columns, options)
+INDEXES = [
+    ("uq_cart_items_user_product", "cart_items", ["user_id", "product_id"], {"unique": True}),
+    ("ix_orders_user_created", "orders", ["user_id", "created_at"], {}),
+    ("ix_orders_status_created", "orders", ["status", "created_at"], {}),
+    ("ix_order_items_order_id", "order_items", ["order_id"], {}),
+    ("ix_order_items_product_id", "order_items", ["product_id"], {}),
+    ("ix_reviews_product_created", "reviews", ["product_id", "created_at"], {}),
+    ("uq_reviews_user_product", "reviews", ["user_id", "product_id"], {"unique": True}),
+    ("ix_addresses_user_id", "addresses", ["user_id"], {}),
+    ("ix_products_active_category", "products", ["category_id", "id"], ACTIVE_ONLY),
+    ("ix_products_active_stock", "products", ["stock_quantity"], ACTIVE_ONLY),
+]
+
+
+def upgrade():
+    # Merge duplicate cart lines into the oldest one
+    op.execute("""
+        UPDATE cart_items SET quantity = (
+            SELECT SUM(dup.quantity) FROM cart_items dup
+            WHERE dup.user_id = cart_items.user_id AND dup.product_id = cart_items.product_id
+        )
+        WHERE id IN (
+            SELECT MIN(id) FROM cart_items GROUP BY user_id, product_id HAVING COUNT(*) > 1
+        )
+    """)
+    op.execute("""
+        DELETE FROM cart_items WHERE id NOT IN (
+            SELECT MIN(id) FROM cart_items GROUP BY user_id, product_id
+        )
+    """)
+    # Keep each user's first review of a product
+    op.execute("""
+        DELETE FROM reviews WHERE id NOT IN (
+            SELECT MIN(id) FROM reviews GROUP BY user_id, product_id
+        )
+    """)
+
+    # Build indexes without blocking writes on Postgres (CONCURRENTLY needs autocommit)
+    with op.get_context().autocommit_block():
+        for name, table, columns, options in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, **options)
+
+
+def downgrade():
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
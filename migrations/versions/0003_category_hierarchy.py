@@ -0,0 +1,41 @@
+"""Category hierarchy: parent_id and a closure table
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+Existing categories become roots; each gets its depth-0 self row in the closure table.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("categories") as batch:
+        batch.add_column(sa.Column("parent_id", sa.Integer, nullable=True))
+        batch.create_foreign_key("fk_categories_parent_id", "categories", ["parent_id"], ["id"])
+        batch.create_index("ix_categories_parent_id", ["parent_id"])
+
+    op.create_table(
+        "category_closure",
+        sa.Column("ancestor_id", sa.Integer, sa.ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("descendant_id", sa.Integer, sa.ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("depth", sa.Integer, nullable=False),
+    )
+    op.create_index("ix_category_closure_descendant", "category_closure", ["descendant_id", "ancestor_id"])
+
+    op.execute("INSERT INTO category_closure (ancestor_id, descendant_id, depth) SELECT id, id, 0 FROM categories")
+
+
+def downgrade():
+    op.drop_index("ix_category_closure_descendant", table_name="category_closure")
+    op.drop_table("category_closure")
+    with op.batch_alter_table("categories") as batch:
+        batch.drop_index("ix_categories_parent_id")
+        batch.drop_constraint("fk_categories_parent_id", type_="foreignkey")
+        batch.drop_column("parent_id")
@@ -0,0 +1,49 @@
+"""Review counters on products and the facet index
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+rating_total / review_count / rating_avg are backfilled from the existing reviews.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("products") as batch:
+        batch.add_column(sa.Column("rating_total", sa.Integer, server_default="0", nullable=False))
+        batch.add_column(sa.Column("review_count", sa.Integer, server_default="0", nullable=False))
+        batch.add_column(sa.Column("rating_avg", sa.Float, server_default="0", nullable=False))
+
+    op.execute("""
+        UPDATE products SET
+            rating_total = (SELECT COALESCE(SUM(rating), 0) FROM reviews WHERE reviews.product_id = products.id),
+            review_count = (SELECT COUNT(*) FROM reviews WHERE reviews.product_id = products.id)
+    """)
+    op.execute("""
+        UPDATE products SET rating_avg = CAST(rating_total AS FLOAT) / review_count
+        WHERE review_count > 0
+    """)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_products_active_facets", "products",
+            ["category_id", "price", "stock_quantity", "rating_avg"],
+            postgresql_where=sa.text("is_active"),
+            sqlite_where=sa.text("is_active = 1"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    op.drop_index("ix_products_active_facets", table_name="products")
+    with op.batch_alter_table("products") as batch:
+        batch.drop_column("rating_avg")
+        batch.drop_column("review_count")
+        batch.drop_column("rating_total")
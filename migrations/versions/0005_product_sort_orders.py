@@ -0,0 +1,53 @@
+"""Sales counter and indexes for the listing sort orders
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+sales_count is backfilled from the items of every order that wasn't cancelled.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+ACTIVE_ONLY = {
+    "postgresql_where": sa.text("is_active"),
+    "sqlite_where": sa.text("is_active = 1"),
+}
+
+INDEXES = [
+    ("ix_products_active_category_price", ["category_id", "price", "id"]),
+    ("ix_products_active_category_newest", ["category_id", "created_at", "id"]),
+    ("ix_products_active_category_sales", ["category_id", "sales_count", "id"]),
+    ("ix_products_active_category_rating", ["category_id", "rating_avg", "review_count", "id"]),
+    ("ix_products_active_newest", ["created_at", "id"]),
+    ("ix_products_active_sales", ["sales_count", "id"]),
+]
+
+
+def upgrade():
+    with op.batch_alter_table("products") as batch:
+        batch.add_column(sa.Column("sales_count", sa.Integer, server_default="0", nullable=False))
+
+    op.execute("""
+        UPDATE products SET sales_count = (
+            SELECT COALESCE(SUM(order_items.quantity), 0)
+            FROM order_items JOIN orders ON orders.id = order_items.order_id
+            WHERE order_items.product_id = products.id AND orders.status != 'CANCELLED'
+        )
+    """)
+
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(name, "products", columns, postgresql_concurrently=True, **ACTIVE_ONLY)
+
+
+def downgrade():
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name="products")
+    with op.batch_alter_table("products") as batch:
+        batch.drop_column("sales_count")
@@ -0,0 +1,52 @@
+"""Append-only inventory ledger
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+
+Existing stock_quantity values become the compacted balances (watermark 0), so the
+ledger starts empty.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+movement_reason = sa.Enum("INITIAL", "ORDER", "CANCELLATION", "ADJUSTMENT", name="movementreason")
+
+
+def upgrade():
+    op.create_table(
+        "inventory_movements",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("product_id", sa.Integer, sa.ForeignKey("products.id"), nullable=False),
+        sa.Column("delta", sa.Integer, nullable=False),
+        sa.Column("reason", movement_reason, nullable=False),
+        sa.Column("order_id", sa.Integer, sa.ForeignKey("orders.id")),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_inventory_movements_id", "inventory_movements", ["id"])
+    op.create_index("ix_inventory_movements_product_id", "inventory_movements", ["product_id", "id"])
+
+    with op.batch_alter_table("products") as batch:
+        batch.add_column(sa.Column("stock_ledger_id", sa.Integer, server_default="0", nullable=False))
+
+
+def downgrade():
+    # Fold whatever hasn't been compacted yet back into the balances
+    op.execute("""
+        UPDATE products SET stock_quantity = stock_quantity + COALESCE((
+            SELECT SUM(delta) FROM inventory_movements
+            WHERE inventory_movements.product_id = products.id
+            AND inventory_movements.id > products.stock_ledger_id
+        ), 0)
+    """)
+    with op.batch_alter_table("products") as batch:
+        batch.drop_column("stock_ledger_id")
+    op.drop_index("ix_inventory_movements_product_id", table_name="inventory_movements")
+    op.drop_index("ix_inventory_movements_id", table_name="inventory_movements")
+    op.drop_table("inventory_movements")
+    movement_reason.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,34 @@
+"""Sharded stock counters for flash-sale products
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+
+Every product starts unsharded (stock_shards = 0); admins opt products in.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "product_stock_shards",
+        sa.Column("product_id", sa.Integer, sa.ForeignKey("products.id"), primary_key=True),
+        sa.Column("shard", sa.Integer, primary_key=True),
+        sa.Column("quantity", sa.Integer, nullable=False),
+        sa.CheckConstraint("quantity >= 0", name="ck_product_stock_shards_quantity"),
+    )
+    with op.batch_alter_table("products") as batch:
+        batch.add_column(sa.Column("stock_shards", sa.Integer, server_default="0", nullable=False))
+
+
+def downgrade():
+    # Shard changes are mirrored on the ledger, so the balances are already right
+    with op.batch_alter_table("products") as batch:
+        batch.drop_column("stock_shards")
+    op.drop_table("product_stock_shards")
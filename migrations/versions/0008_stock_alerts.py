@@ -0,0 +1,64 @@
+"""Per-product reorder thresholds and stock alerts
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+
+Products already at or below the default threshold get an open alert, so the
+low-stock report is complete from the start.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("products") as batch:
+        batch.add_column(sa.Column("reorder_threshold", sa.Integer, server_default="10", nullable=False))
+
+    op.create_table(
+        "stock_alerts",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("product_id", sa.Integer, sa.ForeignKey("products.id"), nullable=False),
+        sa.Column("threshold", sa.Integer, nullable=False),
+        sa.Column("stock_quantity", sa.Integer, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("resolved_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_stock_alerts_id", "stock_alerts", ["id"])
+    op.create_index(
+        "ix_stock_alerts_open", "stock_alerts", ["product_id"],
+        postgresql_where=sa.text("resolved_at IS NULL"), sqlite_where=sa.text("resolved_at IS NULL")
+    )
+
+    # Live stock as in inventory_controller.live_stock()
+    op.execute("""
+        INSERT INTO stock_alerts (product_id, threshold, stock_quantity)
+        SELECT id, reorder_threshold, stock FROM (
+            SELECT products.id, products.reorder_threshold, CASE
+                WHEN products.stock_shards > 0 THEN (
+                    SELECT COALESCE(SUM(quantity), 0) FROM product_stock_shards
+                    WHERE product_stock_shards.product_id = products.id
+                )
+                ELSE COALESCE(products.stock_quantity, 0) + (
+                    SELECT COALESCE(SUM(delta), 0) FROM inventory_movements
+                    WHERE inventory_movements.product_id = products.id
+                    AND inventory_movements.id > products.stock_ledger_id
+                )
+            END AS stock
+            FROM products
+        ) AS levels
+        WHERE stock <= reorder_threshold
+    """)
+
+
+def downgrade():
+    op.drop_index("ix_stock_alerts_open", table_name="stock_alerts")
+    op.drop_index("ix_stock_alerts_id", table_name="stock_alerts")
+    op.drop_table("stock_alerts")
+    with op.batch_alter_table("products") as batch:
+        batch.drop_column("reorder_threshold")
@@ -0,0 +1,51 @@
+"""Product snapshots on order items and per-user order summaries
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+
+Existing order items are backfilled from the products as they are now, which is
+the best record left of what was bought.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("order_items") as batch:
+        batch.add_column(sa.Column("product_name", sa.String))
+        batch.add_column(sa.Column("product_sku", sa.String))
+        batch.add_column(sa.Column("product_image_url", sa.String))
+    with op.batch_alter_table("users") as batch:
+        batch.add_column(sa.Column("order_count", sa.Integer, server_default="0", nullable=False))
+        batch.add_column(sa.Column("last_order_id", sa.Integer))
+        batch.add_column(sa.Column("last_order_at", sa.DateTime(timezone=True)))
+
+    op.execute("""
+        UPDATE order_items SET
+            product_name = (SELECT name FROM products WHERE products.id = order_items.product_id),
+            product_sku = (SELECT sku FROM products WHERE products.id = order_items.product_id),
+            product_image_url = (SELECT image_url FROM products WHERE products.id = order_items.product_id)
+    """)
+    op.execute("""
+        UPDATE users SET
+            order_count = (SELECT COUNT(*) FROM orders WHERE orders.user_id = users.id),
+            last_order_id = (SELECT MAX(id) FROM orders WHERE orders.user_id = users.id),
+            last_order_at = (SELECT MAX(created_at) FROM orders WHERE orders.user_id = users.id)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table("users") as batch:
+        batch.drop_column("last_order_at")
+        batch.drop_column("last_order_id")
+        batch.drop_column("order_count")
+    with op.batch_alter_table("order_items") as batch:
+        batch.drop_column("product_image_url")
+        batch.drop_column("product_sku")
+        batch.drop_column("product_name")
@@ -0,0 +1,108 @@
+"""Order archive tables and per-day rollups of archived orders
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+
+Nothing is archived here; the archiver moves orders over as they age. The
+inventory_movements.order_id foreign key is dropped because it can point at an
+archived order.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+# The type already exists on PostgreSQL (0001)
+ORDER_STATUS = postgresql.ENUM(
+    "PENDING", "CONFIRMED", "SHIPPED", "DELIVERED", "CANCELLED", name="orderstatus", create_type=False
+)
+
+# SQLite's foreign keys are unnamed; batch mode needs a name to drop one by
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def _movement_order_fk():
+    if op.get_bind().dialect.name == "postgresql":
+        return "inventory_movements_order_id_fkey", {}
+    return "fk_inventory_movements_order_id_orders", {"naming_convention": NAMING_CONVENTION}
+
+
+def upgrade():
+    op.create_table(
+        "orders_archive",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=False),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id")),
+        sa.Column("total_amount", sa.DECIMAL(10, 2)),
+        sa.Column("status", ORDER_STATUS),
+        sa.Column("shipping_address", sa.Text),
+        sa.Column("billing_address", sa.Text),
+        sa.Column("payment_method", sa.String),
+        sa.Column("payment_status", sa.String),
+        sa.Column("tracking_number", sa.String),
+        sa.Column("notes", sa.Text),
+        sa.Column("created_at", sa.DateTime(timezone=True)),
+        sa.Column("updated_at", sa.DateTime(timezone=True)),
+        sa.Column("archived_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_orders_archive_user_created", "orders_archive", ["user_id", "created_at"])
+
+    op.create_table(
+        "order_items_archive",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=False),
+        sa.Column("order_id", sa.Integer, sa.ForeignKey("orders_archive.id")),
+        sa.Column("product_id", sa.Integer, sa.ForeignKey("products.id")),
+        sa.Column("quantity", sa.Integer),
+        sa.Column("price", sa.DECIMAL(10, 2)),
+        sa.Column("product_name", sa.String),
+        sa.Column("product_sku", sa.String),
+        sa.Column("product_image_url", sa.String),
+        sa.Column("created_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_order_items_archive_order_id", "order_items_archive", ["order_id"])
+    op.create_index("ix_order_items_archive_product_id", "order_items_archive", ["product_id"])
+
+    op.create_table(
+        "order_rollups",
+        sa.Column("day", sa.Date, primary_key=True),
+        sa.Column("status", ORDER_STATUS, primary_key=True),
+        sa.Column("order_count", sa.Integer, nullable=False),
+        sa.Column("revenue", sa.DECIMAL(14, 2), nullable=False),
+    )
+
+    name, options = _movement_order_fk()
+    with op.batch_alter_table("inventory_movements", **options) as batch:
+        batch.drop_constraint(name, type_="foreignkey")
+
+
+def downgrade():
+    # Bring archived orders back so nothing is lost
+    op.execute("""
+        INSERT INTO orders (id, user_id, total_amount, status, shipping_address, billing_address,
+                            payment_method, payment_status, tracking_number, notes, created_at, updated_at)
+        SELECT id, user_id, total_amount, status, shipping_address, billing_address,
+               payment_method, payment_status, tracking_number, notes, created_at, updated_at
+        FROM orders_archive
+    """)
+    op.execute("""
+        INSERT INTO order_items (id, order_id, product_id, quantity, price,
+                                 product_name, product_sku, product_image_url, created_at)
+        SELECT id, order_id, product_id, quantity, price,
+               product_name, product_sku, product_image_url, created_at
+        FROM order_items_archive
+    """)
+
+    name, options = _movement_order_fk()
+    with op.batch_alter_table("inventory_movements", **options) as batch:
+        batch.create_foreign_key(name, "orders", ["order_id"], ["id"])
+
+    op.drop_table("order_rollups")
+    op.drop_index("ix_order_items_archive_product_id", table_name="order_items_archive")
+    op.drop_index("ix_order_items_archive_order_id", table_name="order_items_archive")
+    op.drop_table("order_items_archive")
+    op.drop_index("ix_orders_archive_user_created", table_name="orders_archive")
+    op.drop_table("orders_archive")
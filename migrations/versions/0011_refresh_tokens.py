@@ -0,0 +1,37 @@
+"""Account token versions and rotating refresh tokens
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("users") as batch:
+        batch.add_column(sa.Column("token_version", sa.Integer, server_default="0", nullable=False))
+
+    op.create_table(
+        "refresh_tokens",
+        sa.Column("jti", sa.String(32), primary_key=True),
+        sa.Column("user_id", sa.Integer, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("family", sa.String(32), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("used_at", sa.DateTime(timezone=True)),
+        sa.Column("revoked_at", sa.DateTime(timezone=True)),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_refresh_tokens_family", "refresh_tokens", ["family"])
+
+
+def downgrade():
+    op.drop_index("ix_refresh_tokens_family", table_name="refresh_tokens")
+    op.drop_table("refresh_tokens")
+    with op.batch_alter_table("users") as batch:
+        batch.drop_column("token_version")
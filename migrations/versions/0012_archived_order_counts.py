@@ -0,0 +1,30 @@
+"""Per-user archived order counts
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19
+
+Lets order history skip the archive for users with nothing in it.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("users") as batch:
+        batch.add_column(sa.Column("archived_order_count", sa.Integer, server_default="0", nullable=False))
+
+    op.execute("""
+        UPDATE users SET
+            archived_order_count = (SELECT COUNT(*) FROM orders_archive WHERE orders_archive.user_id = users.id)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table("users") as batch:
+        batch.drop_column("archived_order_count")
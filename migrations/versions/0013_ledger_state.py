@@ -0,0 +1,33 @@
+"""Ledger compaction watermark
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19
+
+The watermark used to be derived from the highest products.stock_ledger_id, which a newly
+created product pushes past other products' uncompacted movements. It now has its own row,
+starting at the lowest product watermark: every movement up to it is already folded.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "ledger_state",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("compacted_through", sa.Integer, nullable=False),
+    )
+    op.execute("""
+        INSERT INTO ledger_state (id, compacted_through)
+        SELECT 1, COALESCE(MIN(stock_ledger_id), 0) FROM products
+    """)
+
+
+def downgrade():
+    op.drop_table("ledger_state")
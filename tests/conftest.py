@@ -0,0 +1,34 @@
+import os
+import tempfile
+
+import pytest
+
+# Configure the app before anything imports app.config: a throwaway SQLite primary and
+# no background workers
+_data_dir = tempfile.mkdtemp(prefix="ecommerce-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_data_dir, 'primary.db')}"
+os.environ.setdefault("STARTUP_WARMUP", "false")
+os.environ.setdefault("INVENTORY_COMPACTION_INTERVAL", "0")
+os.environ.setdefault("ORDER_ARCHIVE_INTERVAL", "0")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import user, category, product, address, cart, order, review, inventory  # noqa: E402,F401
+from app.utils.cache import clear_all_caches  # noqa: E402
+
+
+@pytest.fixture
+def data_dir():
+    return _data_dir
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
+        clear_all_caches()
@@ -0,0 +1,28 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.utils.auth_dependency import get_current_user
+from app.utils.jwt_handler import create_access_token, verify_token
+from app.utils.revocation import revoke_token
+
+
+def bearer(token: str) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+def test_revoked_token_is_reported_as_revoked():
+    token = create_access_token(7, "ann@example.com", False, 0)
+    assert get_current_user(bearer(token)).id == 7
+
+    claims = verify_token(token)
+    revoke_token(claims["jti"], claims["exp"])
+    with pytest.raises(HTTPException) as error:
+        get_current_user(bearer(token))
+    assert error.value.detail == "Token has been revoked"
+
+
+def test_garbage_token_is_invalid():
+    with pytest.raises(HTTPException) as error:
+        get_current_user(bearer("not-a-token"))
+    assert error.value.detail == "Invalid or expired token"
@@ -0,0 +1,69 @@
+import pytest
+
+from app.utils import cache, invalidation
+from app.utils.cache import LocalCache
+from app.utils.invalidation import LocalBus
+
+
+class Worker:
+    """
+    One worker's copy of a cache, listening on the shared bus
+    """
+    def __init__(self, bus: LocalBus):
+        self.products = LocalCache("products", ttl=30)
+        self.subscribe(bus)
+
+    def apply(self, cache_name, key):
+        if cache_name == self.products.name:
+            self.products.apply_invalidation(key)
+
+    def clear_all(self):
+        self.products.apply_invalidation(None)
+
+    def subscribe(self, bus):
+        bus.start(self.apply, self.clear_all)
+
+
+@pytest.fixture
+def bus(monkeypatch):
+    bus = LocalBus()
+    monkeypatch.setattr(invalidation, "_bus", bus)
+    # Keep the simulated workers' caches out of the app's registry
+    monkeypatch.setattr(cache, "_caches", {})
+    yield bus
+    bus.stop()
+
+
+def test_invalidation_reaches_every_worker(bus):
+    writer, reader = Worker(bus), Worker(bus)
+    for worker in (writer, reader):
+        worker.products.set(1, "old")
+        worker.products.set(2, "other")
+
+    writer.products.invalidate(1)
+    assert reader.products.get(1) is None
+    assert reader.products.get(2) == "other"
+
+    writer.products.clear()
+    assert reader.products.get(2) is None
+
+
+def test_stale_write_back_is_refused(bus):
+    writer, reader = Worker(bus), Worker(bus)
+
+    # The reader loads from the database, then the writer commits and invalidates
+    version = reader.products.version(1)
+    stale = "read before the update"
+    writer.products.invalidate(1)
+
+    assert not reader.products.set(1, stale, version)
+    assert reader.products.get(1) is None
+    assert reader.products.set(1, "fresh", reader.products.version(1))
+
+
+def test_resubscribing_clears_the_cache(bus):
+    worker = Worker(bus)
+    worker.products.set(1, "cached while disconnected")
+
+    worker.subscribe(bus)
+    assert worker.products.get(1) is None
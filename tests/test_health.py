@@ -0,0 +1,33 @@
+from app.utils import health
+from app.utils.health import _exemptions, is_exempt, readiness
+
+
+def test_readiness_ignores_pool_saturation(db, monkeypatch):
+    monkeypatch.setattr(health, "pool_stats", lambda: {"saturation": 1.0})
+    monkeypatch.setattr(health, "LOAD_SHED_SATURATION", 0.9)
+    health.database_check._checked_at = float("-inf")
+
+    report = readiness()
+    assert report["status"] == "ready"
+    assert report["checks"]["pool"]["shedding"] is True
+
+
+def test_readiness_fails_when_the_database_is_down(monkeypatch):
+    monkeypatch.setattr(health.database_check, "check", lambda: {"status": "down", "error": "OperationalError"})
+    health.database_check._checked_at = float("-inf")
+
+    assert readiness()["status"] == "not_ready"
+    health.database_check._checked_at = float("-inf")
+
+
+def test_checkout_is_exempt_but_order_history_is_not(monkeypatch):
+    prefixes, routes = _exemptions(("/health", "POST /api/orders/", "/api/payments", "/api/cart"))
+    monkeypatch.setattr(health, "EXEMPT_PREFIXES", prefixes)
+    monkeypatch.setattr(health, "EXEMPT_ROUTES", routes)
+
+    assert is_exempt("POST", "/api/orders/")
+    assert is_exempt("GET", "/health/ready")
+    assert is_exempt("POST", "/api/payments/confirm-payment")
+    assert not is_exempt("GET", "/api/orders/")
+    assert not is_exempt("GET", "/api/orders/admin")
+    assert not is_exempt("GET", "/api/products/")
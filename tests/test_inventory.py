@@ -0,0 +1,92 @@
+from decimal import Decimal
+
+from app.controllers import inventory_controller
+from app.controllers.inventory_controller import compact_movements, get_low_stock, get_stock, take_stock
+from app.controllers.product_controller import (
+    browse_products, create_product, get_product_by_sku, get_products, search_products, update_product
+)
+from app.models.category import Category
+from app.models.inventory import InventoryMovement, MovementReason, ProductStockShard
+from app.schemas.product_schema import ProductCreate, ProductUpdate
+
+
+def make_product(db, stock: int, sku: str = "HAM-1"):
+    category = db.query(Category).filter(Category.name == "Tools").first()
+    if category is None:
+        category = Category(name="Tools")
+        db.add(category)
+        db.commit()
+    return create_product(db, ProductCreate(
+        name=f"Hammer {sku}", description="", price=Decimal("9.99"), sku=sku,
+        stock_quantity=stock, category_id=category.id
+    ))
+
+
+def test_sharding_and_setting_stock_in_one_update(db):
+    product = make_product(db, 1_000_000)
+
+    update_product(db, product.id, ProductUpdate(stock_shards=4, stock_quantity=40))
+
+    shards = db.query(ProductStockShard.quantity).filter(ProductStockShard.product_id == product.id).all()
+    assert sorted(quantity for quantity, in shards) == [10, 10, 10, 10]
+    assert get_stock(db, product.id) == 40
+    adjustment = db.query(InventoryMovement.delta).filter(
+        InventoryMovement.product_id == product.id,
+        InventoryMovement.reason == MovementReason.ADJUSTMENT
+    ).scalar()
+    assert adjustment == 40 - 1_000_000
+
+
+def test_unsharding_keeps_stock_on_the_ledger(db):
+    product = make_product(db, 100)
+    update_product(db, product.id, ProductUpdate(stock_shards=4))
+
+    update_product(db, product.id, ProductUpdate(stock_shards=0, stock_quantity=70))
+
+    assert db.query(ProductStockShard).filter(ProductStockShard.product_id == product.id).count() == 0
+    assert get_stock(db, product.id) == 70
+
+
+def test_ledger_take_never_goes_negative(db):
+    product = make_product(db, 3)
+
+    assert take_stock(db, product, 2, order_id=1)
+    # The caller's earlier stock check is stale by now; the take itself refuses
+    assert not take_stock(db, product, 2, order_id=2)
+    assert take_stock(db, product, 1, order_id=3)
+    db.commit()
+
+    assert get_stock(db, product.id) == 0
+    assert db.query(InventoryMovement).filter(InventoryMovement.reason == MovementReason.ORDER).count() == 2
+
+
+def test_new_product_does_not_hide_other_products_pending_movements(db, monkeypatch):
+    monkeypatch.setattr(inventory_controller, "INVENTORY_COMPACTION_DELAY", -1)
+    product = make_product(db, 20)
+    assert take_stock(db, product, 15, order_id=1)
+    db.commit()
+    # Its opening movement is newer than the take above
+    make_product(db, 100, sku="SAW-1")
+
+    assert [(low.id, stock) for low, stock in get_low_stock(db, 10)] == [(product.id, 5)]
+
+    compact_movements(db)
+    db.refresh(product)
+    assert product.stock_quantity == 5
+    assert get_stock(db, product.id) == 5
+
+
+def test_listings_and_facets_use_live_stock(db):
+    sold_out = make_product(db, 2)
+    make_product(db, 50, sku="SAW-1")
+    assert take_stock(db, sold_out, 2, order_id=1)
+    db.commit()
+
+    listed = {product.id: product.stock_quantity for product in get_products(db)}
+    assert listed[sold_out.id] == 0
+    assert get_product_by_sku(db, "HAM-1").stock_quantity == 0
+    assert [product.stock_quantity for product in search_products(db, "HAM-1")] == [0]
+
+    browse = browse_products(db, in_stock=True)
+    assert [product.sku for product in browse["items"]] == ["SAW-1"]
+    assert browse_products(db)["facets"]["availability"] == {"in_stock": 1, "out_of_stock": 1}
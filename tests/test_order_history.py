@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import event
+
+from app.controllers.order_controller import archive_orders, get_orders
+from app.database import engine
+from app.models.order import ArchivedOrder, Order, OrderStatus
+from app.models.user import User
+
+
+def make_user(db, user_id):
+    user = User(id=user_id, username=f"user{user_id}", email=f"user{user_id}@example.com", hashed_password="x")
+    db.add(user)
+    return user
+
+
+def make_order(db, user_id, status, days_ago):
+    order = Order(
+        user_id=user_id, status=status, total_amount=Decimal("10.00"),
+        created_at=datetime.now(timezone.utc) - timedelta(days=days_ago)
+    )
+    db.add(order)
+    db.flush()
+    return order.id
+
+
+def count_queries(run):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        result = run()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return result, statements
+
+
+def test_history_merges_live_and_archived_orders_newest_first(db):
+    make_user(db, 1)
+    still_pending = make_order(db, 1, OrderStatus.PENDING, days_ago=400)
+    delivered = make_order(db, 1, OrderStatus.DELIVERED, days_ago=300)
+    recent = make_order(db, 1, OrderStatus.CONFIRMED, days_ago=1)
+    db.commit()
+
+    assert archive_orders(db) == 1
+    assert db.query(ArchivedOrder.id).scalar() == delivered
+    user = db.get(User, 1)
+    db.refresh(user)
+    assert user.archived_order_count == 1
+
+    orders = get_orders(db, 1, archived_count=user.archived_order_count)
+    assert [order.id for order in orders] == [recent, delivered, still_pending]
+    assert isinstance(orders[1], ArchivedOrder)
+    assert [order.id for order in get_orders(db, 1, skip=1, limit=1, archived_count=1)] == [delivered]
+    assert [order.id for order in get_orders(db, None, skip=2, limit=5)] == [still_pending]
+    assert [order.id for order in get_orders(db, 1, fields=["id", "status"], archived_count=1)] == [
+        recent, delivered, still_pending
+    ]
+
+
+def test_history_skips_the_archive_without_archived_orders(db):
+    make_user(db, 1)
+    make_user(db, 2)
+    make_order(db, 1, OrderStatus.DELIVERED, days_ago=300)
+    own = make_order(db, 2, OrderStatus.PENDING, days_ago=1)
+    db.commit()
+    archive_orders(db)
+
+    orders, statements = count_queries(lambda: get_orders(db, 2, archived_count=db.get(User, 2).archived_order_count))
+    assert [order.id for order in orders] == [own]
+    assert not any("orders_archive" in statement for statement in statements)
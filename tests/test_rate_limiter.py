@@ -0,0 +1,68 @@
+import asyncio
+
+from starlette.requests import Request
+
+from app.utils import rate_limiter
+from app.utils.jwt_handler import create_access_token
+from app.utils.rate_limiter import MemoryBackend, parse_limit
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def hit(backend, key, limit):
+    return asyncio.run(backend.hit(key, *parse_limit(limit)))
+
+
+def test_drained_bucket_is_kept_until_it_has_refilled(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock)
+    backend = MemoryBackend()
+    for _ in range(10):
+        hit(backend, "login:ip:1", "10/3600")
+    assert hit(backend, "login:ip:1", "10/3600") > 0
+
+    # Well past a minute of idling, but the bucket has only refilled a fraction
+    clock.now += 600
+    hit(backend, "login:ip:2", "10/3600")
+    assert hit(backend, "login:ip:1", "10/3600") == 0
+    assert hit(backend, "login:ip:1", "10/3600") > 0
+
+
+def test_refilled_buckets_are_dropped(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock)
+    backend = MemoryBackend()
+    for ip in range(100):
+        hit(backend, f"search:ip:{ip}", "30/10")
+
+    clock.now += 10
+    hit(backend, "search:ip:new", "30/10")
+    assert list(backend._limits[parse_limit("30/10")]) == ["search:ip:new"]
+
+
+def test_buckets_are_capped_per_limit(monkeypatch):
+    monkeypatch.setattr(MemoryBackend, "max_keys", 50)
+    backend = MemoryBackend()
+    for ip in range(200):
+        hit(backend, f"login:ip:{ip}", "5/60")
+    buckets = backend._limits[parse_limit("5/60")]
+    assert len(buckets) == 50
+    assert next(reversed(buckets)) == "login:ip:199"
+
+
+def request_with(authorization=None):
+    headers = [(b"authorization", authorization.encode())] if authorization else []
+    return Request({"type": "http", "headers": headers, "client": ("10.0.0.1", 1234)})
+
+
+def test_user_scope_keys_on_the_unverified_subject():
+    token = create_access_token(7, "ann@example.com", False, 0)
+    assert rate_limiter._identity(request_with(f"Bearer {token}"), "user") == "user:7"
+    assert rate_limiter._identity(request_with("Bearer not-a-token"), "user") == "ip:10.0.0.1"
+    assert rate_limiter._identity(request_with(), "user") == "ip:10.0.0.1"
@@ -0,0 +1,99 @@
+import asyncio
+import os
+
+import pytest
+from sqlalchemy import create_engine
+
+from app import database
+from app.database import Base, ReplicaRouter, SessionLocal
+from app.models.category import Category
+from app.utils.replica_monitor import run_replica_monitor
+
+
+@pytest.fixture
+def replica(db, data_dir, monkeypatch):
+    replica_engine = create_engine(f"sqlite:///{os.path.join(data_dir, 'replica.db')}")
+    Base.metadata.create_all(replica_engine)
+    router = ReplicaRouter([replica_engine], max_lag=5, check_interval=60)
+    monkeypatch.setattr(database, "replica_router", router)
+    monkeypatch.setattr(database, "read_only_engines", {**database.read_only_engines, replica_engine: replica_engine})
+
+    # Same row on both sides, told apart by its name
+    db.add(Category(id=1, name="primary"))
+    db.commit()
+    with replica_engine.begin() as conn:
+        conn.execute(Category.__table__.insert(), {"id": 1, "name": "replica"})
+    router.refresh(replica_engine)
+    yield replica_engine
+    Base.metadata.drop_all(replica_engine)
+    replica_engine.dispose()
+
+
+def read_session():
+    return SessionLocal(info={"use_replica": True})
+
+
+def category_name(session):
+    return session.query(Category.name).filter(Category.id == 1).scalar()
+
+
+def test_reads_go_to_the_replica(replica):
+    with read_session() as session:
+        assert category_name(session) == "replica"
+
+
+def test_sessions_without_opt_in_read_the_primary(replica):
+    with SessionLocal() as session:
+        assert category_name(session) == "primary"
+
+
+def test_a_write_pins_the_session_to_the_primary(replica):
+    with read_session() as session:
+        assert category_name(session) == "replica"
+        session.add(Category(name="new"))
+        session.flush()
+        assert category_name(session) == "primary"
+        assert session.query(Category).filter(Category.name == "new").count() == 1
+        session.rollback()
+
+
+def test_lagging_replica_falls_back_to_the_primary(replica):
+    database.replica_router.set_lag(replica, 60)
+    with read_session() as session:
+        assert category_name(session) == "primary"
+
+
+def test_unreachable_or_unmeasured_replica_falls_back_to_the_primary(replica):
+    database.replica_router.set_lag(replica, None)
+    with read_session() as session:
+        assert category_name(session) == "primary"
+
+    fresh = ReplicaRouter([replica], max_lag=5, check_interval=60)
+    assert fresh.choose() is None
+
+
+def test_stale_reading_falls_back_to_the_primary(replica, monkeypatch):
+    router = database.replica_router
+    monkeypatch.setattr(database.time, "monotonic", lambda: router._lag[replica][1] + 60 * router.stale_after + 1)
+    with read_session() as session:
+        assert category_name(session) == "primary"
+
+
+def test_routing_never_measures_lag(replica, monkeypatch):
+    monkeypatch.setattr(ReplicaRouter, "measure_lag", lambda self, engine: pytest.fail("measured on the request path"))
+    for _ in range(3):
+        with read_session() as session:
+            assert category_name(session) == "replica"
+
+
+def test_monitor_measures_replicas_in_the_background(replica):
+    router = ReplicaRouter([replica], max_lag=5, check_interval=0.01)
+    assert router.choose() is None
+
+    async def run_briefly():
+        task = asyncio.create_task(run_replica_monitor(router))
+        await asyncio.sleep(0.1)
+        task.cancel()
+
+    asyncio.run(run_briefly())
+    assert router.choose() is replica
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.controllers.order_controller import backfill_trending
+from app.models.order import Order, OrderItem, OrderStatus
+from app.utils import trending
+from app.utils.trending import MemoryBackend, top_products
+
+
+@pytest.fixture
+def counters(monkeypatch):
+    backend = MemoryBackend()
+    monkeypatch.setattr(trending, "_backend", backend)
+    return backend
+
+
+def sell(db, status, days_ago, *items):
+    order = Order(
+        user_id=1, status=status, total_amount=Decimal("10.00"),
+        created_at=datetime.now(timezone.utc) - timedelta(days=days_ago)
+    )
+    db.add(order)
+    db.flush()
+    for product_id, quantity in items:
+        db.add(OrderItem(order_id=order.id, product_id=product_id, quantity=quantity, price=Decimal("1.00")))
+
+
+def test_backfill_restores_the_windows_after_a_restart(db, counters):
+    sell(db, OrderStatus.CONFIRMED, 0, (1, 2), (2, 1))
+    sell(db, OrderStatus.DELIVERED, 3, (2, 5))
+    sell(db, OrderStatus.PENDING, 0, (3, 9))
+    sell(db, OrderStatus.CANCELLED, 0, (3, 9))
+    sell(db, OrderStatus.SHIPPED, 10, (4, 9))
+    db.commit()
+    assert top_products("week", 10) == []
+
+    assert backfill_trending(db) == 8
+    assert top_products("week", 10) == [(2, 6), (1, 2)]
+    assert top_products("day", 10) == [(1, 2), (2, 1)]